@@ -5,7 +5,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from ..utils import generate_otp
 from ..models import PasswordResetOTP
-from ..service.email_service import send_mail
+from ..service.tasks import queue_email
 from django.contrib.auth.hashers import make_password
 
 
@@ -39,7 +39,7 @@ def forgot_password_request(request):
         code=otp
     )
 
-    send_mail(
+    queue_email(
         subject="Password Reset Code",
         message=(
             f"Hello {user.full_name},\n\n"
@@ -11,3 +11,7 @@ from.ai_agent_views import*
 from .instagram_agent import *
 from .facebook_agent import *
 from .Password import *
+from .export_views import *
+from .search_views import *
+from .dashboard_views import *
+from .analytics_views import *
@@ -10,6 +10,9 @@ from rest_framework import generics, permissions
 from automation_app.serializers import ActivitySerializer,InstagramIDUpdateSerializer,AdminUpdateSocialSerializer
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.authentication import TokenAuthentication
+from ..service.ingest import ingest_social
+from ..service.response_times import ingest_times, record_reply
+from ..service.social_sources import SOCIAL_SOURCES
 
 class AdminChatHistoryListAPIView(APIView):
     """
@@ -78,19 +81,27 @@ class InstagramMessageView(APIView):
         message_text = request.data.get('message')
         reply_text = request.data.get('reply', None)
 
+        try:
+            received_at, replied_at = ingest_times(request.data, reply_text)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         # Find the user by recipient_id
         try:
             user = CustomUser.objects.get(instagram_account_id=recipient_id)
         except CustomUser.DoesNotExist:
             user = None  # or return error if preferred
 
-        msg = InstagramMessage.objects.create(
+        msg = ingest_social(
+            InstagramMessage,
             user=user,  # assign the user here
             recipient_id=recipient_id,
             sender_id=sender_id,
             sender_username=sender_username,
             message=message_text,
-            reply=reply_text
+            reply=reply_text,
+            replied_at=replied_at,
+            received_at=received_at
         )
 
         serializer = InstagramMessageSerializer(msg)
@@ -116,19 +127,27 @@ class InstagramCommentView(APIView):
         comment_text = request.data.get('comment')
         reply_text = request.data.get('reply', None)
 
+        try:
+            received_at, replied_at = ingest_times(request.data, reply_text)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         # Try to find the user by recipient_id
         try:
             user = CustomUser.objects.get(instagram_account_id=recipient_id)
         except CustomUser.DoesNotExist:
             user = None  # optional: you can return an error if you prefer
 
-        comment = InstagramComment.objects.create(
+        comment = ingest_social(
+            InstagramComment,
             user=user,  # assign the user here
             recipient_id=recipient_id,
             sender_id=sender_id,
             sender_username=sender_username,
             comment=comment_text,
-            reply=reply_text
+            reply=reply_text,
+            replied_at=replied_at,
+            received_at=received_at
         )
 
         serializer = InstagramCommentSerializer(comment)
@@ -152,19 +171,27 @@ class FacebookMessageView(APIView):
         message_text = request.data.get('message')
         reply_text = request.data.get('reply', None)
 
+        try:
+            received_at, replied_at = ingest_times(request.data, reply_text)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         # Automatically get the user by recipient_page_id
         try:
             user = CustomUser.objects.get(facebook_page_id=recipient_page_id)
         except CustomUser.DoesNotExist:
             user = None
 
-        msg = FacebookMessage.objects.create(
+        msg = ingest_social(
+            FacebookMessage,
             user=user,
             sender_id=sender_id,
             sender_name=sender_name,
             recipient_page_id=recipient_page_id,
             message=message_text,
-            reply=reply_text
+            reply=reply_text,
+            replied_at=replied_at,
+            received_at=received_at
         )
 
         serializer = FacebookMessageSerializer(msg)
@@ -189,19 +216,27 @@ class FacebookCommentView(APIView):
         comment_text = request.data.get('comment')
         reply_text = request.data.get('reply', None)
 
+        try:
+            received_at, replied_at = ingest_times(request.data, reply_text)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         # Automatically get the user by recipient_id
         try:
             user = CustomUser.objects.get(facebook_page_id=recipient_id)
         except CustomUser.DoesNotExist:
             user = None
 
-        comment = FacebookComment.objects.create(
+        comment = ingest_social(
+            FacebookComment,
             user=user,
             recipient_id=recipient_id,
             sender_id=sender_id,
             sender_name=sender_name,
             comment=comment_text,
-            reply=reply_text
+            reply=reply_text,
+            replied_at=replied_at,
+            received_at=received_at
         )
 
         serializer = FacebookCommentSerializer(comment)
@@ -214,6 +249,34 @@ class FacebookCommentView(APIView):
         return Response(serializer.data)
 
 
+# --- Replies sent after ingest ---
+class SocialReplyView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    # POST: Record the reply to a stored message/comment (first reply is timed)
+    def post(self, request, source, pk):
+        if source not in SOCIAL_SOURCES:
+            return Response({"error": f"Unknown source: {source}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        reply_text = request.data.get('reply')
+        if not reply_text:
+            return Response({"error": "reply is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        model = SOCIAL_SOURCES[source].model
+        try:
+            obj = model.objects.get(pk=pk)
+        except model.DoesNotExist:
+            return Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        if obj.user_id != request.user.id and not request.user.is_staff:
+            return Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            record_reply(obj, reply_text, request.data.get('replied_at'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"message": "Reply saved", "id": obj.pk, "replied_at": obj.replied_at})
+
+
 class AdminUpdateSocialView(APIView):
     permission_classes = [IsAdminUser]
 
@@ -11,6 +11,7 @@ from dotenv import load_dotenv
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from ..utils import generate_api_key
+from ..service.search import index_business_turns
 from ..serializers import BusinessSessionOrderCreateSerializer,BusinessSessionOrderSerializer, AdminUpdateOrderSerializer
 from django.views.decorators.csrf import csrf_exempt
 from django.http import HttpResponse
@@ -94,6 +95,7 @@ Only ask clarifying questions if necessary.
         session.chat_history = chat_history
         session.messages_used += 1
         session.save(update_fields=["chat_history", "messages_used"])
+        index_business_turns(session, start=len(chat_history) - 2)
 
         return Response({
             "message_id": len(chat_history),
@@ -447,6 +449,7 @@ Speak as the business itself. Be professional, polite, and helpful.
             chat_history.append({"chat_id": chat_id, "role": "assistant", "content": reply})
             session.chat_history = chat_history
             session.save(update_fields=["chat_history"])
+            index_business_turns(session, start=len(chat_history) - 2)
 
         # Send reply to Telegram
         requests.post(f"https://api.telegram.org/bot{bot_token}/sendMessage", json={"chat_id": chat_id, "text": reply})
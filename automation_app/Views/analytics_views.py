@@ -0,0 +1,176 @@
+from datetime import date
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from ..service import analytics, instagram_reports, Facebook_reports
+from ..service.heatmap import activity_heatmap
+from ..service.response_times import response_time_summary
+from ..service.sender_stats import sender_report
+from ..service.social_sources import PLATFORM_ACCOUNT_ATTRS
+from ..utils import get_month_range
+
+
+POST_STATISTICS = {
+    "instagram": instagram_reports.post_statistics,
+    "facebook": Facebook_reports.post_statistics,
+}
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def post_statistics_view(request):
+    """
+    Engagement statistics over the synced posts of one platform: percentiles,
+    engagement rate, trends, day-of-week / hour-of-day effects and outliers.
+    Query params: platform (instagram|facebook, default instagram), year and
+    month (both optional; the whole history when omitted).
+    """
+    platform = request.GET.get("platform", "instagram")
+    if platform not in POST_STATISTICS:
+        return Response({"error": f"Unknown platform: {platform}"}, status=400)
+
+    try:
+        result = POST_STATISTICS[platform](request.user, request.GET.get("year"), request.GET.get("month"))
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+    if "error" in result:
+        return Response(result, status=400)
+    if "syncing" in result:
+        return Response(result, status=202)
+    return Response(result)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def activity_heatmap_view(request):
+    """
+    When the audience is active: a 7x24 day-of-week x hour-of-day matrix of
+    all messages (or comments) an account has received, read from the
+    precomputed heatmap. Query params: platform (instagram|facebook, default
+    instagram), kind (message|comment, default message), tz (IANA zone the
+    hours are shown in, default UTC).
+    """
+    platform = request.GET.get("platform", "instagram")
+    kind = request.GET.get("kind", "message")
+    if platform not in PLATFORM_ACCOUNT_ATTRS:
+        return Response({"error": f"Unknown platform: {platform}"}, status=400)
+    if kind not in ("message", "comment"):
+        return Response({"error": f"Unknown kind: {kind}"}, status=400)
+
+    account_id = getattr(request.user, PLATFORM_ACCOUNT_ATTRS[platform])
+    if not account_id:
+        return Response({"error": f"{platform.capitalize()} account not connected"}, status=400)
+
+    try:
+        return Response(activity_heatmap(platform, account_id, kind, request.GET.get("tz")))
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def response_times_view(request):
+    """
+    How fast messages and comments get answered: reply count, mean and
+    p50/p90/p99 response time in seconds, the histogram and a per-day
+    breakdown, merged from the daily rollups. Query params: platform
+    (instagram|facebook, default instagram), year and month (both optional;
+    the whole history when omitted).
+    """
+    platform = request.GET.get("platform", "instagram")
+    if platform not in PLATFORM_ACCOUNT_ATTRS:
+        return Response({"error": f"Unknown platform: {platform}"}, status=400)
+
+    account_id = getattr(request.user, PLATFORM_ACCOUNT_ATTRS[platform])
+    if not account_id:
+        return Response({"error": f"{platform.capitalize()} account not connected"}, status=400)
+
+    start_date = end_date = None
+    year, month = request.GET.get("year"), request.GET.get("month")
+    if year and month:
+        try:
+            start_date, end_date = get_month_range(year, month)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+    return Response(response_time_summary(platform, account_id, start_date, end_date))
+
+
+def _csv(value):
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def analytics_query_view(request):
+    """
+    Cross-platform analytics over the rollup tables (see service/analytics.py).
+    Query params: metrics (comma-separated, required), dimensions (any of
+    day, month, platform, sender, post), platforms (default: every connected
+    account), start and end (YYYY-MM-DD) or year and month, exact=1,
+    bursts=0, order_by (a metric, "-" for descending) and limit (max 1000).
+    """
+    platforms = _csv(request.GET.get("platforms"))
+    for platform in platforms:
+        if platform not in PLATFORM_ACCOUNT_ATTRS:
+            return Response({"error": f"Unknown platform: {platform}"}, status=400)
+    accounts = analytics.user_accounts(request.user, platforms)
+
+    try:
+        start_date = end_date = None
+        if request.GET.get("start") or request.GET.get("end"):
+            start_date = date.fromisoformat(request.GET["start"]) if request.GET.get("start") else None
+            end_date = date.fromisoformat(request.GET["end"]) if request.GET.get("end") else None
+        elif request.GET.get("year") and request.GET.get("month"):
+            start_date, end_date = get_month_range(request.GET["year"], request.GET["month"])
+
+        limit = min(int(request.GET.get("limit", 1000)), 1000)
+        rows = analytics.query(
+            accounts,
+            _csv(request.GET.get("metrics")),
+            _csv(request.GET.get("dimensions")),
+            start_date,
+            end_date,
+            exact=request.GET.get("exact") == "1",
+            include_bursts=request.GET.get("bursts") != "0",
+            order_by=request.GET.get("order_by"),
+            limit=limit,
+        )
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+    return Response({
+        "platforms": list(accounts),
+        "start": start_date,
+        "end": end_date,
+        "rows": rows,
+    })
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def senders_view(request):
+    """
+    Sender rankings read from the per-sender stats table. Query params:
+    platform (instagram|facebook, default instagram), view (leaderboard,
+    top_fans or churned_fans; default leaderboard), days (activity window
+    for top_fans, silence for churned_fans; default 30) and limit (max 100).
+    """
+    platform = request.GET.get("platform", "instagram")
+    if platform not in PLATFORM_ACCOUNT_ATTRS:
+        return Response({"error": f"Unknown platform: {platform}"}, status=400)
+
+    account_id = getattr(request.user, PLATFORM_ACCOUNT_ATTRS[platform])
+    if not account_id:
+        return Response({"error": f"{platform.capitalize()} account not connected"}, status=400)
+
+    view = request.GET.get("view", "leaderboard")
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 10)), 100))
+        days = int(request.GET.get("days", 30))
+        senders = sender_report(platform, account_id, view, limit, days)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+    return Response({"platform": platform, "view": view, "senders": senders})
@@ -0,0 +1,40 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from ..service.dashboard import social_dashboard
+from ..service.graph_budget import governor
+
+
+PLATFORMS = ("instagram", "facebook")
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def social_dashboard_view(request):
+    """
+    Everything the social dashboard shows in one call: profile, insights,
+    latest media/posts, latest comments and stats per connected platform.
+    Parts are fetched concurrently; any that fail or time out are reported
+    under "errors" while the rest are still returned.
+    Query params: platforms (comma separated, default both).
+    """
+    platforms = [p for p in request.GET.get("platforms", "").split(",") if p] or list(PLATFORMS)
+    unknown = [p for p in platforms if p not in PLATFORMS]
+    if unknown:
+        return Response({"error": f"Unknown platforms: {', '.join(unknown)}"}, status=400)
+
+    return Response(social_dashboard(request.user, platforms))
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def graph_budget_view(request):
+    """
+    Current Graph API rate-limit budget as seen by this server process:
+    app-wide usage plus the usage of the requesting user's tokens (keyed by
+    a token hash), in percent of Meta's limits, and how long any throttled
+    scope stays blocked.
+    """
+    user = request.user
+    tokens = [user.instagram_access_token, user.facebook_access_token]
+    return Response(governor.snapshot(tokens))
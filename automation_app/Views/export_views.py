@@ -0,0 +1,60 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from ..service.exports import EXPORT_SOURCES, EXPORT_FORMATS, export_stream
+
+
+EXPORT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_social_data(request, source):
+    """
+    Streams the caller's rows for one source as gzip-compressed NDJSON or CSV.
+    Query params: export_format (ndjson|csv), since, until (YYYY-MM-DD), gzip (1|0).
+    """
+    if source not in EXPORT_SOURCES and source != "business_chat":
+        return Response({"error": f"Unknown export source: {source}"}, status=400)
+
+    export_format = request.GET.get("export_format", "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        return Response({"error": "export_format must be ndjson or csv"}, status=400)
+
+    dates = {}
+    for name in ("since", "until"):
+        value = request.GET.get(name)
+        try:
+            dates[name] = parse_date(value) if value else None
+        except ValueError:
+            dates[name] = None  # well formed but not a real date, e.g. 2024-13-01
+        if value and dates[name] is None:
+            return Response({"error": f"{name} must be a date (YYYY-MM-DD)"}, status=400)
+
+    compress = request.GET.get("gzip", "1") != "0"
+
+    stream = export_stream(
+        source,
+        export_format=export_format,
+        compress=compress,
+        user=request.user,
+        since=dates["since"],
+        until=dates["until"],
+    )
+
+    filename = f"{source}-{timezone.now():%Y%m%d%H%M%S}.{export_format}"
+    if compress:
+        filename += ".gz"
+
+    response = StreamingHttpResponse(
+        stream,
+        content_type="application/gzip" if compress else EXPORT_CONTENT_TYPES[export_format],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -10,7 +10,7 @@ from ..price import calculate_order_price
 from rest_framework.views import APIView
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
-from automation_app.utils import send_real_time_notification
+from automation_app.service.tasks import queue_notification
 from django.core.exceptions import ValidationError
 from rest_framework.permissions import IsAdminUser
 from django.utils.dateparse import parse_datetime
@@ -59,7 +59,7 @@ class OrderViewSet(viewsets.ModelViewSet):
             message=f"✅ Your order #{order.id} has been received. Our admin will review it within 24 hours."
         )
 
-        send_real_time_notification(
+        queue_notification(
             self.request.user.id,
             f"✅ Your order #{order.id} has been received!"
         )
@@ -172,7 +172,7 @@ class OrderStatusUpdateAPIView(APIView):
                 user=order.user,
                 message=status_messages[new_status]
             )
-            send_real_time_notification(
+            queue_notification(
                 order.user.id,
                 status_messages[new_status]
             )
@@ -7,7 +7,7 @@ from rest_framework.views import APIView
 import os
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
-from automation_app.utils import send_real_time_notification
+from automation_app.service.tasks import queue_notification
 from rest_framework.generics import ListAPIView
 from automation_app.serializers import TransactionSerializer,OrderPaymentSerializer
 from rest_framework.views import APIView
@@ -143,16 +143,16 @@ def confirm_payment(request):
                 payment.order.status = "in_progress"
                 payment.order.save()
                 # ✅ Send real-time notification for the order status update
-                send_real_time_notification(payment.order.user.id, messages_map["in_progress"])
+                queue_notification(payment.order.user.id, messages_map["in_progress"])
             # ✅ Send notification for payment success
-            send_real_time_notification(payment.order.user.id, messages_map["paid"])
+            queue_notification(payment.order.user.id, messages_map["paid"])
 
         elif stripe_status in ["requires_payment_method", "requires_action"]:
             payment.status = "pending"
         else:
             payment.status = "failed"
             if payment.order:
-                send_real_time_notification(payment.order.user.id, messages_map["failed"])
+                queue_notification(payment.order.user.id, messages_map["failed"])
 
         payment.save()
 
@@ -0,0 +1,37 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from ..service.search import SEARCH_SOURCES, search_for_user
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def search_inbox(request):
+    """
+    Full-text search over the caller's Instagram/Facebook messages and comments
+    and their business chat turns.
+    Query params: q (required), sources (comma separated), page, page_size.
+    """
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return Response({"error": "q is required"}, status=400)
+
+    sources = [s for s in request.GET.get("sources", "").split(",") if s]
+    unknown = [s for s in sources if s not in SEARCH_SOURCES]
+    if unknown:
+        return Response({"error": f"Unknown sources: {', '.join(unknown)}"}, status=400)
+
+    try:
+        page = int(request.GET.get("page", 1))
+        page_size = int(request.GET.get("page_size", 20))
+    except ValueError:
+        return Response({"error": "page and page_size must be integers"}, status=400)
+
+    results = search_for_user(
+        request.user,
+        query,
+        sources=sources or None,
+        page=page,
+        page_size=page_size,
+    )
+    return Response(results)
@@ -4,18 +4,29 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated,AllowAny
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.contrib.auth.models import User
-from ..models import Notification,ChatHistory,Project, Order, CustomUser ,ContactMessage,InstagramMessage, InstagramComment,FacebookComment,FacebookMessage,BusinessSession
+from ..models import Notification,ChatHistory,Project, Order, CustomUser ,ContactMessage,BusinessSession
 from ..serializers import NotificationSerializer, CustomUserSerializer,ContactMessageSerializer,UpdateProfileSerializer,ChangePasswordSerializer,InstagramStatsSerializer,FacebookStatsSerializer,BusinessSessionUpdateSerializer
 from django.contrib.auth import get_user_model
 from rest_framework.decorators import api_view, permission_classes
 from django.contrib.auth import update_session_auth_hash
-from django.http import JsonResponse
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import requests
 from django.shortcuts import get_object_or_404
-from datetime import datetime, time
-from ..utils import get_month_range,gpt_classify_text
-from collections import Counter
+from ..utils import get_month_range
+from ..service.feedback import feedback_report
+from ..service.graph_client import GraphAPIError
+from ..service.graph_cache import cached_graph_get, cached_graph_get_many, ttl_for
+from ..service.insights_store import INSIGHT_METRICS, daily_series, graph_shaped
+from ..service.dashboard import (
+    gather,
+    instagram_media,
+    facebook_posts,
+    latest_instagram_comments,
+    latest_facebook_comments,
+)
+from ..service import analytics
+from ..service.report_snapshots import REPORT_MODULES, get_report
+from ..service.ranking import parse_weights
 
 
 User = get_user_model()
@@ -182,25 +193,20 @@ def instagram_stats(request):
     if not user.instagram_account_id:
         return Response({"error": "User does not have an Instagram account ID."}, status=400)
 
-    recipient_id = user.instagram_account_id
-
-    # Count total messages received
-    total_messages = InstagramMessage.objects.filter(recipient_id=recipient_id).count()
-
-    # Count total comments received
-    total_comments = InstagramComment.objects.filter(recipient_id=recipient_id).count()
-
-    # Total conversations (unique senders from both messages and comments)
-    message_senders = InstagramMessage.objects.filter(recipient_id=recipient_id).values_list('sender_id', flat=True)
-    comment_senders = InstagramComment.objects.filter(recipient_id=recipient_id).values_list('sender_id', flat=True)
-
-    unique_senders = set(list(message_senders) + list(comment_senders))
-    total_conversations = len(unique_senders)
+    # Totals over the account's whole history, read from the daily rollups.
+    # Pass ?exact=1 for an exact sender count instead of the HyperLogLog estimate,
+    # and ?bursts=0 to count each cluster of near-duplicate comments once.
+    totals = analytics.message_totals(
+        "instagram",
+        user.instagram_account_id,
+        exact=request.GET.get("exact") == "1",
+        include_bursts=request.GET.get("bursts") != "0",
+    )
 
     data = {
-        "total_messages": total_messages,
-        "total_comments": total_comments,
-        "total_conversations": total_conversations
+        "total_messages": totals["messages"],
+        "total_comments": totals["comments"],
+        "total_conversations": totals["conversations"]
     }
 
     serializer = InstagramStatsSerializer(data)
@@ -218,36 +224,27 @@ class FacebookInsightsView(APIView):
         today = datetime.today().date()
         default_since = today - timedelta(days=28)
 
-        since = request.GET.get("since", default_since.isoformat())
-        until = request.GET.get("until", today.isoformat())
-
-        url = f"https://graph.facebook.com/v23.0/{instagram_account_id}/insights"
-        params = {
-            "metric": "reach",
-            "period": "day",
-            "since": since,
-            "until": until,
-            "access_token": access_token
-        }
+        try:
+            since = date.fromisoformat(request.GET.get("since", default_since.isoformat()))
+            until = date.fromisoformat(request.GET.get("until", today.isoformat()))
+        except ValueError:
+            return Response({"error": "since and until must be YYYY-MM-DD dates"}, status=400)
 
-        response = requests.get(url, params=params)
+        # the stored series is keyed by account alone, so only its owner may read it
+        if instagram_account_id != request.user.instagram_account_id:
+            return Response({"error": "Not your Instagram account"}, status=403)
 
-        if response.status_code == 200:
-            fb_data = response.json()
-
-            # Keep ONLY the insights data, remove paging
-            cleaned = {
-                "data": fb_data.get("data", [])
-            }
-
-            return Response(cleaned)
-
-        else:
+        # served from the insights time-series; Graph only fills days not stored yet
+        try:
+            points, source = daily_series("instagram", instagram_account_id, access_token, "reach", since, until)
+        except GraphAPIError as e:
             return Response({
                 "error": "Failed to fetch data",
-                "status": response.status_code,
-                "details": response.json()
+                "status": e.status,
+                "details": e.payload
             }, status=500)
+
+        return Response(graph_shaped("reach", points), headers={"X-Insights-Source": source})
         
 
 class FacebookEngagementInsightsView(APIView):
@@ -258,33 +255,28 @@ class FacebookEngagementInsightsView(APIView):
         if not access_token:
             return Response({"error": "User has no Instagram access token"}, status=400)
 
-        url = f"https://graph.facebook.com/v19.0/{instagram_account_id}/insights"
-
-        params = {
-            "metric": "likes,comments,shares,saves",
-            "period": "day",
-            "metric_type": "total_value",
-            "access_token": access_token
-        }
-
-        response = requests.get(url, params=params)
-
-        if response.status_code == 200:
-            data = response.json()
-
-            # Return only the "data" array, remove paging
-            cleaned = {
-                "data": data.get("data", [])
-            }
-
-            return Response(cleaned)
-
-        else:
+        try:
+            data, cache_status = cached_graph_get(
+                f"{instagram_account_id}/insights",
+                access_token,
+                "insights",
+                metric="likes,comments,shares,saves",
+                period="day",
+                metric_type="total_value",
+            )
+        except GraphAPIError as e:
             return Response({
                 "error": "Failed to fetch insights",
-                "status": response.status_code,
-                "details": response.json()
+                "status": e.status,
+                "details": e.payload
             }, status=500)
+
+        # Return only the "data" array, remove paging
+        cleaned = {
+            "data": data.get("data", [])
+        }
+
+        return Response(cleaned, headers={"X-Cache": cache_status})
         
 
 class instagramProfileView(APIView):
@@ -296,14 +288,16 @@ class instagramProfileView(APIView):
         if not access_token:
             return Response({"error": "User does not have an Instagram access token"}, status=400)
 
-        url = f"https://graph.facebook.com/v23.0/{instagram_id}"
-        params = {
-            "fields": "username,profile_picture_url,followers_count,follows_count,media_count",
-            "access_token": access_token
-        }
-
-        response = requests.get(url, params=params)
-        return Response(response.json())
+        try:
+            profile, cache_status = cached_graph_get(
+                instagram_id,
+                access_token,
+                "profile",
+                fields="username,profile_picture_url,followers_count,follows_count,media_count",
+            )
+        except GraphAPIError as e:
+            return Response(e.payload, status=e.status or 502)
+        return Response(profile, headers={"X-Cache": cache_status})
 
 
 
@@ -316,50 +310,21 @@ class InstagramMediaWithCommentsView(APIView):
         if not access_token:
             return Response({"error": "User has no Instagram access token"}, status=400)
 
-        # Facebook API media URL
-        fb_url = f"https://graph.facebook.com/v23.0/{instagram_id}/media"
-        params = {
-            "fields": "id,media_type,media_url,thumbnail_url,permalink,timestamp,caption,like_count,comments_count",
-            "access_token": access_token,
-            "limit": 10
-        }
-
-        # Call META API
-        fb_response = requests.get(fb_url, params=params)
-        fb_data = fb_response.json()
-
-        # Keep ONLY media items, remove paging
-        cleaned_media = fb_data.get("data", [])
-
-        # Get last 5 comments from DB
-        last_comments = InstagramComment.objects.filter(
-            recipient_id=instagram_id
-        ).order_by("-timestamp")[:5]
-
-        serialized_comments = [
-            {
-                "sender_id": c.sender_id,
-                "sender_username": c.sender_username,
-                "comment": c.comment,
-                "reply": c.reply,
-                "timestamp": c.timestamp
-            }
-            for c in last_comments
-        ]
+        # Latest 10 media items from Graph and last 5 comments from DB, fetched concurrently
+        results, errors = gather({
+            "media": lambda: instagram_media(instagram_id, access_token),
+            "latest_comments": lambda: latest_instagram_comments(instagram_id),
+        })
 
         # Final response
         result = {
-            "media": cleaned_media,           # removed paging
-            "last_5_comments": serialized_comments
+            "media": results.get("media", []),           # removed paging
+            "last_5_comments": results.get("latest_comments", [])
         }
+        if errors:
+            result["errors"] = errors
 
         return Response(result)
-    
-
-
-    
-
-
 
 
 class FacebookPageProfileView(APIView):
@@ -371,14 +336,16 @@ class FacebookPageProfileView(APIView):
         if not access_token:
             return Response({"error": "User does not have a Facebook Page access token"}, status=400)
 
-        url = f"https://graph.facebook.com/v24.0/{page_id}"
-        params = {
-            "fields": "id,name,link,category,picture,fan_count,about,followers_count",
-            "access_token": access_token
-        }
-
-        response = requests.get(url, params=params)
-        return Response(response.json())
+        try:
+            profile, cache_status = cached_graph_get(
+                page_id,
+                access_token,
+                "profile",
+                fields="id,name,link,category,picture,fan_count,about,followers_count",
+            )
+        except GraphAPIError as e:
+            return Response(e.payload, status=e.status or 502)
+        return Response(profile, headers={"X-Cache": cache_status})
     
 class FacebookPostsWithCommentsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -389,51 +356,20 @@ class FacebookPostsWithCommentsView(APIView):
         if not access_token:
             return Response({"error": "User has no Facebook Page access token"}, status=400)
 
-        fb_url = f"https://graph.facebook.com/v24.0/{page_id}/posts"
-        params = {
-            "fields": "id,message,created_time,attachments{media},permalink_url,shares,likes.summary(true),comments.summary(true)",
-            "access_token": access_token,
-            "limit": 10
-        }
-
-        fb_response = requests.get(fb_url, params=params)
-        fb_data = fb_response.json()
-
-        raw_posts = fb_data.get("data", [])
-
-        cleaned_posts = []
-
-        for post in raw_posts:
-            # Remove paging inside likes
-            if "likes" in post:
-                post["likes"].pop("paging", None)
-
-            # Remove paging inside comments
-            if "comments" in post:
-                post["comments"].pop("paging", None)
-
-            cleaned_posts.append(post)
-
-        # Last 5 comments from DB
-        last_comments = FacebookComment.objects.filter(
-            recipient_id=page_id
-        ).order_by("-timestamp")[:5]
+        # Latest 10 posts from Graph and last 5 comments from DB, fetched concurrently
+        results, errors = gather({
+            "posts": lambda: facebook_posts(page_id, access_token),
+            "latest_comments": lambda: latest_facebook_comments(page_id),
+        })
 
-        serialized_comments = [
-            {
-                "sender_id": c.sender_id,
-                "sender_name": c.sender_name,
-                "comment": c.comment,
-                "reply": c.reply,
-                "timestamp": c.timestamp
-            }
-            for c in last_comments
-        ]
+        response = {
+            "posts": results.get("posts", []),
+            "last_5_comments": results.get("latest_comments", [])
+        }
+        if errors:
+            response["errors"] = errors
 
-        return Response({
-            "posts": cleaned_posts,
-            "last_5_comments": serialized_comments
-        })
+        return Response(response)
 
 
 @api_view(['GET'])
@@ -444,25 +380,20 @@ def facebook_stats(request):
     if not user.facebook_page_id:
         return Response({"error": "User does not have a Facebook Page ID."}, status=400)
 
-    page_id = user.facebook_page_id
-
-    # Count total messages received
-    total_messages = FacebookMessage.objects.filter(recipient_page_id=page_id).count()
-
-    # Count total comments received
-    total_comments = FacebookComment.objects.filter(recipient_id=page_id).count()
-
-    # Total conversations (unique senders from both messages and comments)
-    message_senders = FacebookMessage.objects.filter(recipient_page_id=page_id).values_list('sender_id', flat=True)
-    comment_senders = FacebookComment.objects.filter(recipient_id=page_id).values_list('sender_id', flat=True)
-
-    unique_senders = set(list(message_senders) + list(comment_senders))
-    total_conversations = len(unique_senders)
+    # Totals over the page's whole history, read from the daily rollups.
+    # Pass ?exact=1 for an exact sender count instead of the HyperLogLog estimate,
+    # and ?bursts=0 to count each cluster of near-duplicate comments once.
+    totals = analytics.message_totals(
+        "facebook",
+        user.facebook_page_id,
+        exact=request.GET.get("exact") == "1",
+        include_bursts=request.GET.get("bursts") != "0",
+    )
 
     data = {
-        "total_messages": total_messages,
-        "total_comments": total_comments,
-        "total_conversations": total_conversations
+        "total_messages": totals["messages"],
+        "total_comments": totals["comments"],
+        "total_conversations": totals["conversations"]
     }
 
     # You can reuse the same serializer or create a new one for Facebook stats
@@ -489,25 +420,40 @@ class FacebookPageInsightsMetricView(APIView):
             since = (today - timedelta(days=7)).isoformat()
             until = today.isoformat()
 
-        url = f"https://graph.facebook.com/v19.0/{page_id}/insights/{metric}"
-        params = {
-            "access_token": access_token,
-            "period": "day",
-            "since": since,
-            "until": until,
-        }
-
-        fb_response = requests.get(url, params=params)
-        data = fb_response.json()
-
-        if "error" in data:
-            return Response({"error": "Facebook API error", "details": data}, status=400)
+        stored = INSIGHT_METRICS["facebook"].get(metric)
+        if stored and stored.kind != "gauge":
+            # the stored series is keyed by page alone, so only its owner may read it
+            if page_id != user.facebook_page_id:
+                return Response({"error": "Not your Facebook page"}, status=403)
+            # served from the insights time-series; Graph only fills days not stored yet
+            try:
+                since, until = date.fromisoformat(since), date.fromisoformat(until)
+            except ValueError:
+                return Response({"error": "since and until must be YYYY-MM-DD dates"}, status=400)
+            try:
+                points, source = daily_series("facebook", page_id, access_token, metric, since, until)
+            except GraphAPIError as e:
+                return Response({"error": "Facebook API error", "details": e.payload}, status=400)
+            return Response(graph_shaped(metric, points), headers={"X-Insights-Source": source})
+
+        try:
+            data, cache_status = cached_graph_get(
+                f"{page_id}/insights/{metric}",
+                access_token,
+                "insights",
+                ttl=ttl_for("insights", metric),
+                period="day",
+                since=since,
+                until=until,
+            )
+        except GraphAPIError as e:
+            return Response({"error": "Facebook API error", "details": e.payload}, status=400)
 
         # 🔥 REMOVE PAGING IF EXISTS
         if "paging" in data:
             del data["paging"]
 
-        return Response(data)
+        return Response(data, headers={"X-Cache": cache_status})
     
 
 
@@ -526,176 +472,143 @@ class FacebookPageInsightsMultiMetricView(APIView):
         if not metrics:
             return Response({"error": "Metric parameter is required"}, status=400)
 
-        url = f"https://graph.facebook.com/v24.0/{page_id}/insights"
-
-        params = {
-            "metric": metrics,
-            "access_token": access_token,
-        }
-
-        fb_response = requests.get(url, params=params)
-        data = fb_response.json()
-
-        if "error" in data:
-            return Response({"error": "Facebook API error", "details": data}, status=400)
-
-        # remove paging if exists
-        if "paging" in data:
-            del data["paging"]
-
-        return Response(data)
+        # one batched sub-request per metric, so an invalid or unavailable
+        # metric fails on its own instead of taking the others down with it
+        metric_names = [m.strip() for m in metrics.split(",") if m.strip()]
+        entries = cached_graph_get_many([
+            (f"{page_id}/insights", access_token, "insights", {"metric": metric})
+            for metric in metric_names
+        ])
+
+        data, errors, statuses = [], {}, set()
+        for metric, (result, cache_status) in zip(metric_names, entries):
+            if isinstance(result, GraphAPIError):
+                errors[metric] = result.payload
+            else:
+                data.extend(result.get("data", []))
+                statuses.add(cache_status)
+
+        if len(errors) == len(metric_names):
+            return Response({"error": "Facebook API error", "details": errors}, status=400)
+
+        response = {"data": data}
+        if errors:
+            response["errors"] = errors
+        cache_status = "miss" if "miss" in statuses else "stale" if "stale" in statuses else "hit"
+        return Response(response, headers={"X-Cache": cache_status})
 
 #instagram analysis -------------------------------------------------------------------------------------
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def instagram_monthly_report(request):
-    user = request.user
-
-    if not user.instagram_account_id:
-        return Response({"error": "Instagram account not connected"}, status=400)
+# Both platforms share the helpers below; the query work happens in service/analytics.py
 
+def _monthly_report_response(request, platform, account_id):
     year = request.GET.get("year")
     month = request.GET.get("month")
+    exact = request.GET.get("exact") == "1"
+    include_bursts = request.GET.get("bursts") != "0"
 
-    start_date, end_date = get_month_range(year, month)
-    instagram_id = user.instagram_account_id
-
-    # Use datetime range for timezone-safe filtering
-    start_datetime = datetime.combine(start_date, time.min)
-    end_datetime = datetime.combine(end_date, time.max)
-
-    messages = InstagramMessage.objects.filter(
-        recipient_id=instagram_id,
-        timestamp__range=(start_datetime, end_datetime)
-    )
-
-    comments = InstagramComment.objects.filter(
-        recipient_id=instagram_id,
-        timestamp__range=(start_datetime, end_datetime)
-    )
-
-    unique_senders = set(
-        list(messages.values_list("sender_id", flat=True)) +
-        list(comments.values_list("sender_id", flat=True))
-    )
-
-    days = (end_date - start_date).days + 1
-
+    if exact or not include_bursts:
+        report = analytics.monthly_report(platform, account_id, year, month, exact=exact, include_bursts=include_bursts)
+    else:
+        # closed months are served from their precomputed snapshot
+        report = get_report(request.user, platform, "monthly_report", year, month)
     return Response({
-        "period": f"{start_date.strftime('%Y-%m')}",
+        "period": report["period"],
         "messages": {
-            "total": messages.count(),
-            "daily_avg": round(messages.count() / days, 2)
+            "total": report["messages_total"],
+            "daily_avg": report["messages_daily_avg"]
         },
         "comments": {
-            "total": comments.count(),
-            "daily_avg": round(comments.count() / days, 2)
+            "total": report["comments_total"],
+            "daily_avg": report["comments_daily_avg"]
         },
-        "conversations": len(unique_senders)
+        "conversations": report["conversations"],
+        "response_times": report["response_times"]
     })
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def instagram_best_worst_posts(request):
-    user = request.user
-
+def _best_worst_response(request, platform, summary):
     year = request.GET.get("year")
     month = request.GET.get("month")
-
     start_date, end_date = get_month_range(year, month)
 
-    instagram_id = user.instagram_account_id
-    access_token = user.instagram_access_token
-
-    url = f"https://graph.facebook.com/v23.0/{instagram_id}/media"
-    params = {
-        "fields": "id,permalink,timestamp,like_count,comments_count",
-        "access_token": access_token,
-        "limit": 50
-    }
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 1)), 50))
+        weights = parse_weights(request.GET.get("weights"))
+        if weights:
+            # Ranked from the synced post mirror with bounded top/bottom-k heaps
+            result = REPORT_MODULES[platform].best_worst_posts(request.user, year, month, limit, weights)
+        else:
+            result = get_report(request.user, platform, "best_worst_posts", year, month, limit)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    if result is None:
+        return Response({"message": "No posts in this month"})
+    if "error" in result:
+        return Response(result, status=400)
+    if "syncing" in result:
+        return Response(result, status=202)
 
-    data = requests.get(url, params=params).json().get("data", [])
+    return Response({
+        "period": f"{start_date.strftime('%Y-%m')}",
+        "best_post": summary(result["best_post"]),
+        "worst_post": summary(result["worst_post"]),
+        "best_posts": [summary(post) for post in result["best_posts"]],
+        "worst_posts": [summary(post) for post in result["worst_posts"]]
+    })
 
-    posts = []
-    for post in data:
-        post_date = datetime.fromisoformat(post["timestamp"]).date()
-        if start_date <= post_date <= end_date:
-            likes = post.get("like_count", 0)
-            comments = post.get("comments_count", 0)
-            post["engagement"] = likes + comments
-            posts.append(post)
 
-    if not posts:
-        return Response({"message": "No posts in this month"})
+def _complaints_response(request, platform, account_id):
+    year = request.GET.get("year")
+    month = request.GET.get("month")
+    start_date, end_date = get_month_range(year, month)
 
-    best_post = max(posts, key=lambda x: x["engagement"])
-    worst_post = min(posts, key=lambda x: x["engagement"])
+    if request.GET.get("bursts") == "0":
+        # Aggregated from stored labels; unlabelled or stale rows are queued, not classified here
+        report = feedback_report(platform, account_id, start_date, end_date, include_bursts=False)
+    else:
+        report = get_report(request.user, platform, "complaints_and_reviews", year, month)
 
     return Response({
         "period": f"{start_date.strftime('%Y-%m')}",
-        "best_post": {
-            "permalink": best_post["permalink"],
-            "likes": best_post["like_count"],
-            "comments": best_post["comments_count"],
-            "engagement": best_post["engagement"]
-        },
-        "worst_post": {
-            "permalink": worst_post["permalink"],
-            "likes": worst_post["like_count"],
-            "comments": worst_post["comments_count"],
-            "engagement": worst_post["engagement"]
-        }
+        "top_complaints": report["top_complaints"],
+        "reviews": report["sentiment"],
+        "pending": report.get("pending", 0)
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def instagram_complaints_and_reviews(request):
-    user = request.user
-
-    year = request.GET.get("year")
-    month = request.GET.get("month")
-
-    start_date, end_date = get_month_range(year, month)
-    instagram_id = user.instagram_account_id
-
-    messages = InstagramMessage.objects.filter(
-        recipient_id=instagram_id,
-        timestamp__date__range=(start_date, end_date)
-    )
+def instagram_monthly_report(request):
+    if not request.user.instagram_account_id:
+        return Response({"error": "Instagram account not connected"}, status=400)
 
-    comments = InstagramComment.objects.filter(
-        recipient_id=instagram_id,
-        timestamp__date__range=(start_date, end_date)
-    )
+    return _monthly_report_response(request, "instagram", request.user.instagram_account_id)
 
-    complaints = []
-    sentiment_count = {"Positive": 0, "Neutral": 0, "Negative": 0}
 
-    # Combine messages and comments
-    for obj in list(messages) + list(comments):
-        text = getattr(obj, "message", None) or obj.comment
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def instagram_best_worst_posts(request):
+    user = request.user
 
-        # GPT classification
-        sentiment = gpt_classify_text(text, task="sentiment")
-        complaint = gpt_classify_text(text, task="complaint")
+    if not user.instagram_account_id or not user.instagram_access_token:
+        return Response({"error": "Instagram account or access token missing"}, status=400)
 
-        # Count sentiment
-        if sentiment in sentiment_count:
-            sentiment_count[sentiment] += 1
+    def summary(post):
+        return {
+            "permalink": post["permalink"],
+            "likes": post.get("like_count", 0),
+            "comments": post.get("comments_count", 0),
+            "engagement": post["engagement"],
+            "score": post["score"]
+        }
 
-        # Collect complaints
-        if complaint == "Yes":
-            complaints.append(text)
+    return _best_worst_response(request, "instagram", summary)
 
-    top_complaints = Counter(complaints).most_common(5)
 
-    return Response({
-        "period": f"{start_date.strftime('%Y-%m')}",
-        "top_complaints": [{"topic": k, "count": v} for k, v in top_complaints],
-        "reviews": sentiment_count
-    })
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def instagram_complaints_and_reviews(request):
+    return _complaints_response(request, "instagram", request.user.instagram_account_id)
 
 
 # FACEBOOK ANALYSIS -----------------------------------------------------------------------------------
@@ -703,151 +616,39 @@ def instagram_complaints_and_reviews(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def facebook_monthly_report(request):
-    user = request.user
-
-    page_id = user.facebook_page_id
-    if not page_id:
+    if not request.user.facebook_page_id:
         return Response({"error": "Facebook page not connected"}, status=400)
 
-    year = request.GET.get("year")
-    month = request.GET.get("month")
-
-    start_date, end_date = get_month_range(year, month)
-    start_datetime = datetime.combine(start_date, time.min)
-    end_datetime = datetime.combine(end_date, time.max)
-
-    messages = FacebookMessage.objects.filter(
-        recipient_page_id=page_id,
-        timestamp__range=(start_datetime, end_datetime)
-    )
+    return _monthly_report_response(request, "facebook", request.user.facebook_page_id)
 
-    comments = FacebookComment.objects.filter(
-        recipient_id=page_id,
-        timestamp__range=(start_datetime, end_datetime)
-    )
-
-    unique_senders = set(
-        list(messages.values_list("sender_id", flat=True)) +
-        list(comments.values_list("sender_id", flat=True))
-    )
-
-    days = (end_date - start_date).days + 1
-
-    return Response({
-        "period": f"{start_date.strftime('%Y-%m')}",
-        "messages": {
-            "total": messages.count(),
-            "daily_avg": round(messages.count() / days, 2)
-        },
-        "comments": {
-            "total": comments.count(),
-            "daily_avg": round(comments.count() / days, 2)
-        },
-        "conversations": len(unique_senders)
-    })
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def facebook_best_worst_posts(request):
     user = request.user
-    page_id = user.facebook_page_id
-    access_token = user.facebook_access_token
 
-    if not page_id or not access_token:
+    if not user.facebook_page_id or not user.facebook_access_token:
         return Response({"error": "Facebook page or access token missing"}, status=400)
 
-    year = request.GET.get("year")
-    month = request.GET.get("month")
-    start_date, end_date = get_month_range(year, month)
-
-    url = f"https://graph.facebook.com/v24.0/{page_id}/posts"
-    params = {
-        "fields": "id,message,created_time,permalink_url,shares,likes.summary(true),comments.summary(true)",
-        "access_token": access_token,
-        "limit": 50
-    }
-
-    data = requests.get(url, params=params).json().get("data", [])
-
-    posts = []
-    for post in data:
-        post_date = datetime.fromisoformat(post["created_time"].replace("Z", "+00:00")).date()
-        if start_date <= post_date <= end_date:
-            likes = post.get("likes", {}).get("summary", {}).get("total_count", 0)
-            comments_count = post.get("comments", {}).get("summary", {}).get("total_count", 0)
-            post["engagement"] = likes + comments_count
-            post["likes"] = likes
-            post["comments_count"] = comments_count
-            posts.append(post)
-
-    if not posts:
-        return Response({"message": "No posts in this month"})
-
-    best_post = max(posts, key=lambda x: x["engagement"])
-    worst_post = min(posts, key=lambda x: x["engagement"])
-
-    return Response({
-        "period": f"{start_date.strftime('%Y-%m')}",
-        "best_post": {
-            "permalink": best_post["permalink_url"],
-            "likes": best_post["likes"],
-            "comments": best_post["comments_count"],
-            "engagement": best_post["engagement"]
-        },
-        "worst_post": {
-            "permalink": worst_post["permalink_url"],
-            "likes": worst_post["likes"],
-            "comments": worst_post["comments_count"],
-            "engagement": worst_post["engagement"]
+    def summary(post):
+        return {
+            "permalink": post["permalink_url"],
+            "likes": post["likes"],
+            "comments": post["comments_count"],
+            "engagement": post["engagement"],
+            "score": post["score"]
         }
-    })
+
+    return _best_worst_response(request, "facebook", summary)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def facebook_complaints_and_reviews(request):
-    user = request.user
-    page_id = user.facebook_page_id
-
-    if not page_id:
+    if not request.user.facebook_page_id:
         return Response({"error": "Facebook page not connected"}, status=400)
 
-    year = request.GET.get("year")
-    month = request.GET.get("month")
-    start_date, end_date = get_month_range(year, month)
-
-    messages = FacebookMessage.objects.filter(
-        recipient_page_id=page_id,
-        timestamp__date__range=(start_date, end_date)
-    )
-
-    comments = FacebookComment.objects.filter(
-        recipient_id=page_id,
-        timestamp__date__range=(start_date, end_date)
-    )
-
-    complaints = []
-    sentiment_count = {"Positive": 0, "Neutral": 0, "Negative": 0}
-
-    for obj in list(messages) + list(comments):
-        text = getattr(obj, "message", None) or getattr(obj, "comment", "")
-
-        sentiment = gpt_classify_text(text, task="sentiment")
-        complaint = gpt_classify_text(text, task="complaint")
-
-        if sentiment in sentiment_count:
-            sentiment_count[sentiment] += 1
-
-        if complaint == "Yes":
-            complaints.append(text)
-
-    top_complaints = Counter(complaints).most_common(5)
-
-    return Response({
-        "period": f"{start_date.strftime('%Y-%m')}",
-        "top_complaints": [{"topic": k, "count": v} for k, v in top_complaints],
-        "reviews": sentiment_count
-    })
+    return _complaints_response(request, "facebook", request.user.facebook_page_id)
 
 
 N8N_AVAILABILITY_URL = "https://n8n.urbatech.io/webhook/b9745a63-953f-41da-8e97-750caa30571e/get-availability"
@@ -0,0 +1,86 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ...models import SocialDailyRollup, SocialDailySender
+from ...service.response_times import elapsed_seconds
+from ...service.rollups import merge_rollup, seal_sender_sketches, sender_hash
+from ...service.social_sources import SOCIAL_SOURCES
+
+
+class Command(BaseCommand):
+    help = "Rebuild SocialDailyRollup rows from the raw message/comment tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--platform", choices=["instagram", "facebook"])
+        parser.add_argument("--account", help="Only rebuild one account / page id")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        sources = [
+            source for source in SOCIAL_SOURCES.values()
+            if not options["platform"] or source.platform == options["platform"]
+        ]
+
+        for model in (SocialDailyRollup, SocialDailySender):
+            existing = model.objects.all()
+            if options["platform"]:
+                existing = existing.filter(platform=options["platform"])
+            if options["account"]:
+                existing = existing.filter(account_id=options["account"])
+            deleted, _ = existing.delete()
+            self.stdout.write(f"Cleared {deleted} {model._meta.verbose_name} rows")
+
+        for source in sources:
+            rows = source.model.objects.exclude(**{source.account_field: ""})
+            if options["account"]:
+                rows = rows.filter(**{source.account_field: options["account"]})
+
+            fields = [source.account_field, "timestamp", "sender_id", "id", "replied_at", "reply", "received_at"]
+            if source.kind == "comment":
+                fields.append("dup_cluster__first_object_id")
+            rows = rows.order_by(source.account_field, "timestamp").values_list(*fields)
+
+            # rows arrive grouped by (account, day); flush each group as one merge
+            groups = 0
+            current_key = None
+            count = duplicates = 0
+            hashes = set()
+            responses = []
+
+            for account_id, timestamp, sender_id, obj_id, replied_at, reply, received_at, *cluster in rows.iterator(
+                chunk_size=options["chunk_size"]
+            ):
+                key = (account_id, timezone.localdate(timestamp))
+                if key != current_key:
+                    if current_key is not None:
+                        self._flush(source, current_key, count, hashes, duplicates, responses)
+                        groups += 1
+                    current_key, count, duplicates, hashes, responses = key, 0, 0, set(), []
+                count += 1
+                hashes.add(sender_hash(sender_id))
+                seconds = elapsed_seconds(received_at, timestamp, replied_at) if reply else None
+                if seconds is not None:
+                    responses.append(seconds)
+                # a comment is a duplicate when it joined a cluster someone else started
+                if cluster and cluster[0] and cluster[0] != obj_id:
+                    duplicates += 1
+
+            if current_key is not None:
+                self._flush(source, current_key, count, hashes, duplicates, responses)
+                groups += 1
+
+            self.stdout.write(f"{source.name}: {groups} account-days")
+
+        self.stdout.write(f"Sealed {seal_sender_sketches()} sender sketches")
+
+    def _flush(self, source, key, count, hashes, duplicates, responses):
+        account_id, day = key
+        merge_rollup(
+            source.platform,
+            account_id,
+            day,
+            messages=count if source.kind == "message" else 0,
+            comments=count if source.kind == "comment" else 0,
+            sender_hashes=hashes,
+            duplicate_comments=duplicates,
+            response_seconds=responses,
+        )
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from ...models import SocialClassification
+from ...service.feedback import create_missing_rows, classify_pending
+from ...service.social_sources import SOCIAL_SOURCES
+
+
+class Command(BaseCommand):
+    help = "Backfill stored sentiment/complaint labels for existing messages and comments"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--platform", choices=["instagram", "facebook"])
+        parser.add_argument("--account", help="Only one account / page id")
+        parser.add_argument(
+            "--reclassify",
+            action="store_true",
+            help="Also relabel rows produced by an older model version",
+        )
+        parser.add_argument("--limit", type=int, help="Stop after labelling this many rows")
+
+    def handle(self, *args, **options):
+        for source in SOCIAL_SOURCES.values():
+            if options["platform"] and source.platform != options["platform"]:
+                continue
+            created = create_missing_rows(source, account_id=options["account"])
+            self.stdout.write(f"{source.name}: {created} rows queued")
+
+        scope = SocialClassification.objects.all()
+        if options["platform"]:
+            scope = scope.filter(platform=options["platform"])
+        if options["account"]:
+            scope = scope.filter(account_id=options["account"])
+
+        total = 0
+        while options["limit"] is None or total < options["limit"]:
+            labelled = classify_pending(scope, include_stale=options["reclassify"])
+            if not labelled:
+                break
+            total += labelled
+            self.stdout.write(f"labelled {total}")
+
+        remaining = scope.filter(classified_at__isnull=True).count()
+        self.stdout.write(f"Done: {total} labelled, {remaining} still pending")
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from ...models import SocialClassification
+from ...service.neardup import assign_comment_cluster
+from ...service.social_sources import SOCIAL_SOURCES
+
+
+class Command(BaseCommand):
+    help = (
+        "Assign near-duplicate clusters to existing comments that have none. "
+        "Run backfill_rollups afterwards to refresh the duplicate counts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--platform", choices=["instagram", "facebook"])
+        parser.add_argument("--account", help="Only one account / page id")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        for source in SOCIAL_SOURCES.values():
+            if source.kind != "comment":
+                continue
+            if options["platform"] and source.platform != options["platform"]:
+                continue
+
+            comments = source.model.objects.filter(dup_cluster__isnull=True).exclude(
+                **{source.account_field: ""}
+            )
+            if options["account"]:
+                comments = comments.filter(**{source.account_field: options["account"]})
+
+            clustered = duplicates = 0
+            last_id = 0
+            while True:
+                # page by id (i.e. arrival order) since each page rewrites the filtered column
+                batch = list(comments.filter(id__gt=last_id).order_by("id")[:options["chunk_size"]])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+
+                updated = []
+                for comment in batch:
+                    match = assign_comment_cluster(comment, save=False)
+                    if match is None:
+                        continue
+                    clustered += 1
+                    updated.append(comment)
+                    if match.duplicate:
+                        duplicates += 1
+                        # share the cluster's label instead of classifying this text separately
+                        SocialClassification.objects.filter(
+                            source=source.name, object_id=comment.pk
+                        ).exclude(text_hash=match.text_hash).update(
+                            text_hash=match.text_hash, classified_at=None
+                        )
+                source.model.objects.bulk_update(updated, ["dup_cluster"])
+
+            self.stdout.write(f"{source.name}: {clustered} clustered, {duplicates} near-duplicates")
@@ -0,0 +1,51 @@
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from ...service.insights_store import collect_account, downsample
+from ...service.social_posts import POST_SOURCES
+
+
+class Command(BaseCommand):
+    help = (
+        "Collect Instagram/Facebook insights into the InsightSeries time-series "
+        "table and downsample old hourly/daily buckets. Schedule it hourly, or "
+        "keep it running with --interval."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--platform", choices=list(POST_SOURCES))
+        parser.add_argument("--account", help="Only one account / page id")
+        parser.add_argument("--days", type=int, help="Complete days to (re)collect per run")
+        parser.add_argument("--downsample-only", action="store_true")
+        parser.add_argument("--interval", type=int, default=0, help="Seconds between runs; 0 runs once")
+
+    def handle(self, *args, **options):
+        platforms = [options["platform"]] if options["platform"] else list(POST_SOURCES)
+
+        while True:
+            if not options["downsample_only"]:
+                self.collect(platforms, options["account"], options["days"])
+
+            days, weeks = downsample()
+            self.stdout.write(f"Downsampled {days} daily and {weeks} weekly buckets")
+
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
+
+    def collect(self, platforms, account, days):
+        connected = Q()
+        for platform in platforms:
+            field = POST_SOURCES[platform].account_field
+            connected |= Q(**{field: account}) if account else ~Q(**{field: ""}) & Q(**{f"{field}__isnull": False})
+
+        for user in get_user_model().objects.filter(connected).order_by("id"):
+            for platform in platforms:
+                source = POST_SOURCES[platform]
+                account_id = getattr(user, source.account_field)
+                access_token = getattr(user, source.token_field)
+                if not account_id or not access_token or (account and account_id != account):
+                    continue
+                stored = collect_account(platform, account_id, access_token, days)
+                self.stdout.write(f"{platform} {account_id}: {stored} daily points")
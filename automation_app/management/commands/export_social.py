@@ -0,0 +1,56 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.utils.dateparse import parse_date
+from ...service.exports import EXPORT_SOURCES, EXPORT_FORMATS, EXPORT_CHUNK_SIZE, export_stream
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Stream social messages, comments and chat logs to NDJSON or CSV (gzip by default)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "source",
+            choices=list(EXPORT_SOURCES) + ["business_chat"],
+        )
+        parser.add_argument("--format", dest="export_format", choices=EXPORT_FORMATS, default="ndjson")
+        parser.add_argument("--output", "-o", help="File path, defaults to stdout")
+        parser.add_argument("--user", help="Username to scope the export to (default: all rows)")
+        parser.add_argument("--since", help="YYYY-MM-DD")
+        parser.add_argument("--until", help="YYYY-MM-DD")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+        parser.add_argument("--no-gzip", action="store_true")
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            try:
+                user = User.objects.get(username=options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f"User not found: {options['user']}")
+
+        since = parse_date(options["since"]) if options["since"] else None
+        until = parse_date(options["until"]) if options["until"] else None
+
+        stream = export_stream(
+            options["source"],
+            export_format=options["export_format"],
+            compress=not options["no_gzip"],
+            user=user,
+            since=since,
+            until=until,
+            chunk_size=options["chunk_size"],
+        )
+
+        if options["output"]:
+            with open(options["output"], "wb") as f:
+                for chunk in stream:
+                    f.write(chunk)
+        else:
+            out = sys.stdout.buffer
+            for chunk in stream:
+                out.write(chunk)
+            out.flush()
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay
+from ...models import ActivityHeatmap
+from ...service.heatmap import merge_heatmap
+from ...service.social_sources import SOCIAL_SOURCES
+
+
+class Command(BaseCommand):
+    help = "Rebuild ActivityHeatmap rows from the raw message/comment tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--platform", choices=["instagram", "facebook"])
+        parser.add_argument("--account", help="Only rebuild one account / page id")
+
+    def handle(self, *args, **options):
+        for platform in ("instagram", "facebook"):
+            if options["platform"] and platform != options["platform"]:
+                continue
+            # delete and re-insert together, so ingest in between can neither be lost nor double counted
+            with transaction.atomic():
+                existing = ActivityHeatmap.objects.filter(platform=platform)
+                if options["account"]:
+                    existing = existing.filter(account_id=options["account"])
+                deleted, _ = existing.delete()
+                self.stdout.write(f"{platform}: cleared {deleted} heatmap rows")
+                for source in SOCIAL_SOURCES.values():
+                    if source.platform == platform:
+                        self._rebuild(source, options["account"])
+
+    def _rebuild(self, source, account_id):
+        rows = source.model.objects.exclude(**{source.account_field: ""}).exclude(timestamp__isnull=True)
+        if account_id:
+            rows = rows.filter(**{source.account_field: account_id})
+
+        # grouped in the database (timestamps are UTC), one row per account and slot
+        grouped = rows.annotate(
+            weekday=ExtractIsoWeekDay("timestamp"), hour=ExtractHour("timestamp")
+        ).values(source.account_field, "weekday", "hour").annotate(count=Count("id")).order_by()
+
+        per_account = {}
+        for row in grouped:
+            slots = per_account.setdefault(row[source.account_field], {})
+            slots[(row["weekday"] - 1) * 24 + row["hour"]] = row["count"]
+
+        for account_id, slots in per_account.items():
+            merge_heatmap(source.platform, account_id, source.kind, slots)
+        self.stdout.write(f"{source.name}: {len(per_account)} accounts")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from ...models import SearchDocument, BusinessSession
+from ...service.search import index_social_object, index_business_turns
+from ...service.social_sources import SOCIAL_SOURCES
+
+
+class Command(BaseCommand):
+    help = "Backfill the full-text search index from existing messages, comments and chat turns"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clear", action="store_true", help="Delete all indexed documents first")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            SearchDocument.objects.all().delete()
+
+        for source in SOCIAL_SOURCES.values():
+            count = 0
+            for obj in source.model.objects.order_by("id").iterator(chunk_size=options["chunk_size"]):
+                index_social_object(obj)
+                count += 1
+            self.stdout.write(f"{source.name}: {count} indexed")
+
+        count = 0
+        sessions = BusinessSession.objects.order_by("id").iterator(chunk_size=100)
+        for session in sessions:
+            index_business_turns(session, timestamp=session.created_at)
+            count += len(session.chat_history or [])
+        self.stdout.write(f"business_chat: {count} turns indexed")
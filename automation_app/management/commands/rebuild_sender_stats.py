@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from ...models import SenderStats
+from ...service.social_sources import SOCIAL_SOURCES
+
+
+class Command(BaseCommand):
+    help = "Rebuild SenderStats rows from the raw message/comment tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--platform", choices=["instagram", "facebook"])
+        parser.add_argument("--account", help="Only rebuild one account / page id")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        for platform in ("instagram", "facebook"):
+            if options["platform"] and platform != options["platform"]:
+                continue
+            # delete and re-insert together, so ingest in between can neither be lost nor double counted
+            with transaction.atomic():
+                existing = SenderStats.objects.filter(platform=platform)
+                if options["account"]:
+                    existing = existing.filter(account_id=options["account"])
+                deleted, _ = existing.delete()
+                senders = self._rebuild(platform, options["account"])
+                SenderStats.objects.bulk_create(senders.values(), batch_size=options["batch_size"])
+            self.stdout.write(f"{platform}: cleared {deleted} sender rows, rebuilt {len(senders)} senders")
+
+    def _rebuild(self, platform, account_id):
+        # messages and comments of the same sender fold into one row
+        senders = {}
+        for source in SOCIAL_SOURCES.values():
+            if source.platform != platform:
+                continue
+            rows = source.model.objects.exclude(**{source.account_field: ""}).exclude(sender_id="")
+            if account_id:
+                rows = rows.filter(**{source.account_field: account_id})
+
+            grouped = rows.values(source.account_field, "sender_id").annotate(
+                count=Count("id"),
+                name=Max(source.sender_name_field),
+                first_seen=Min("timestamp"),
+                last_seen=Max("timestamp"),
+            ).order_by()
+
+            for row in grouped.iterator():
+                key = (row[source.account_field], row["sender_id"])
+                stats = senders.get(key)
+                if stats is None:
+                    stats = senders[key] = SenderStats(
+                        platform=platform,
+                        account_id=key[0],
+                        sender_id=key[1],
+                        first_seen=row["first_seen"],
+                        last_seen=row["last_seen"],
+                    )
+                stats.sender_name = stats.sender_name or (row["name"] or "")[:255]
+                stats.first_seen = min(stats.first_seen, row["first_seen"])
+                stats.last_seen = max(stats.last_seen, row["last_seen"])
+                if source.kind == "message":
+                    stats.messages += row["count"]
+                else:
+                    stats.comments += row["count"]
+                stats.interactions += row["count"]
+        return senders
@@ -0,0 +1,31 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from ...service.scheduler import node_name, run_due_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the periodic jobs (currently: snapshots of last month's reports). "
+        "Safe to run on several nodes: each job is taken under a DB lease."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval", type=int, default=None,
+            help="Seconds between checks for due jobs (default SCHEDULER_POLL_SECONDS); 0 checks once",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        if interval is None:
+            interval = getattr(settings, "SCHEDULER_POLL_SECONDS", 60)
+        owner = node_name()
+
+        while True:
+            for name, result in run_due_jobs(owner).items():
+                self.stdout.write(f"{name}: {result}")
+
+            if not interval:
+                return
+            time.sleep(interval)
@@ -0,0 +1,103 @@
+import signal
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, wait
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from ...service import feedback, tasks  # noqa: F401 (registers their tasks)
+from ...service.jobs import TASKS, heartbeat, queue_stats, reclaim_stale, requeue_dead, work
+from ...service.scheduler import node_name
+
+
+def run_process(queues, threads, poll, burst):
+    """
+    One worker process: `threads` threads claiming jobs, while the main
+    thread keeps their jobs' locks fresh and reclaims other workers' stale
+    jobs every JOB_RECLAIM_SECONDS (which must stay below JOB_STALE_SECONDS).
+    """
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *args: stop.set())
+
+    workers = [f"{node_name()}/{i}" for i in range(threads)]
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="job-worker") as pool:
+        futures = [pool.submit(work, worker, queues, poll, burst, stop) for worker in workers]
+        while True:
+            heartbeat(workers)
+            reclaim_stale()
+            done, pending = wait(futures, timeout=getattr(settings, "JOB_RECLAIM_SECONDS", 60))
+            if not pending:
+                break
+    connections.close_all()
+    return sum(future.result() for future in futures)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs (emails, live notifications, classification) from the Job table. "
+        "Safe to run on several nodes: jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queues", default="", help="Comma-separated queues to serve (default: all)")
+        parser.add_argument(
+            "--processes", type=int, default=None,
+            help="Worker processes (default JOB_WORKER_PROCESSES)",
+        )
+        parser.add_argument(
+            "--threads", type=int, default=None,
+            help="Threads per process (default JOB_WORKER_THREADS)",
+        )
+        parser.add_argument(
+            "--poll", type=float, default=None,
+            help="Seconds to wait when no job is due (default JOB_POLL_SECONDS)",
+        )
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is due")
+        parser.add_argument("--requeue-dead", action="store_true", help="Retry dead jobs (of --queues) and exit")
+        parser.add_argument("--stats", action="store_true", help="Print job counts per queue and exit")
+
+    def handle(self, *args, **options):
+        queues = [queue.strip() for queue in options["queues"].split(",") if queue.strip()]
+
+        if options["stats"]:
+            for queue, counts in queue_stats().items():
+                self.stdout.write(f"{queue}: {counts}")
+            return
+        if options["requeue_dead"]:
+            requeued = sum(requeue_dead(queue) for queue in queues) if queues else requeue_dead()
+            self.stdout.write(f"Requeued {requeued} dead jobs")
+            return
+
+        processes = options["processes"] or getattr(settings, "JOB_WORKER_PROCESSES", 1)
+        threads = options["threads"] or getattr(settings, "JOB_WORKER_THREADS", 4)
+        poll = options["poll"] if options["poll"] is not None else getattr(settings, "JOB_POLL_SECONDS", 1)
+        worker_args = (queues or None, threads, poll, options["burst"])
+        self.stdout.write(
+            f"Serving {', '.join(queues) or 'all queues'} ({', '.join(sorted(TASKS))}) "
+            f"with {processes} process(es) x {threads} thread(s)"
+        )
+
+        if processes == 1:
+            ran = run_process(*worker_args)
+            self.stdout.write(f"Ran {ran} jobs")
+            return
+
+        # children must not share the parent's DB connections
+        connections.close_all()
+        children = [
+            multiprocessing.Process(target=run_process, args=worker_args, name=f"job-worker-{i}")
+            for i in range(processes)
+        ]
+        for child in children:
+            child.start()
+
+        def forward(signum, frame):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()  # SIGTERM: children finish their running jobs, then exit
+
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+        for child in children:
+            child.join()
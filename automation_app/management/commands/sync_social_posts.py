@@ -0,0 +1,51 @@
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from ...service.social_posts import POST_SOURCES, sync_user
+
+
+class Command(BaseCommand):
+    help = (
+        "Incrementally mirror Instagram media and Facebook page posts into "
+        "SocialPost, recording engagement snapshots. Safe to run repeatedly; "
+        "use --interval to keep running as a worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--platform", choices=list(POST_SOURCES))
+        parser.add_argument("--account", help="Only one account / page id")
+        parser.add_argument("--backfill-pages", type=int, help="Older pages to backfill per account and run (0 = all)")
+        parser.add_argument("--refresh-days", type=int, help="How far back to refresh counters of recent posts")
+        parser.add_argument("--interval", type=int, default=0, help="Seconds between runs; 0 runs once")
+
+    def handle(self, *args, **options):
+        platforms = [options["platform"]] if options["platform"] else list(POST_SOURCES)
+        sync_options = {
+            "backfill_pages": options["backfill_pages"],
+            "refresh_days": options["refresh_days"],
+        }
+
+        while True:
+            for user in self.users(platforms, options["account"]):
+                user_platforms = [
+                    platform for platform in platforms
+                    if not options["account"] or getattr(user, POST_SOURCES[platform].account_field) == options["account"]
+                ]
+                results = sync_user(user, user_platforms, **sync_options)
+                for platform, result in results.items():
+                    self.stdout.write(f"{user.username} {platform}: {result}")
+
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
+
+    def users(self, platforms, account):
+        connected = Q()
+        for platform in platforms:
+            source = POST_SOURCES[platform]
+            if account:
+                connected |= Q(**{source.account_field: account})
+            else:
+                connected |= ~Q(**{source.account_field: ""}) & ~Q(**{f"{source.account_field}__isnull": True})
+        return get_user_model().objects.filter(connected).order_by("id")
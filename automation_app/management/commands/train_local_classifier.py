@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+from ...models import LocalClassifier
+from ...service.feedback import llm_labelled_samples
+from ...service.local_classifier import LocalTextClassifier, benchmark, get_local_classifier
+
+
+class Command(BaseCommand):
+    help = (
+        "Train the local sentiment/complaint classifier from stored LLM labels and "
+        "benchmark its throughput and agreement with the LLM on a holdout set"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--holdout", type=float, default=0.1, help="Share of texts kept for the benchmark")
+        parser.add_argument("--min-samples", type=int, default=200)
+        parser.add_argument("--dry-run", action="store_true", help="Benchmark without activating the model")
+        parser.add_argument(
+            "--evaluate",
+            action="store_true",
+            help="Only benchmark the active local tier against every LLM label",
+        )
+
+    def handle(self, *args, **options):
+        train_texts, train_labels = [], []
+        test_texts, test_labels = [], []
+        # split on the text hash so the holdout is stable between runs
+        cutoff = int(options["holdout"] * 256)
+        for h, text, label in llm_labelled_samples():
+            if options["evaluate"] or int(h[:2], 16) < cutoff:
+                test_texts.append(text)
+                test_labels.append(label)
+            else:
+                train_texts.append(text)
+                train_labels.append(label)
+
+        if options["evaluate"]:
+            classifier = get_local_classifier() or LocalTextClassifier()
+            self._report(classifier.version, benchmark(classifier, test_texts, test_labels))
+            return
+
+        if len(train_texts) < options["min_samples"]:
+            raise CommandError(
+                f"Only {len(train_texts)} LLM-labelled texts available, need {options['min_samples']}"
+            )
+
+        classifier = LocalTextClassifier.train(train_texts, train_labels)
+        results = benchmark(classifier, test_texts, test_labels)
+        self._report("trained model", results)
+
+        baseline = benchmark(LocalTextClassifier(), test_texts, test_labels)
+        self._report("lexicon only", baseline)
+
+        if options["dry_run"]:
+            return
+
+        row = LocalClassifier.objects.create(
+            training_size=len(train_texts),
+            holdout_size=len(test_texts),
+            sentiment_agreement=results["confident_sentiment_agreement"],
+            complaint_agreement=results["confident_complaint_agreement"],
+            coverage=results["coverage"],
+            texts_per_second=results["texts_per_second"],
+            payload=classifier.to_bytes(),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Activated {row.version} ({len(row.payload)} bytes)"))
+
+    def _report(self, name, results):
+        self.stdout.write(f"{name}:")
+        for key, value in results.items():
+            self.stdout.write(f"  {key}: {value}")
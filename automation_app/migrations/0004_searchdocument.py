@@ -0,0 +1,112 @@
+# Generated by Django 4.2.24 on 2026-10-19 12:43
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+SQLITE_FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE automation_app_searchdocument_fts USING fts5(
+        body,
+        content='automation_app_searchdocument',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER automation_app_searchdocument_ai AFTER INSERT ON automation_app_searchdocument BEGIN
+        INSERT INTO automation_app_searchdocument_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER automation_app_searchdocument_ad AFTER DELETE ON automation_app_searchdocument BEGIN
+        INSERT INTO automation_app_searchdocument_fts(automation_app_searchdocument_fts, rowid, body)
+        VALUES ('delete', old.id, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER automation_app_searchdocument_au AFTER UPDATE ON automation_app_searchdocument BEGIN
+        INSERT INTO automation_app_searchdocument_fts(automation_app_searchdocument_fts, rowid, body)
+        VALUES ('delete', old.id, old.body);
+        INSERT INTO automation_app_searchdocument_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+]
+
+SQLITE_FTS_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS automation_app_searchdocument_au",
+    "DROP TRIGGER IF EXISTS automation_app_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS automation_app_searchdocument_ai",
+    "DROP TABLE IF EXISTS automation_app_searchdocument_fts",
+]
+
+POSTGRES_FTS_SQL = [
+    """
+    ALTER TABLE automation_app_searchdocument
+    ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', coalesce(body, ''))) STORED
+    """,
+    """
+    CREATE INDEX automation_app_searchdocument_vector_gin
+    ON automation_app_searchdocument USING GIN (search_vector)
+    """,
+]
+
+POSTGRES_FTS_DROP_SQL = [
+    "DROP INDEX IF EXISTS automation_app_searchdocument_vector_gin",
+    "ALTER TABLE automation_app_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        statements = SQLITE_FTS_SQL
+    elif vendor == "postgresql":
+        statements = POSTGRES_FTS_SQL
+    else:
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        statements = SQLITE_FTS_DROP_SQL
+    elif vendor == "postgresql":
+        statements = POSTGRES_FTS_DROP_SQL
+    else:
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation_app', '0003_plan_is_active'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('instagram_message', 'Instagram Message'), ('instagram_comment', 'Instagram Comment'), ('facebook_message', 'Facebook Message'), ('facebook_comment', 'Facebook Comment'), ('business_chat', 'Business Chat Turn')], max_length=30)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('account_id', models.CharField(blank=True, default='', max_length=100)),
+                ('sender', models.CharField(blank=True, default='', max_length=100)),
+                ('body', models.TextField()),
+                ('timestamp', models.DateTimeField()),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['account_id', 'source'], name='automation__account_b31cb8_idx')],
+                'unique_together': {('source', 'object_id', 'position')},
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
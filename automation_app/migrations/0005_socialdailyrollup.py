@@ -0,0 +1,29 @@
+# Generated by Django 4.2.24 on 2026-10-19 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation_app', '0004_searchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SocialDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('instagram', 'Instagram'), ('facebook', 'Facebook')], max_length=20)),
+                ('account_id', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+                ('messages', models.PositiveIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+                ('senders', models.BinaryField(default=b'')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('platform', 'account_id', 'day')},
+            },
+        ),
+    ]
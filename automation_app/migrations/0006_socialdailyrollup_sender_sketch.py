@@ -0,0 +1,18 @@
+# Generated by Django 4.2.24 on 2026-10-19 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation_app', '0005_socialdailyrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='socialdailyrollup',
+            name='sender_sketch',
+            field=models.BinaryField(default=b''),
+        ),
+    ]
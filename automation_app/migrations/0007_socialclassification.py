@@ -0,0 +1,34 @@
+# Generated by Django 4.2.24 on 2026-10-19 12:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation_app', '0006_socialdailyrollup_sender_sketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SocialClassification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('instagram_message', 'Instagram Message'), ('instagram_comment', 'Instagram Comment'), ('facebook_message', 'Facebook Message'), ('facebook_comment', 'Facebook Comment')], max_length=30)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('platform', models.CharField(choices=[('instagram', 'Instagram'), ('facebook', 'Facebook')], max_length=20)),
+                ('account_id', models.CharField(max_length=100)),
+                ('timestamp', models.DateTimeField()),
+                ('text_hash', models.CharField(max_length=40)),
+                ('sentiment', models.CharField(blank=True, choices=[('Positive', 'Positive'), ('Neutral', 'Neutral'), ('Negative', 'Negative')], default='', max_length=10)),
+                ('is_complaint', models.BooleanField(blank=True, null=True)),
+                ('topic', models.CharField(blank=True, default='', max_length=255)),
+                ('model_version', models.CharField(blank=True, default='', max_length=100)),
+                ('classified_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['platform', 'account_id', 'timestamp'], name='automation__platfor_bf0ff8_idx'), models.Index(fields=['classified_at'], name='automation__classif_5a8e8d_idx'), models.Index(fields=['text_hash'], name='automation__text_ha_ebb366_idx')],
+                'unique_together': {('source', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.24 on 2026-10-19 12:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation_app', '0007_socialclassification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocalClassifier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trained_at', models.DateTimeField(auto_now_add=True)),
+                ('training_size', models.PositiveIntegerField(default=0)),
+                ('holdout_size', models.PositiveIntegerField(default=0)),
+                ('sentiment_agreement', models.FloatField(blank=True, null=True)),
+                ('complaint_agreement', models.FloatField(blank=True, null=True)),
+                ('coverage', models.FloatField(blank=True, null=True)),
+                ('texts_per_second', models.FloatField(blank=True, null=True)),
+                ('payload', models.BinaryField()),
+            ],
+            options={
+                'ordering': ['-trained_at'],
+            },
+        ),
+    ]
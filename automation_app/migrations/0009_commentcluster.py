@@ -0,0 +1,49 @@
+# Generated by Django 4.2.24 on 2026-10-19 12:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation_app', '0008_localclassifier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='socialdailyrollup',
+            name='duplicate_comments',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='CommentCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('instagram', 'Instagram'), ('facebook', 'Facebook')], max_length=20)),
+                ('account_id', models.CharField(max_length=100)),
+                ('simhash', models.BigIntegerField()),
+                ('band0', models.PositiveIntegerField()),
+                ('band1', models.PositiveIntegerField()),
+                ('band2', models.PositiveIntegerField()),
+                ('band3', models.PositiveIntegerField()),
+                ('first_object_id', models.PositiveBigIntegerField()),
+                ('text_hash', models.CharField(max_length=40)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['platform', 'account_id', 'band0'], name='automation__platfor_3f0d7f_idx'), models.Index(fields=['platform', 'account_id', 'band1'], name='automation__platfor_8f24e4_idx'), models.Index(fields=['platform', 'account_id', 'band2'], name='automation__platfor_516369_idx'), models.Index(fields=['platform', 'account_id', 'band3'], name='automation__platfor_d28342_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='facebookcomment',
+            name='dup_cluster',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='automation_app.commentcluster'),
+        ),
+        migrations.AddField(
+            model_name='instagramcomment',
+            name='dup_cluster',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='automation_app.commentcluster'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.24 on 2026-10-19 13:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation_app', '0009_commentcluster'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SocialPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('instagram', 'Instagram'), ('facebook', 'Facebook')], max_length=20)),
+                ('account_id', models.CharField(max_length=100)),
+                ('post_id', models.CharField(max_length=100)),
+                ('permalink', models.URLField(blank=True, default='', max_length=500)),
+                ('caption', models.TextField(blank=True, default='')),
+                ('media_type', models.CharField(blank=True, default='', max_length=30)),
+                ('posted_at', models.DateTimeField()),
+                ('likes', models.PositiveIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+                ('shares', models.PositiveIntegerField(default=0)),
+                ('engagement', models.PositiveIntegerField(default=0)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SocialSyncCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('instagram', 'Instagram'), ('facebook', 'Facebook')], max_length=20)),
+                ('account_id', models.CharField(max_length=100)),
+                ('newest_posted_at', models.DateTimeField(blank=True, null=True)),
+                ('backfill_after', models.CharField(blank=True, default='', max_length=255)),
+                ('backfilled', models.BooleanField(default=False)),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'unique_together': {('platform', 'account_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SocialPostSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField(auto_now_add=True)),
+                ('likes', models.PositiveIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+                ('shares', models.PositiveIntegerField(default=0)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='automation_app.socialpost')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='socialpost',
+            index=models.Index(fields=['platform', 'account_id', 'posted_at'], name='automation__platfor_e44d81_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='socialpost',
+            index=models.Index(fields=['platform', 'account_id', 'engagement'], name='automation__platfor_f2ce2f_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='socialpost',
+            unique_together={('platform', 'post_id')},
+        ),
+        migrations.AddIndex(
+            model_name='socialpostsnapshot',
+            index=models.Index(fields=['post', 'taken_at'], name='automation__post_id_fbda08_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.24 on 2026-10-19 13:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation_app', '0010_socialpost'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InsightSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('instagram', 'Instagram'), ('facebook', 'Facebook')], max_length=20)),
+                ('account_id', models.CharField(max_length=100)),
+                ('metric', models.CharField(max_length=100)),
+                ('resolution', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily'), ('week', 'Weekly')], default='day', max_length=10)),
+                ('day', models.DateField()),
+                ('values', models.BinaryField(default=b'')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('platform', 'account_id', 'metric', 'resolution', 'day')},
+            },
+        ),
+    ]
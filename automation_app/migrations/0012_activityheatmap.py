@@ -0,0 +1,27 @@
+# Generated by Django 4.2.24 on 2026-10-19 13:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation_app', '0011_insightseries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityHeatmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('instagram', 'Instagram'), ('facebook', 'Facebook')], max_length=20)),
+                ('account_id', models.CharField(max_length=100)),
+                ('kind', models.CharField(choices=[('message', 'Messages'), ('comment', 'Comments')], max_length=10)),
+                ('counts', models.BinaryField(default=b'')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('platform', 'account_id', 'kind')},
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.24 on 2026-10-19 13:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation_app', '0012_activityheatmap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facebookcomment',
+            name='replied_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='facebookmessage',
+            name='replied_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='instagramcomment',
+            name='replied_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='instagrammessage',
+            name='replied_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='socialdailyrollup',
+            name='replies',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='socialdailyrollup',
+            name='response_histogram',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.AddField(
+            model_name='socialdailyrollup',
+            name='response_seconds',
+            field=models.FloatField(default=0),
+        ),
+    ]
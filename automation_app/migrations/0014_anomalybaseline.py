@@ -0,0 +1,38 @@
+# Generated by Django 4.2.24 on 2026-10-19 13:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation_app', '0013_reply_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnomalyBaseline',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('instagram', 'Instagram'), ('facebook', 'Facebook')], max_length=20)),
+                ('account_id', models.CharField(max_length=100)),
+                ('kind', models.CharField(choices=[('message', 'Messages'), ('comment', 'Comments')], max_length=10)),
+                ('hour_start', models.DateTimeField(blank=True, null=True)),
+                ('hour_count', models.PositiveIntegerField(default=0)),
+                ('hour_labelled', models.PositiveIntegerField(default=0)),
+                ('hour_negative', models.PositiveIntegerField(default=0)),
+                ('hours_seen', models.PositiveIntegerField(default=0)),
+                ('volume_level', models.FloatField(default=0)),
+                ('volume_variance', models.FloatField(default=0)),
+                ('seasonal', models.BinaryField(default=b'')),
+                ('labelled_level', models.FloatField(default=0)),
+                ('negative_level', models.FloatField(default=0)),
+                ('volume_alerted_at', models.DateTimeField(blank=True, null=True)),
+                ('negative_alerted_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('platform', 'account_id', 'kind')},
+            },
+        ),
+    ]
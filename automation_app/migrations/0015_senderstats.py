@@ -0,0 +1,33 @@
+# Generated by Django 4.2.24 on 2026-10-19 13:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation_app', '0014_anomalybaseline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SenderStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('instagram', 'Instagram'), ('facebook', 'Facebook')], max_length=20)),
+                ('account_id', models.CharField(max_length=100)),
+                ('sender_id', models.CharField(max_length=100)),
+                ('sender_name', models.CharField(blank=True, default='', max_length=255)),
+                ('messages', models.PositiveIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+                ('interactions', models.PositiveIntegerField(default=0)),
+                ('first_seen', models.DateTimeField(blank=True, null=True)),
+                ('last_seen', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['platform', 'account_id', 'messages'], name='automation__platfor_fbbba8_idx'), models.Index(fields=['platform', 'account_id', 'comments'], name='automation__platfor_b863c4_idx'), models.Index(fields=['platform', 'account_id', 'interactions'], name='automation__platfor_c7a6eb_idx'), models.Index(fields=['platform', 'account_id', 'last_seen'], name='automation__platfor_721c61_idx')],
+                'unique_together': {('platform', 'account_id', 'sender_id')},
+            },
+        ),
+    ]
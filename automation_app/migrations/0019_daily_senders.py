@@ -0,0 +1,57 @@
+# Generated by Django 4.2.24 on 2026-10-19 13:56
+
+import sys
+from array import array
+from django.db import migrations, models
+
+
+def _signed(value):
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def move_sender_hashes(apps, schema_editor):
+    """Unpacks each rollup's packed sender hashes into SocialDailySender rows."""
+    SocialDailyRollup = apps.get_model("automation_app", "SocialDailyRollup")
+    SocialDailySender = apps.get_model("automation_app", "SocialDailySender")
+    rows = SocialDailyRollup.objects.exclude(senders=b"").values_list("platform", "account_id", "day", "senders")
+    for platform, account_id, day, blob in rows.iterator():
+        hashes = array("Q")
+        hashes.frombytes(bytes(blob))
+        if sys.byteorder == "big":
+            hashes.byteswap()
+        SocialDailySender.objects.bulk_create(
+            [
+                SocialDailySender(platform=platform, account_id=account_id, day=day, sender_hash=_signed(value))
+                for value in hashes
+            ],
+            batch_size=5000,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation_app', '0018_received_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SocialDailySender',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('instagram', 'Instagram'), ('facebook', 'Facebook')], max_length=20)),
+                ('account_id', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+                ('sender_hash', models.BigIntegerField()),
+            ],
+            options={
+                'unique_together': {('platform', 'account_id', 'day', 'sender_hash')},
+            },
+        ),
+        migrations.RunPython(move_sender_hashes, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='socialdailyrollup',
+            name='senders',
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser,User
 from django.db import models
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from .price import calculate_order_price
 import hashlib
 from django.utils import timezone
@@ -285,6 +286,8 @@ class InstagramMessage(models.Model):
     sender_username = models.CharField(max_length=100, blank=True, null=True)
     message = models.TextField()                 # message received from sender
     reply = models.TextField(blank=True, null=True)  # reply sent to sender
+    replied_at = models.DateTimeField(blank=True, null=True)  # when the reply went out
+    received_at = models.DateTimeField(blank=True, null=True)  # when the platform delivered it, if the webhook says
     timestamp = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -310,7 +313,16 @@ class InstagramComment(models.Model):
     sender_username = models.CharField(max_length=100, blank=True, null=True)
     comment = models.TextField()                 # comment text
     reply = models.TextField(blank=True, null=True)  # reply to comment
+    replied_at = models.DateTimeField(blank=True, null=True)  # when the reply went out
+    received_at = models.DateTimeField(blank=True, null=True)  # when the platform delivered it, if the webhook says
     timestamp = models.DateTimeField(auto_now_add=True)
+    dup_cluster = models.ForeignKey(
+        "CommentCluster",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )  # near-duplicate group, assigned on ingest
 
     class Meta:
         indexes = [
@@ -334,6 +346,8 @@ class FacebookMessage(models.Model):
     recipient_page_id = models.CharField(max_length=50)             
     message = models.TextField()                                    
     reply = models.TextField(blank=True, null=True)   
+    replied_at = models.DateTimeField(blank=True, null=True)  # when the reply went out
+    received_at = models.DateTimeField(blank=True, null=True)  # when the platform delivered it, if the webhook says
     timestamp = models.DateTimeField(auto_now_add=True)             
 
     class Meta:
@@ -357,7 +371,16 @@ class FacebookComment(models.Model):
     sender_name = models.CharField(max_length=100, blank=True, null=True)
     comment = models.TextField()                                     
     reply = models.TextField(blank=True, null=True)                   
+    replied_at = models.DateTimeField(blank=True, null=True)  # when the reply went out
+    received_at = models.DateTimeField(blank=True, null=True)  # when the platform delivered it, if the webhook says
     timestamp = models.DateTimeField(auto_now_add=True)
+    dup_cluster = models.ForeignKey(
+        "CommentCluster",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )  # near-duplicate group, assigned on ingest
 
     class Meta:
         indexes = [
@@ -508,3 +531,459 @@ class PasswordResetOTP(models.Model):
 
     def __str__(self):
         return f"OTP for {self.user} - used: {self.is_used}"
+
+
+class SearchDocument(models.Model):
+    """
+    One searchable text per social message/comment or business chat turn.
+    The full-text index itself lives outside the ORM (FTS5 table on SQLite,
+    tsvector column + GIN index on Postgres) and is created in migration 0004.
+    """
+    SOURCE_CHOICES = [
+        ("instagram_message", "Instagram Message"),
+        ("instagram_comment", "Instagram Comment"),
+        ("facebook_message", "Facebook Message"),
+        ("facebook_comment", "Facebook Comment"),
+        ("business_chat", "Business Chat Turn"),
+    ]
+
+    source = models.CharField(max_length=30, choices=SOURCE_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    position = models.PositiveIntegerField(default=0)  # turn index for business chat
+    account_id = models.CharField(max_length=100, blank=True, default="")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="search_documents"
+    )
+    sender = models.CharField(max_length=100, blank=True, default="")
+    body = models.TextField()
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("source", "object_id", "position")
+        indexes = [
+            models.Index(fields=["account_id", "source"]),
+        ]
+
+    def __str__(self):
+        return f"{self.source} #{self.object_id}"
+
+
+class SocialDailyRollup(models.Model):
+    """
+    Per (platform, account, day) counters maintained on ingest so analytics
+    endpoints never have to scan the raw message/comment tables.
+    """
+    PLATFORM_CHOICES = [
+        ("instagram", "Instagram"),
+        ("facebook", "Facebook"),
+    ]
+
+    platform = models.CharField(max_length=20, choices=PLATFORM_CHOICES)
+    account_id = models.CharField(max_length=100)
+    day = models.DateField()
+    messages = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+    # HyperLogLog sketch of the day's senders (approximate, mergeable), built
+    # from its SocialDailySender rows once the day is over
+    sender_sketch = models.BinaryField(default=b"")
+    # comments that were near-duplicates of an earlier comment (spam bursts)
+    duplicate_comments = models.PositiveIntegerField(default=0)
+    # replied messages/comments of the day, their summed response time and a
+    # packed log-bucket histogram of the response times (see latency_histogram)
+    replies = models.PositiveIntegerField(default=0)
+    response_seconds = models.FloatField(default=0)
+    response_histogram = models.BinaryField(default=b"")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("platform", "account_id", "day")
+
+    def __str__(self):
+        return f"{self.platform} {self.account_id} {self.day}"
+
+
+class SocialDailySender(models.Model):
+    """
+    One sender seen on one (platform, account, day) rollup, as a signed
+    64-bit hash of the sender id: the exact unique-sender set, kept as rows
+    so ingest adds a sender with one indexed insert.
+    """
+    platform = models.CharField(max_length=20, choices=SocialDailyRollup.PLATFORM_CHOICES)
+    account_id = models.CharField(max_length=100)
+    day = models.DateField()
+    sender_hash = models.BigIntegerField()
+
+    class Meta:
+        unique_together = ("platform", "account_id", "day", "sender_hash")
+
+    def __str__(self):
+        return f"{self.platform} {self.account_id} {self.day} {self.sender_hash}"
+
+
+class SocialClassification(models.Model):
+    """
+    Stored sentiment/complaint labels for one social message or comment.
+    Rows are created on ingest and labelled in the background; reports
+    aggregate over them instead of calling the classifier per request.
+    """
+    SOURCE_CHOICES = [
+        ("instagram_message", "Instagram Message"),
+        ("instagram_comment", "Instagram Comment"),
+        ("facebook_message", "Facebook Message"),
+        ("facebook_comment", "Facebook Comment"),
+    ]
+    SENTIMENT_CHOICES = [
+        ("Positive", "Positive"),
+        ("Neutral", "Neutral"),
+        ("Negative", "Negative"),
+    ]
+
+    source = models.CharField(max_length=30, choices=SOURCE_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    platform = models.CharField(max_length=20, choices=SocialDailyRollup.PLATFORM_CHOICES)
+    account_id = models.CharField(max_length=100)
+    timestamp = models.DateTimeField()  # copied from the message/comment
+    text_hash = models.CharField(max_length=40)
+
+    sentiment = models.CharField(max_length=10, choices=SENTIMENT_CHOICES, blank=True, default="")
+    is_complaint = models.BooleanField(null=True, blank=True)
+    topic = models.CharField(max_length=255, blank=True, default="")
+    model_version = models.CharField(max_length=100, blank=True, default="")
+    classified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("source", "object_id")
+        indexes = [
+            models.Index(fields=["platform", "account_id", "timestamp"]),
+            models.Index(fields=["classified_at"]),
+            models.Index(fields=["text_hash"]),
+        ]
+
+    def __str__(self):
+        return f"{self.source} #{self.object_id}: {self.sentiment or 'pending'}"
+
+
+class LocalClassifier(models.Model):
+    """
+    A naive Bayes sentiment/complaint model trained from stored LLM labels.
+    The newest row is the one in use; metrics come from its holdout benchmark.
+    """
+    trained_at = models.DateTimeField(auto_now_add=True)
+    training_size = models.PositiveIntegerField(default=0)
+    holdout_size = models.PositiveIntegerField(default=0)
+    sentiment_agreement = models.FloatField(null=True, blank=True)
+    complaint_agreement = models.FloatField(null=True, blank=True)
+    coverage = models.FloatField(null=True, blank=True)  # share of texts not escalated
+    texts_per_second = models.FloatField(null=True, blank=True)
+    payload = models.BinaryField()  # zlib-compressed JSON model
+
+    class Meta:
+        ordering = ["-trained_at"]
+
+    @property
+    def version(self):
+        return f"local/nb{self.pk}"
+
+    def __str__(self):
+        return f"{self.version} ({self.training_size} samples)"
+
+
+class CommentCluster(models.Model):
+    """
+    A group of near-identical comments on one account (e.g. "done ✅" under
+    a giveaway), matched by SimHash. The 64-bit hash is also stored as four
+    16-bit bands so candidate clusters can be found with indexed lookups.
+    """
+    platform = models.CharField(max_length=20, choices=SocialDailyRollup.PLATFORM_CHOICES)
+    account_id = models.CharField(max_length=100)
+    simhash = models.BigIntegerField()  # signed representation of the unsigned hash
+    band0 = models.PositiveIntegerField()
+    band1 = models.PositiveIntegerField()
+    band2 = models.PositiveIntegerField()
+    band3 = models.PositiveIntegerField()
+    first_object_id = models.PositiveBigIntegerField()
+    text_hash = models.CharField(max_length=40)  # of the first comment; shared by the cluster's labels
+    first_seen = models.DateTimeField(auto_now_add=True)
+    # refreshed at most every NEAR_DUP_TOUCH_MINUTES; clusters idle past the window stop matching
+    last_seen = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["platform", "account_id", "band0"]),
+            models.Index(fields=["platform", "account_id", "band1"]),
+            models.Index(fields=["platform", "account_id", "band2"]),
+            models.Index(fields=["platform", "account_id", "band3"]),
+        ]
+
+    def __str__(self):
+        return f"{self.platform} {self.account_id} cluster #{self.pk}"
+
+
+class SocialPost(models.Model):
+    """
+    Local mirror of an Instagram media item or Facebook page post, kept up
+    to date by the sync_social_posts worker so post analytics are DB queries
+    instead of live Graph scans.
+    """
+    platform = models.CharField(max_length=20, choices=SocialDailyRollup.PLATFORM_CHOICES)
+    account_id = models.CharField(max_length=100)
+    post_id = models.CharField(max_length=100)
+    permalink = models.URLField(max_length=500, blank=True, default="")
+    caption = models.TextField(blank=True, default="")
+    media_type = models.CharField(max_length=30, blank=True, default="")
+    posted_at = models.DateTimeField()
+    likes = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+    shares = models.PositiveIntegerField(default=0)
+    engagement = models.PositiveIntegerField(default=0)  # likes + comments, as the reports rank it
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("platform", "post_id")
+        indexes = [
+            models.Index(fields=["platform", "account_id", "posted_at"]),
+            models.Index(fields=["platform", "account_id", "engagement"]),
+        ]
+
+    def __str__(self):
+        return f"{self.platform} post {self.post_id}"
+
+
+class SocialPostSnapshot(models.Model):
+    """Engagement counters of a SocialPost at one sync, recorded when they changed."""
+    post = models.ForeignKey(SocialPost, on_delete=models.CASCADE, related_name="snapshots")
+    taken_at = models.DateTimeField(auto_now_add=True)
+    likes = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+    shares = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["post", "taken_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.post} @ {self.taken_at}"
+
+
+class SocialSyncCursor(models.Model):
+    """Where the post sync of one account left off."""
+    platform = models.CharField(max_length=20, choices=SocialDailyRollup.PLATFORM_CHOICES)
+    account_id = models.CharField(max_length=100)
+    newest_posted_at = models.DateTimeField(null=True, blank=True)
+    # Graph "after" cursor of the next older page still to be backfilled
+    backfill_after = models.CharField(max_length=255, blank=True, default="")
+    backfilled = models.BooleanField(default=False)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+
+    class Meta:
+        unique_together = ("platform", "account_id")
+
+    def __str__(self):
+        return f"{self.platform} {self.account_id} sync"
+
+
+class InsightSeries(models.Model):
+    """
+    One bucket of one insights metric for an account. `values` is a packed
+    little-endian float64 array (NaN = no sample): 24 hourly samples for
+    "hour" rows, a single value for "day" rows, and a single value for
+    "week" rows, whose `day` is the Monday starting the week. Old hourly
+    and daily rows are downsampled by collect_insights.
+    """
+    RESOLUTION_CHOICES = [
+        ("hour", "Hourly"),
+        ("day", "Daily"),
+        ("week", "Weekly"),
+    ]
+
+    platform = models.CharField(max_length=20, choices=SocialDailyRollup.PLATFORM_CHOICES)
+    account_id = models.CharField(max_length=100)
+    metric = models.CharField(max_length=100)
+    resolution = models.CharField(max_length=10, choices=RESOLUTION_CHOICES, default="day")
+    day = models.DateField()
+    values = models.BinaryField(default=b"")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("platform", "account_id", "metric", "resolution", "day")
+
+    def __str__(self):
+        return f"{self.platform} {self.account_id} {self.metric} {self.resolution} {self.day}"
+
+
+class ActivityHeatmap(models.Model):
+    """
+    All-time day-of-week x hour-of-day (UTC) activity of one account: 168
+    packed little-endian uint32 counters, Monday 00:00 first. Incremented
+    on ingest, so reading the matrix is a single-row lookup.
+    """
+    KIND_CHOICES = [
+        ("message", "Messages"),
+        ("comment", "Comments"),
+    ]
+
+    platform = models.CharField(max_length=20, choices=SocialDailyRollup.PLATFORM_CHOICES)
+    account_id = models.CharField(max_length=100)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    counts = models.BinaryField(default=b"")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("platform", "account_id", "kind")
+
+    def __str__(self):
+        return f"{self.platform} {self.account_id} {self.kind} heatmap"
+
+
+class AnomalyBaseline(models.Model):
+    """
+    Streaming baselines of one account's hourly message (or comment) volume
+    and negative-sentiment rate, updated on ingest and labelling. Constant
+    size per account: EWMA level/variance, 168 packed float64 seasonal
+    (hour-of-week, UTC) levels and the counters of the open hour.
+    """
+    KIND_CHOICES = ActivityHeatmap.KIND_CHOICES
+
+    platform = models.CharField(max_length=20, choices=SocialDailyRollup.PLATFORM_CHOICES)
+    account_id = models.CharField(max_length=100)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+
+    # the open hour and what has arrived in it so far
+    hour_start = models.DateTimeField(null=True, blank=True)
+    hour_count = models.PositiveIntegerField(default=0)
+    hour_labelled = models.PositiveIntegerField(default=0)
+    hour_negative = models.PositiveIntegerField(default=0)
+
+    hours_seen = models.PositiveIntegerField(default=0)
+    volume_level = models.FloatField(default=0)
+    volume_variance = models.FloatField(default=0)
+    seasonal = models.BinaryField(default=b"")
+    # EWMAs of labelled and negative items per hour; their ratio is the baseline rate
+    labelled_level = models.FloatField(default=0)
+    negative_level = models.FloatField(default=0)
+
+    volume_alerted_at = models.DateTimeField(null=True, blank=True)
+    negative_alerted_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("platform", "account_id", "kind")
+
+    def __str__(self):
+        return f"{self.platform} {self.account_id} {self.kind} baseline"
+
+
+class SenderStats(models.Model):
+    """
+    Per (platform, account, sender) interaction counters, upserted on
+    ingest, so leaderboards and fan queries are indexed reads instead of
+    GROUP BYs over the message history.
+    """
+    platform = models.CharField(max_length=20, choices=SocialDailyRollup.PLATFORM_CHOICES)
+    account_id = models.CharField(max_length=100)
+    sender_id = models.CharField(max_length=100)
+    sender_name = models.CharField(max_length=255, blank=True, default="")  # latest known
+    messages = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+    interactions = models.PositiveIntegerField(default=0)  # messages + comments
+    first_seen = models.DateTimeField(null=True, blank=True)
+    last_seen = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("platform", "account_id", "sender_id")
+        indexes = [
+            models.Index(fields=["platform", "account_id", "messages"]),
+            models.Index(fields=["platform", "account_id", "comments"]),
+            models.Index(fields=["platform", "account_id", "interactions"]),
+            models.Index(fields=["platform", "account_id", "last_seen"]),
+        ]
+
+    def __str__(self):
+        return f"{self.platform} {self.account_id} {self.sender_name or self.sender_id}"
+
+
+class SchedulerLease(models.Model):
+    """
+    One row per scheduled job: who holds its lease and when it last ran.
+    The scheduler takes the lease with a single conditional UPDATE, so only
+    one node runs a job at a time.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    owner = models.CharField(max_length=255, blank=True, default="")
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_finished_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+
+    def __str__(self):
+        return f"{self.name} ({self.owner or 'free'})"
+
+
+class ReportSnapshot(models.Model):
+    """
+    A finished month's report for one account, computed once by the
+    scheduler (or on first request) and never modified afterwards.
+    """
+    REPORT_CHOICES = [
+        ("monthly_report", "Monthly report"),
+        ("best_worst_posts", "Best/worst posts"),
+        ("complaints_and_reviews", "Complaints and reviews"),
+    ]
+
+    platform = models.CharField(max_length=20, choices=SocialDailyRollup.PLATFORM_CHOICES)
+    account_id = models.CharField(max_length=100)
+    report = models.CharField(max_length=30, choices=REPORT_CHOICES)
+    period = models.DateField()  # first day of the month
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("platform", "account_id", "report", "period")
+
+    def __str__(self):
+        return f"{self.platform} {self.account_id} {self.report} {self.period:%Y-%m}"
+
+
+class Job(models.Model):
+    """
+    A deferred call of a registered task (service/jobs.py), run by the
+    runworker command. Finished jobs are deleted; jobs that keep failing
+    stay behind as "dead" letters with their last error.
+    """
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("dead", "Dead"),
+    ]
+
+    queue = models.CharField(max_length=50, default="default")
+    task = models.CharField(max_length=100)
+    args = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    kwargs = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    priority = models.IntegerField(default=0)  # higher runs first
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    # at most one queued job per non-empty key (e.g. one pending classification drain)
+    dedupe_key = models.CharField(max_length=100, blank=True, default="")
+    locked_by = models.CharField(max_length=255, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "queue", "priority", "run_at"]),
+            models.Index(fields=["dedupe_key", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.task} [{self.queue}] {self.status}"
@@ -171,13 +171,13 @@ class InstagramIDUpdateSerializer(serializers.ModelSerializer):
 class InstagramMessageSerializer(serializers.ModelSerializer):
     class Meta:
         model = InstagramMessage
-        fields = ['id', 'user', 'recipient_id', 'sender_id', 'sender_username', 'message', 'reply', 'timestamp']
+        fields = ['id', 'user', 'recipient_id', 'sender_id', 'sender_username', 'message', 'reply', 'replied_at', 'received_at', 'timestamp']
         read_only_fields = ['id', 'timestamp', 'user']
 
 class InstagramCommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = InstagramComment
-        fields = ['id', 'user', 'recipient_id', 'sender_id', 'sender_username', 'comment', 'reply', 'timestamp']
+        fields = ['id', 'user', 'recipient_id', 'sender_id', 'sender_username', 'comment', 'reply', 'replied_at', 'received_at', 'timestamp']
         read_only_fields = ['id', 'timestamp', 'user']
 
 
@@ -197,6 +197,8 @@ class FacebookMessageSerializer(serializers.ModelSerializer):
             'recipient_page_id',
             'message',
             'reply',
+            'replied_at',
+            'received_at',
         ]
         read_only_fields = ['id', 'user']
 
@@ -212,6 +214,8 @@ class FacebookCommentSerializer(serializers.ModelSerializer):
             'sender_name',
             'comment',
             'reply',
+            'replied_at',
+            'received_at',
             'timestamp',
         ]
         read_only_fields = ['id', 'timestamp', 'user']
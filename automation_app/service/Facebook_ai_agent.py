@@ -3,12 +3,12 @@ import json
 from django.utils import timezone
 from openai import OpenAI
 
-from .Facebook_reports import (
-    monthly_report,
-    best_worst_posts,
-    complaints_and_reviews
-)
-from .model_extractors import most_active_users
+from .Facebook_reports import post_statistics
+from .report_snapshots import get_report
+from .model_extractors import Facebook_most_active_users
+from .heatmap import activity_heatmap
+from .sender_stats import sender_report
+from . import analytics
 
 
 SYSTEM_PROMPT = """
@@ -69,6 +69,68 @@ TOOLS = [
             }
         }
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "post_statistics",
+            "description": "Get Facebook post engagement statistics: percentiles, engagement rate, trends, best days and hours to post, and outlier posts. Omit year and month for the whole history",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "year": {"type": "integer"},
+                    "month": {"type": "integer"}
+                }
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "activity_heatmap",
+            "description": "Get when the Facebook audience is active: messages or comments by day of week and hour of day, with the busiest times",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "kind": {"type": "string", "enum": ["message", "comment"]},
+                    "timezone": {"type": "string", "description": "IANA time zone for the hours, e.g. Asia/Riyadh"}
+                }
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "analytics_query",
+            "description": "Flexible Facebook analytics: pick metrics and optionally group them by day, month or sender (top senders), or by post for post metrics, over a date range. Metrics: messages, comments, conversations, replies, response_seconds_avg, response_seconds_p50, response_seconds_p90, response_seconds_p99, posts, likes, post_comments, shares, engagement, avg_engagement, positive, neutral, negative, complaints",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "metrics": {"type": "array", "items": {"type": "string"}},
+                    "dimensions": {"type": "array", "items": {"type": "string", "enum": ["day", "month", "sender", "post"]}},
+                    "start_date": {"type": "string", "description": "YYYY-MM-DD"},
+                    "end_date": {"type": "string", "description": "YYYY-MM-DD"},
+                    "order_by": {"type": "string", "description": "A requested metric, prefixed with - for descending"},
+                    "limit": {"type": "integer"}
+                },
+                "required": ["metrics"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "fans",
+            "description": "Get Facebook fans: top_fans are the most engaged senders active in the last `days` days, churned_fans are once-engaged senders silent for `days` days",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "view": {"type": "string", "enum": ["top_fans", "churned_fans"]},
+                    "days": {"type": "integer"}
+                },
+                "required": ["view"]
+            }
+        }
+    },
     {
         "type": "function",
         "function": {
@@ -117,16 +179,36 @@ def run_ai_agent1(user, user_message):
             month = args.get("month", today.month)
 
             if tool_call.function.name == "monthly_report":
-                result = monthly_report(user, year, month)
+                result = get_report(user, "facebook", "monthly_report", year, month)
 
             elif tool_call.function.name == "best_worst_posts":
-                result = best_worst_posts(user, year, month)
+                result = get_report(user, "facebook", "best_worst_posts", year, month)
 
             elif tool_call.function.name == "complaints_and_reviews":
-                result = complaints_and_reviews(user, year, month)
+                result = get_report(user, "facebook", "complaints_and_reviews", year, month)
+
+            elif tool_call.function.name == "post_statistics":
+                result = post_statistics(user, args.get("year"), args.get("month"))
+
+            elif tool_call.function.name == "activity_heatmap":
+                try:
+                    result = activity_heatmap(
+                        "facebook", user.facebook_page_id, args.get("kind", "message"), args.get("timezone")
+                    )
+                except ValueError as e:
+                    result = {"error": str(e)}
+
+            elif tool_call.function.name == "analytics_query":
+                result = analytics.run_query_tool({"facebook": user.facebook_page_id}, args)
+
+            elif tool_call.function.name == "fans":
+                try:
+                    result = sender_report("facebook", user.facebook_page_id, args.get("view", "top_fans"), days=args.get("days", 30))
+                except ValueError as e:
+                    result = {"error": str(e)}
 
             elif tool_call.function.name == "most_active_users":
-                result = most_active_users(user)
+                result = Facebook_most_active_users(user)
 
             else:
                 result = {"error": "Unknown tool"}
@@ -1,123 +1,93 @@
-from datetime import datetime, time
-from collections import Counter
-from ..utils import get_month_range, gpt_classify_text
-from ..models import FacebookMessage, FacebookComment
-import requests
+from .feedback import feedback_report
+from ..utils import get_month_range
+from .graph_client import GraphAPIError
+from . import analytics, social_posts, post_stats
 
 
-def monthly_report(user, year, month):
-    start_date, end_date = get_month_range(year, month)
+def monthly_report(user, year, month, exact=False, include_bursts=True):
     page_id = user.facebook_page_id
 
     if not page_id:
         return {"error": "Facebook page not connected"}
 
-    start_dt = datetime.combine(start_date, time.min)
-    end_dt = datetime.combine(end_date, time.max)
-
-    messages = FacebookMessage.objects.filter(
-        recipient_page_id=page_id,
-        timestamp__range=(start_dt, end_dt)
-    )
-
-    comments = FacebookComment.objects.filter(
-        recipient_id=page_id,
-        timestamp__range=(start_dt, end_dt)
+    return analytics.monthly_report(
+        "facebook", page_id, year, month, exact=exact, include_bursts=include_bursts
     )
 
-    unique_senders = set(
-        list(messages.values_list("sender_id", flat=True)) +
-        list(comments.values_list("sender_id", flat=True))
-    )
 
-    days = (end_date - start_date).days + 1
 
+def _post_dict(post, score):
+    # same shape as the Graph posts this report used to return
     return {
-        "period": start_date.strftime("%Y-%m"),
-        "messages_total": messages.count(),
-        "messages_daily_avg": round(messages.count() / days, 2),
-        "comments_total": comments.count(),
-        "comments_daily_avg": round(comments.count() / days, 2),
-        "conversations": len(unique_senders),
+        "id": post.post_id,
+        "created_time": post.posted_at.isoformat(),
+        "permalink_url": post.permalink,
+        "likes": post.likes,
+        "comments_count": post.comments,
+        "engagement": post.engagement,
+        "score": score,
     }
 
 
-
-def best_worst_posts(user, year, month):
+def best_worst_posts(user, year, month, limit=1, weights=None):
+    """
+    Best and worst posts of a month from the synced post mirror, ranked by
+    likes + comments unless other score `weights` are given. best_post /
+    worst_post are the top entries of the `limit`-long lists.
+    """
     start_date, end_date = get_month_range(year, month)
 
     if not user.facebook_page_id or not user.facebook_access_token:
         return {"error": "Facebook page or access token missing"}
 
-    url = f"https://graph.facebook.com/v24.0/{user.facebook_page_id}/posts"
-    params = {
-        "fields": "id,created_time,permalink_url,likes.summary(true),comments.summary(true)",
-        "access_token": user.facebook_access_token,
-        "limit": 50
-    }
+    try:
+        social_posts.ensure_synced("facebook", user.facebook_page_id, user.facebook_access_token)
+    except GraphAPIError as e:
+        return {"error": "Facebook API error", "details": e.payload}
 
-    data = requests.get(url, params=params).json().get("data", [])
+    result = social_posts.best_worst_posts("facebook", user.facebook_page_id, start_date, end_date, limit, weights)
+    if result is None:
+        return social_posts.still_syncing("facebook", user.facebook_page_id, start_date)
 
-    posts = []
-    for post in data:
-        post_date = datetime.fromisoformat(
-            post["created_time"].replace("Z", "+00:00")
-        ).date()
+    best = [_post_dict(post, score) for score, post in result["best"]]
+    worst = [_post_dict(post, score) for score, post in result["worst"]]
+    return {
+        "best_post": best[0],
+        "worst_post": worst[0],
+        "best_posts": best,
+        "worst_posts": worst,
+    }
 
-        if start_date <= post_date <= end_date:
-            likes = post.get("likes", {}).get("summary", {}).get("total_count", 0)
-            comments = post.get("comments", {}).get("summary", {}).get("total_count", 0)
 
-            post["likes"] = likes
-            post["comments_count"] = comments
-            post["engagement"] = likes + comments
 
-            posts.append(post)
+def post_statistics(user, year=None, month=None):
+    """
+    Percentiles, trends, day/hour effects and outliers of post engagement
+    for one month, or the whole synced history when no month is given.
+    """
+    start_date = end_date = None
+    if year and month:
+        start_date, end_date = get_month_range(year, month)
 
-    if not posts:
-        return None
+    if not user.facebook_page_id or not user.facebook_access_token:
+        return {"error": "Facebook page or access token missing"}
 
-    return {
-        "best_post": max(posts, key=lambda x: x["engagement"]),
-        "worst_post": min(posts, key=lambda x: x["engagement"]),
-    }
+    try:
+        social_posts.ensure_synced("facebook", user.facebook_page_id, user.facebook_access_token)
+    except GraphAPIError as e:
+        return {"error": "Facebook API error", "details": e.payload}
 
+    stats = post_stats.post_statistics("facebook", user.facebook_page_id, start_date, end_date)
+    if stats is None:
+        return social_posts.still_syncing("facebook", user.facebook_page_id, start_date) or {"message": "No posts in this period"}
+    return stats
 
 
-def complaints_and_reviews(user, year, month):
+def complaints_and_reviews(user, year, month, include_bursts=True):
     start_date, end_date = get_month_range(year, month)
     page_id = user.facebook_page_id
 
     if not page_id:
         return {"error": "Facebook page not connected"}
 
-    messages = FacebookMessage.objects.filter(
-        recipient_page_id=page_id,
-        timestamp__date__range=(start_date, end_date)
-    )
-
-    comments = FacebookComment.objects.filter(
-        recipient_id=page_id,
-        timestamp__date__range=(start_date, end_date)
-    )
-
-    complaints = []
-    sentiment = {"Positive": 0, "Neutral": 0, "Negative": 0}
-
-    for obj in list(messages) + list(comments):
-        text = getattr(obj, "message", None) or obj.comment
-
-        s = gpt_classify_text(text, "sentiment")
-        c = gpt_classify_text(text, "complaint")
-
-        if s in sentiment:
-            sentiment[s] += 1
-        if c == "Yes":
-            complaints.append(text)
-
-    top = Counter(complaints).most_common(5)
-
-    return {
-        "sentiment": sentiment,
-        "top_complaints": [{"topic": k, "count": v} for k, v in top]
-    }
+    return feedback_report("facebook", page_id, start_date, end_date, include_bursts=include_bursts)
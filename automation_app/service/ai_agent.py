@@ -3,12 +3,11 @@ import json
 from django.utils import timezone
 from openai import OpenAI
 
-from .instagram_reports import (
-    monthly_report,
-    best_worst_posts,
-    complaints_and_reviews
-)
+from .report_snapshots import get_report
 from .model_extractors import most_active_users
+from .heatmap import activity_heatmap
+from .sender_stats import sender_report
+from . import analytics, instagram_reports
 
 
 SYSTEM_PROMPT = """
@@ -69,6 +68,68 @@ TOOLS = [
             }
         }
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "post_statistics",
+            "description": "Get Instagram post engagement statistics: percentiles, engagement rate, trends, best days and hours to post, and outlier posts. Omit year and month for the whole history",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "year": {"type": "integer"},
+                    "month": {"type": "integer"}
+                }
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "activity_heatmap",
+            "description": "Get when the Instagram audience is active: messages or comments by day of week and hour of day, with the busiest times",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "kind": {"type": "string", "enum": ["message", "comment"]},
+                    "timezone": {"type": "string", "description": "IANA time zone for the hours, e.g. Asia/Riyadh"}
+                }
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "analytics_query",
+            "description": "Flexible Instagram analytics: pick metrics and optionally group them by day, month or sender (top senders), or by post for post metrics, over a date range. Metrics: messages, comments, conversations, replies, response_seconds_avg, response_seconds_p50, response_seconds_p90, response_seconds_p99, posts, likes, post_comments, shares, engagement, avg_engagement, positive, neutral, negative, complaints",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "metrics": {"type": "array", "items": {"type": "string"}},
+                    "dimensions": {"type": "array", "items": {"type": "string", "enum": ["day", "month", "sender", "post"]}},
+                    "start_date": {"type": "string", "description": "YYYY-MM-DD"},
+                    "end_date": {"type": "string", "description": "YYYY-MM-DD"},
+                    "order_by": {"type": "string", "description": "A requested metric, prefixed with - for descending"},
+                    "limit": {"type": "integer"}
+                },
+                "required": ["metrics"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "fans",
+            "description": "Get Instagram fans: top_fans are the most engaged senders active in the last `days` days, churned_fans are once-engaged senders silent for `days` days",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "view": {"type": "string", "enum": ["top_fans", "churned_fans"]},
+                    "days": {"type": "integer"}
+                },
+                "required": ["view"]
+            }
+        }
+    },
     {
         "type": "function",
         "function": {
@@ -125,13 +186,33 @@ def run_ai_agent(user, user_message):
             month = args.get("month", today.month)
 
             if tool_name == "monthly_report":
-                result = monthly_report(user, year=year, month=month)
+                result = get_report(user, "instagram", "monthly_report", year, month)
 
             elif tool_name == "best_worst_posts":
-                result = best_worst_posts(user, year=year, month=month)
+                result = get_report(user, "instagram", "best_worst_posts", year, month)
 
             elif tool_name == "complaints_and_reviews":
-                result = complaints_and_reviews(user, year=year, month=month)
+                result = get_report(user, "instagram", "complaints_and_reviews", year, month)
+
+            elif tool_name == "post_statistics":
+                result = instagram_reports.post_statistics(user, args.get("year"), args.get("month"))
+
+            elif tool_name == "activity_heatmap":
+                try:
+                    result = activity_heatmap(
+                        "instagram", user.instagram_account_id, args.get("kind", "message"), args.get("timezone")
+                    )
+                except ValueError as e:
+                    result = {"error": str(e)}
+
+            elif tool_name == "analytics_query":
+                result = analytics.run_query_tool({"instagram": user.instagram_account_id}, args)
+
+            elif tool_name == "fans":
+                try:
+                    result = sender_report("instagram", user.instagram_account_id, args.get("view", "top_fans"), days=args.get("days", 30))
+                except ValueError as e:
+                    result = {"error": str(e)}
 
             elif tool_name == "most_active_users":
                 result = most_active_users(user)
@@ -155,27 +236,3 @@ def run_ai_agent(user, user_message):
         return final.choices[0].message.content
 
     return msg.content
-
-# Facebok ----------------------------------------------------------------------------
-
-
-from .Facebook_reports import (
-    monthly_report,
-    best_worst_posts,
-    complaints_and_reviews
-)
-from .model_extractors import most_active_users
-
-SYSTEM_PROMPT = """
-You are an AI assistant for Facebook business analytics.
-
-Rules:
-- Use tools only
-- Never guess
-- Use today's date to resolve phrases like "this month" or "last month"
-- If no data exists, say so clearly
-- Summarize insights clearly and professionally
-"""
-
-
-
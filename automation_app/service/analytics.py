@@ -0,0 +1,386 @@
+"""
+One query layer over the analytics tables. Callers name accounts (one or
+more platforms), metrics, dimensions and a date range; query() compiles
+that into one grouped aggregate per table involved:
+
+  rollups  SocialDailyRollup (messages, comments, senders, response times),
+           with SocialDailySender for exact unique senders
+  posts    SocialPost mirror (likes, comments, shares, engagement)
+  labels   SocialClassification (sentiment and complaint counts)
+  senders  SenderStats for all-time per-sender counts; the raw
+           message/comment tables when the sender dimension is combined
+           with a date range or day/month
+
+Sketch-backed metrics (conversations, response percentiles) are merged in
+Python from the same grouped rollup rows, never from raw messages.
+"""
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from functools import reduce
+from operator import or_
+from django.db.models import Avg, Count, F, Max, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from ..models import SocialDailyRollup, SocialDailySender, SocialPost, SocialClassification, SenderStats
+from ..utils import get_month_range
+from .hyperloglog import HyperLogLog
+from .latency_histogram import LatencyHistogram
+from .response_times import response_time_summary
+from .rollups import rollup_sketch
+from .social_sources import PLATFORM_ACCOUNT_ATTRS, SOCIAL_SOURCES
+
+
+Table = namedtuple("Table", ["model", "dimensions"])
+Metric = namedtuple("Metric", ["table", "aggregate", "default"])
+
+TABLES = {
+    "rollups": Table(SocialDailyRollup, {
+        "day": F("day"),
+        "month": TruncMonth("day"),
+        "platform": F("platform"),
+    }),
+    "posts": Table(SocialPost, {
+        "day": TruncDate("posted_at", tzinfo=dt_timezone.utc),
+        "month": TruncMonth("posted_at", tzinfo=dt_timezone.utc),
+        "platform": F("platform"),
+        "post": F("post_id"),
+    }),
+    "labels": Table(SocialClassification, {
+        "day": TruncDate("timestamp"),
+        "month": TruncMonth("timestamp"),
+        "platform": F("platform"),
+    }),
+}
+
+# metrics with aggregate None are merged from sketches/histograms after the query
+METRICS = {
+    "messages": Metric("rollups", Sum("messages"), 0),
+    "comments": Metric("rollups", Sum("comments"), 0),
+    "duplicate_comments": Metric("rollups", Sum("duplicate_comments"), 0),
+    "conversations": Metric("rollups", None, 0),
+    "replies": Metric("rollups", Sum("replies"), 0),
+    "response_seconds_avg": Metric("rollups", None, None),
+    "response_seconds_p50": Metric("rollups", None, None),
+    "response_seconds_p90": Metric("rollups", None, None),
+    "response_seconds_p99": Metric("rollups", None, None),
+    "posts": Metric("posts", Count("id"), 0),
+    "likes": Metric("posts", Sum("likes"), 0),
+    "post_comments": Metric("posts", Sum("comments"), 0),
+    "shares": Metric("posts", Sum("shares"), 0),
+    "engagement": Metric("posts", Sum("engagement"), 0),
+    "avg_engagement": Metric("posts", Avg("engagement"), None),
+    "positive": Metric("labels", Count("id", filter=Q(sentiment="Positive")), 0),
+    "neutral": Metric("labels", Count("id", filter=Q(sentiment="Neutral")), 0),
+    "negative": Metric("labels", Count("id", filter=Q(sentiment="Negative")), 0),
+    "complaints": Metric("labels", Count("id", filter=Q(is_complaint=True)), 0),
+}
+
+DIMENSIONS = ["day", "month", "platform", "sender", "post"]
+
+# per-sender counts come from the raw tables (the rollups only keep hashes)
+SENDER_DIMENSIONS = {
+    "day": TruncDate("timestamp"),
+    "month": TruncMonth("timestamp"),
+    "sender": F("sender_id"),
+}
+
+_PERCENTILES = {"response_seconds_p50": 0.5, "response_seconds_p90": 0.9, "response_seconds_p99": 0.99}
+
+
+def user_accounts(user, platforms=None):
+    """{platform: account id} of the user's connected accounts, optionally limited to `platforms`."""
+    return {
+        platform: getattr(user, attr)
+        for platform, attr in PLATFORM_ACCOUNT_ATTRS.items()
+        if getattr(user, attr) and (not platforms or platform in platforms)
+    }
+
+
+def _account_filter(accounts):
+    return reduce(or_, (Q(platform=platform, account_id=account_id) for platform, account_id in accounts.items()))
+
+
+def _date_filter(table_name, start_date, end_date):
+    if table_name == "rollups":
+        field, lower, upper = "day", start_date, end_date
+    elif table_name == "posts":
+        # posts are bucketed by their UTC publish date, as in social_posts.period_posts
+        field = "posted_at"
+        lower = start_date and datetime.combine(start_date, time.min, tzinfo=dt_timezone.utc)
+        upper = end_date and datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=dt_timezone.utc)
+        return Q(**{f"{field}__gte": lower} if lower else {}) & Q(**{f"{field}__lt": upper} if upper else {})
+    else:
+        field, lower, upper = "timestamp__date", start_date, end_date
+    return Q(**{f"{field}__gte": lower} if lower else {}) & Q(**{f"{field}__lte": upper} if upper else {})
+
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _grouped(queryset, dimensions, expressions):
+    """Annotates dimension aliases and returns a .values() queryset grouped by them."""
+    aliases = {f"dim_{name}": expressions[name] for name in dimensions}
+    return queryset.annotate(**aliases).values(*aliases), list(aliases)
+
+
+def _rollup_sketches(queryset, senders, dimensions, names, exact):
+    """
+    Per-group conversations and response-time metrics merged from the rollup
+    rows; exact conversations are a distinct count over the `senders` rows.
+    """
+    grouped, aliases = _grouped(queryset, dimensions, TABLES["rollups"].dimensions)
+    fields = ["platform", "account_id", "day", "sender_sketch", "response_histogram", "response_seconds", "replies"]
+    groups = {}
+    for row in grouped.values(*aliases, *fields).iterator():
+        key = tuple(_json_value(row[alias]) for alias in aliases)
+        group = groups.setdefault(key, {
+            "sketch": HyperLogLog(), "histogram": LatencyHistogram(), "seconds": 0.0, "replies": 0,
+        })
+        if "conversations" in names and not exact:
+            group["sketch"].merge(rollup_sketch(row["platform"], row["account_id"], row["day"], row["sender_sketch"]))
+        if row["replies"]:
+            group["histogram"].merge(LatencyHistogram.from_bytes(row["response_histogram"]))
+            group["seconds"] += row["response_seconds"]
+            group["replies"] += row["replies"]
+
+    unique_senders = {}
+    if "conversations" in names and exact:
+        grouped, aliases = _grouped(senders, dimensions, TABLES["rollups"].dimensions)
+        for row in grouped.annotate(n=Count("sender_hash", distinct=True)).order_by():
+            unique_senders[tuple(_json_value(row[alias]) for alias in aliases)] = row["n"]
+
+    results = {}
+    for key, group in groups.items():
+        values = {}
+        if "conversations" in names:
+            values["conversations"] = unique_senders.get(key, 0) if exact else group["sketch"].count()
+        if "response_seconds_avg" in names:
+            values["response_seconds_avg"] = round(group["seconds"] / group["replies"], 1) if group["replies"] else None
+        for name, q in _PERCENTILES.items():
+            if name in names:
+                value = group["histogram"].quantile(q)
+                values[name] = None if value is None else round(value, 1)
+        results[key] = values
+    return results
+
+
+def _sender_totals(accounts, dimensions):
+    """All-time messages/comments per sender, read from the SenderStats rows."""
+    groups = {}
+    rows = SenderStats.objects.filter(_account_filter(accounts)).values_list(
+        "platform", "sender_id", "sender_name", "messages", "comments"
+    )
+    for platform, sender_id, sender_name, messages, comments in rows.iterator():
+        values = {"platform": platform, "sender": sender_id}
+        group = groups.setdefault(tuple(values[d] for d in dimensions), {})
+        group["sender_name"] = group.get("sender_name") or sender_name
+        group["messages"] = group.get("messages", 0) + messages
+        group["comments"] = group.get("comments", 0) + comments
+    return groups
+
+
+def _sender_counts(accounts, metrics, dimensions, start_date, end_date):
+    """messages/comments per sender (plus day/month/platform), one grouped query per raw table."""
+    if not start_date and not end_date and set(dimensions) <= {"sender", "platform"}:
+        return _sender_totals(accounts, dimensions)
+
+    groups = {}
+    for source in SOCIAL_SOURCES.values():
+        name = "messages" if source.kind == "message" else "comments"
+        if name not in metrics or source.platform not in accounts:
+            continue
+        rows = source.model.objects.filter(**{source.account_field: accounts[source.platform]})
+        if start_date:
+            rows = rows.filter(timestamp__date__gte=start_date)
+        if end_date:
+            rows = rows.filter(timestamp__date__lte=end_date)
+
+        # the raw tables have no platform column; it is the source's
+        columns = [d for d in dimensions if d != "platform"]
+        grouped = rows.annotate(**{f"dim_{d}": SENDER_DIMENSIONS[d] for d in columns}).values(
+            *(f"dim_{d}" for d in columns)
+        )
+        for row in grouped.annotate(total=Count("id"), name=Max(source.sender_name_field)).order_by():
+            values = {d: source.platform if d == "platform" else _json_value(row[f"dim_{d}"]) for d in dimensions}
+            group = groups.setdefault(tuple(values[d] for d in dimensions), {})
+            group["sender_name"] = group.get("sender_name") or row["name"]
+            group[name] = group.get(name, 0) + row["total"]
+    return groups
+
+
+def _table_groups(table_name, names, accounts, dimensions, start_date, end_date, exact, include_bursts):
+    table = TABLES[table_name]
+    for dimension in dimensions:
+        if dimension not in table.dimensions:
+            raise ValueError(f"{', '.join(names)} cannot be grouped by {dimension}")
+
+    queryset = table.model.objects.filter(_account_filter(accounts)).filter(
+        _date_filter(table_name, start_date, end_date)
+    )
+    aggregates = {name: METRICS[name].aggregate for name in names if METRICS[name].aggregate is not None}
+    if "comments" in aggregates and not include_bursts:
+        aggregates["burst_comments"] = Sum("duplicate_comments")
+
+    groups = {}
+    if aggregates and dimensions:
+        grouped, aliases = _grouped(queryset, dimensions, table.dimensions)
+        rows = grouped.annotate(**aggregates).order_by()
+        for row in rows:
+            groups[tuple(_json_value(row[alias]) for alias in aliases)] = {name: row[name] for name in aggregates}
+    elif aggregates:
+        groups[()] = queryset.aggregate(**aggregates)
+
+    for values in groups.values():
+        burst_comments = values.pop("burst_comments", None)
+        if burst_comments:
+            values["comments"] -= burst_comments
+        if values.get("avg_engagement") is not None:
+            values["avg_engagement"] = round(values["avg_engagement"], 2)
+
+    sketched = [name for name in names if METRICS[name].aggregate is None]
+    if sketched:
+        senders = SocialDailySender.objects.filter(_account_filter(accounts)).filter(
+            _date_filter(table_name, start_date, end_date)
+        )
+        for key, values in _rollup_sketches(queryset, senders, dimensions, sketched, exact).items():
+            groups.setdefault(key, {}).update(values)
+    return groups
+
+
+def _sort_key(value):
+    # None sorts last in ascending order, whatever the column type
+    return (value is None, value if value is not None else 0)
+
+
+def query(
+    accounts, metrics, dimensions=(), start_date=None, end_date=None,
+    exact=False, include_bursts=True, order_by=None, limit=None,
+):
+    """
+    Runs an analytics query and returns one dict per group: the dimension
+    values followed by the requested metrics. Without dimensions the result
+    is a single totals row.
+
+    accounts     {platform: account id}; several platforms are summed
+                 unless "platform" is one of the dimensions
+    metrics      names from METRICS
+    dimensions   any of DIMENSIONS; "post" only fits post metrics, "sender"
+                 only messages/comments
+    start_date / end_date
+                 inclusive date range; omitted means the full history
+    exact        exact unique senders instead of the HyperLogLog estimate
+    include_bursts
+                 False counts each cluster of near-duplicate comments once
+    order_by     a metric name, "-" prefixed for descending; default is
+                 the dimension order
+    limit        keep only the first `limit` groups
+
+    Each table involved is read with one grouped aggregate (plus one pass
+    over the grouped rollup rows for sketch-backed metrics). Raises
+    ValueError for unknown or incompatible metrics and dimensions.
+    """
+    metrics = list(dict.fromkeys(metrics))
+    dimensions = list(dict.fromkeys(dimensions))
+    if not metrics:
+        raise ValueError("At least one metric is required")
+    for name in metrics:
+        if name not in METRICS:
+            raise ValueError(f"Unknown metric: {name}")
+    for dimension in dimensions:
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {dimension}")
+    if not accounts:
+        raise ValueError("No connected accounts")
+
+    if "sender" in dimensions:
+        unsupported = [name for name in metrics if name not in ("messages", "comments")]
+        if unsupported:
+            raise ValueError(f"{', '.join(unsupported)} cannot be grouped by sender")
+        groups = _sender_counts(accounts, metrics, dimensions, start_date, end_date)
+    else:
+        by_table = {}
+        for name in metrics:
+            by_table.setdefault(METRICS[name].table, []).append(name)
+        groups = {}
+        for table_name, names in by_table.items():
+            for key, values in _table_groups(
+                table_name, names, accounts, dimensions, start_date, end_date, exact, include_bursts
+            ).items():
+                groups.setdefault(key, {}).update(values)
+
+    if not dimensions and not groups:
+        groups[()] = {}
+
+    rows = []
+    for key, values in groups.items():
+        row = dict(zip(dimensions, key))
+        if "sender" in dimensions:
+            row["sender_name"] = values.get("sender_name")
+        for name in metrics:
+            value = values.get(name)
+            row[name] = METRICS[name].default if value is None else value
+        rows.append(row)
+
+    rows.sort(key=lambda row: tuple(_sort_key(row[d]) for d in dimensions))
+    if order_by:
+        name = order_by.lstrip("-")
+        if name not in metrics:
+            raise ValueError(f"Cannot order by {name}: not one of the requested metrics")
+        descending = order_by.startswith("-")
+        present = [row for row in rows if row[name] is not None]
+        rows = sorted(present, key=lambda row: row[name], reverse=descending) + [
+            row for row in rows if row[name] is None
+        ]
+    return rows[:limit] if limit else rows
+
+
+def message_totals(platform, account_id, start_date=None, end_date=None, exact=False, include_bursts=True):
+    """Message/comment totals and unique senders of one account over a date range (inclusive)."""
+    return query(
+        {platform: account_id}, ["messages", "comments", "conversations"],
+        start_date=start_date, end_date=end_date, exact=exact, include_bursts=include_bursts,
+    )[0]
+
+
+def monthly_report(platform, account_id, year, month, exact=False, include_bursts=True):
+    """The monthly message/comment report of one account, shared by both platforms."""
+    start_date, end_date = get_month_range(year, month)
+    totals = message_totals(platform, account_id, start_date, end_date, exact=exact, include_bursts=include_bursts)
+    days = (end_date - start_date).days + 1
+
+    return {
+        "period": start_date.strftime("%Y-%m"),
+        "messages_total": totals["messages"],
+        "messages_daily_avg": round(totals["messages"] / days, 2),
+        "comments_total": totals["comments"],
+        "comments_daily_avg": round(totals["comments"] / days, 2),
+        "conversations": totals["conversations"],
+        "response_times": response_time_summary(platform, account_id, start_date, end_date),
+    }
+
+
+def run_query_tool(accounts, args):
+    """
+    query() for the AI agents' analytics_query tool: dates arrive as ISO
+    strings, results are capped and errors come back as {"error": ...}.
+    """
+    accounts = {platform: account_id for platform, account_id in accounts.items() if account_id}
+    try:
+        start_date = date.fromisoformat(args["start_date"]) if args.get("start_date") else None
+        end_date = date.fromisoformat(args["end_date"]) if args.get("end_date") else None
+        rows = query(
+            accounts,
+            args.get("metrics", []),
+            args.get("dimensions", []),
+            start_date,
+            end_date,
+            order_by=args.get("order_by"),
+            limit=min(int(args.get("limit") or 100), 100),
+        )
+    except ValueError as e:
+        return {"error": str(e)}
+    return {"rows": rows}
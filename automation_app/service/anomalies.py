@@ -0,0 +1,202 @@
+import sys
+import math
+from array import array
+from datetime import timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from ..models import AnomalyBaseline, CustomUser, Notification
+from .heatmap import SLOTS, slot
+from .social_sources import PLATFORM_ACCOUNT_ATTRS, SOCIAL_SOURCES, source_for
+from .tasks import queue_notification
+
+
+# quiet hours replayed as zeros after a gap; one week refreshes every seasonal slot
+MAX_GAP_HOURS = SLOTS
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def pack_seasonal(levels):
+    packed = array("d", levels)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_seasonal(blob):
+    levels = array("d")
+    if blob:
+        levels.frombytes(bytes(blob))
+        if sys.byteorder == "big":
+            levels.byteswap()
+    # NaN marks an hour of the week that has not been seen yet
+    return levels if len(levels) == SLOTS else array("d", [math.nan] * SLOTS)
+
+
+def _hour(moment):
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _expected_volume(baseline, seasonal, hour_start):
+    level = seasonal[slot(hour_start)]
+    return baseline.volume_level if math.isnan(level) else level
+
+
+def _close_hour(baseline, seasonal, hour_start, count, labelled, negative):
+    """Folds one finished hour into the EWMA, seasonal and sentiment baselines."""
+    alpha = _setting("ANOMALY_ALPHA", 0.05)
+    seasonal_alpha = _setting("ANOMALY_SEASONAL_ALPHA", 0.3)
+
+    if baseline.hours_seen:
+        residual = count - _expected_volume(baseline, seasonal, hour_start)
+        baseline.volume_variance = (1 - alpha) * (baseline.volume_variance + alpha * residual ** 2)
+        baseline.volume_level += alpha * (count - baseline.volume_level)
+        baseline.labelled_level += alpha * (labelled - baseline.labelled_level)
+        baseline.negative_level += alpha * (negative - baseline.negative_level)
+    else:
+        baseline.volume_level = count
+        baseline.labelled_level = labelled
+        baseline.negative_level = negative
+
+    index = slot(hour_start)
+    if math.isnan(seasonal[index]):
+        seasonal[index] = count
+    else:
+        seasonal[index] += seasonal_alpha * (count - seasonal[index])
+    baseline.hours_seen += 1
+
+
+def _advance(baseline, seasonal, hour_start):
+    """
+    Moves the open hour forward to `hour_start`, closing the previous one and
+    replaying the quiet hours in between as zeros. Items that arrive late
+    count into the open hour.
+    """
+    if baseline.hour_start is None:
+        baseline.hour_start = hour_start
+        return
+    if hour_start <= baseline.hour_start:
+        return
+
+    gap = int((hour_start - baseline.hour_start).total_seconds() // 3600)
+    _close_hour(
+        baseline, seasonal, baseline.hour_start,
+        baseline.hour_count, baseline.hour_labelled, baseline.hour_negative,
+    )
+    for step in range(1, min(gap, MAX_GAP_HOURS)):
+        _close_hour(baseline, seasonal, baseline.hour_start + timedelta(hours=step), 0, 0, 0)
+
+    baseline.hour_start = hour_start
+    baseline.hour_count = baseline.hour_labelled = baseline.hour_negative = 0
+
+
+def _cooled_down(alerted_at, now):
+    return alerted_at is None or now - alerted_at >= timedelta(minutes=_setting("ANOMALY_COOLDOWN_MINUTES", 60))
+
+
+def _volume_alert(baseline, seasonal, now):
+    if baseline.hours_seen < _setting("ANOMALY_WARMUP_HOURS", 72) or not _cooled_down(baseline.volume_alerted_at, now):
+        return None
+
+    expected = _expected_volume(baseline, seasonal, baseline.hour_start)
+    # Poisson noise as a floor, so a very steady account does not alert on +2
+    spread = max(math.sqrt(baseline.volume_variance), math.sqrt(max(expected, 1)))
+    count = baseline.hour_count
+    if count < _setting("ANOMALY_MIN_COUNT", 10) or count <= expected + _setting("ANOMALY_THRESHOLD", 4) * spread:
+        return None
+
+    baseline.volume_alerted_at = now
+    return (
+        f"⚠️ Unusual {baseline.kind} volume on your {baseline.platform.capitalize()} account: "
+        f"{count} this hour, usually about {expected:.0f}."
+    )
+
+
+def _negative_alert(baseline, now):
+    if (
+        baseline.hours_seen < _setting("ANOMALY_WARMUP_HOURS", 72)
+        or baseline.labelled_level <= 0
+        or not _cooled_down(baseline.negative_alerted_at, now)
+    ):
+        return None
+
+    rate = min(baseline.negative_level / baseline.labelled_level, 1.0)
+    labelled, negative = baseline.hour_labelled, baseline.hour_negative
+    # binomial spread of the negative count at the baseline rate
+    spread = max(math.sqrt(labelled * rate * (1 - rate)), 1.0)
+    if negative < _setting("ANOMALY_MIN_NEGATIVE", 5) or negative <= labelled * rate + _setting("ANOMALY_THRESHOLD", 4) * spread:
+        return None
+
+    baseline.negative_alerted_at = now
+    return (
+        f"⚠️ Negative {baseline.kind}s are spiking on your {baseline.platform.capitalize()} account: "
+        f"{negative} of {labelled} this hour, usually {rate:.0%}."
+    )
+
+
+def _observe(platform, account_id, kind, moment, count=0, labelled=0, negative=0):
+    now = timezone.now()
+    with transaction.atomic():
+        baseline, _ = AnomalyBaseline.objects.select_for_update().get_or_create(
+            platform=platform, account_id=account_id, kind=kind
+        )
+        seasonal = unpack_seasonal(baseline.seasonal)
+        _advance(baseline, seasonal, _hour(moment))
+        baseline.hour_count += count
+        baseline.hour_labelled += labelled
+        baseline.hour_negative += negative
+
+        alerts = [
+            alert for alert in (_volume_alert(baseline, seasonal, now), _negative_alert(baseline, now)) if alert
+        ]
+        baseline.seasonal = pack_seasonal(seasonal)
+        baseline.save()
+
+    if alerts:
+        transaction.on_commit(lambda: notify_account(platform, account_id, alerts))
+
+
+def notify_account(platform, account_id, messages):
+    """Creates a Notification and pushes it live to every user owning the account."""
+    users = CustomUser.objects.filter(**{PLATFORM_ACCOUNT_ATTRS[platform]: account_id})
+    for user in users:
+        for message in messages:
+            Notification.objects.create(user=user, message=message[:255])
+            queue_notification(user.id, message)
+
+
+def observe_ingest(obj):
+    """Counts a freshly ingested message/comment into its account's volume baseline."""
+    if not _setting("ANOMALY_DETECTION", True):
+        return
+    source = source_for(obj)
+    account_id = getattr(obj, source.account_field)
+    if not account_id or not obj.timestamp:
+        return
+    _observe(source.platform, account_id, source.kind, obj.timestamp, count=1)
+
+
+def observe_labels(rows):
+    """
+    Counts newly labelled SocialClassification rows into the sentiment
+    baselines. Only recent items count: relabelling or backfilling old
+    history must not look like a spike.
+    """
+    if not _setting("ANOMALY_DETECTION", True):
+        return
+    now = timezone.now()
+    horizon = now - timedelta(minutes=_setting("ANOMALY_LABEL_WINDOW_MINUTES", 120))
+
+    groups = {}
+    for row in rows:
+        if row.timestamp < horizon:
+            continue
+        key = (row.platform, row.account_id, SOCIAL_SOURCES[row.source].kind)
+        labelled, negative = groups.get(key, (0, 0))
+        groups[key] = (labelled + 1, negative + (row.sentiment == "Negative"))
+
+    for (platform, account_id, kind), (labelled, negative) in groups.items():
+        _observe(platform, account_id, kind, now, labelled=labelled, negative=negative)
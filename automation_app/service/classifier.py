@@ -0,0 +1,107 @@
+import os
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from openai import OpenAI
+
+
+logger = logging.getLogger(__name__)
+
+# bump when SYSTEM_PROMPT changes meaningfully; stored labels then go stale
+PROMPT_VERSION = 1
+
+SENTIMENTS = ("Positive", "Neutral", "Negative")
+DEFAULT_LABEL = {"sentiment": "Neutral", "complaint": False}
+
+SYSTEM_PROMPT = """
+You are a text classifier for customer messages and comments (English or Arabic).
+For every item return its sentiment (Positive, Neutral or Negative) and whether
+it contains a complaint about a product or service (true or false).
+
+Respond with JSON only, in exactly this shape:
+{"results": [{"id": <item id>, "sentiment": "Positive|Neutral|Negative", "complaint": true|false}]}
+"""
+
+client = OpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    timeout=getattr(settings, "CLASSIFIER_TIMEOUT", 60),
+    max_retries=2,
+)
+
+
+def current_model_version():
+    """Identifies the model + prompt that produced a stored label."""
+    return f"{settings.CLASSIFIER_MODEL}/p{PROMPT_VERSION}"
+
+
+def _normalize_label(item):
+    sentiment = str(item.get("sentiment", "")).strip().capitalize()
+    if sentiment not in SENTIMENTS:
+        sentiment = DEFAULT_LABEL["sentiment"]
+
+    complaint = item.get("complaint", False)
+    if isinstance(complaint, str):
+        complaint = complaint.strip().lower() in ("yes", "true")
+
+    return {"sentiment": sentiment, "complaint": bool(complaint)}
+
+
+def classify_batch(texts, model=None):
+    """
+    Labels sentiment and complaint for a batch of texts in a single call.
+    Returns one {"sentiment", "complaint"} dict per input text, in order.
+    Empty texts get the default label; items the model failed to label
+    (or the whole batch on an API error) come back as None so callers can
+    retry them later instead of storing a guess.
+    """
+    labels = [None if text else dict(DEFAULT_LABEL) for text in texts]
+    items = [{"id": idx, "text": text} for idx, text in enumerate(texts) if text]
+    if not items:
+        return labels
+
+    try:
+        response = client.chat.completions.create(
+            model=model or settings.CLASSIFIER_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": json.dumps({"items": items}, ensure_ascii=False)},
+            ],
+            response_format={"type": "json_object"},
+            temperature=0,
+        )
+        results = json.loads(response.choices[0].message.content).get("results", [])
+    except Exception as e:
+        logger.error(f"Batch classification failed for {len(items)} texts: {e}")
+        return labels
+
+    for item in results:
+        idx = item.get("id")
+        if isinstance(idx, int) and 0 <= idx < len(labels) and texts[idx]:
+            labels[idx] = _normalize_label(item)
+
+    return labels
+
+
+def classify_texts(texts, batch_size=None, max_workers=None, model=None):
+    """
+    Classifies any number of texts: identical texts are sent once, batches
+    of `batch_size` go out concurrently on at most `max_workers` threads.
+    """
+    batch_size = batch_size or settings.CLASSIFIER_BATCH_SIZE
+    max_workers = max_workers or settings.CLASSIFIER_MAX_WORKERS
+
+    unique_texts = list(dict.fromkeys(texts))
+    batches = [unique_texts[i:i + batch_size] for i in range(0, len(unique_texts), batch_size)]
+    if not batches:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+        batch_labels = list(executor.map(lambda batch: classify_batch(batch, model=model), batches))
+
+    by_text = {}
+    for batch, labels in zip(batches, batch_labels):
+        by_text.update(zip(batch, labels))
+
+    return [by_text[text] for text in texts]
+
@@ -0,0 +1,239 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from django.conf import settings
+from django.db import connections
+from ..models import InstagramComment, FacebookComment
+from .graph_cache import cached_graph_get_many
+from .graph_client import graph, GraphAPIError
+from .analytics import message_totals
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PART_TIMEOUTS = {
+    "profile": 5,
+    "insights": 8,
+    "media": 8,
+    "posts": 8,
+    "latest_comments": 3,
+    "stats": 5,
+    # all Graph reads of a dashboard go out together as one batched part
+    "graph": 8,
+}
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "DASHBOARD_MAX_WORKERS", 16),
+    thread_name_prefix="dashboard",
+)
+
+
+def part_timeout(name):
+    timeouts = {**DEFAULT_PART_TIMEOUTS, **getattr(settings, "DASHBOARD_PART_TIMEOUTS", {})}
+    return timeouts.get(name.rsplit(".", 1)[-1], 5)
+
+
+def _run_part(fn):
+    try:
+        return fn()
+    finally:
+        # pool threads would otherwise each hold a DB connection open forever
+        connections.close_all()
+
+
+def gather(parts):
+    """
+    Runs every callable in `parts` ({name: fn}) concurrently and waits for
+    each no longer than its own timeout (DASHBOARD_PART_TIMEOUTS, keyed by
+    the last dotted segment of the name). Total latency is the slowest part,
+    not the sum. Returns (results, errors): failed or late parts are left out
+    of results and described in errors instead of failing the whole call.
+    """
+    started = time.monotonic()
+    futures = {name: _executor.submit(_run_part, fn) for name, fn in parts.items()}
+
+    results, errors = {}, {}
+    for name, future in futures.items():
+        remaining = started + part_timeout(name) - time.monotonic()
+        try:
+            results[name] = future.result(timeout=max(remaining, 0))
+        except TimeoutError:
+            future.cancel()
+            errors[name] = "timed out"
+        except GraphAPIError as e:
+            errors[name] = e.payload.get("error", {}).get("message") or str(e)
+        except Exception:
+            logger.exception(f"Dashboard part {name} failed")
+            errors[name] = "failed"
+    return results, errors
+
+
+# ---------- parts ----------
+
+def latest_instagram_comments(instagram_id, limit=5):
+    return [
+        {
+            "sender_id": c.sender_id,
+            "sender_username": c.sender_username,
+            "comment": c.comment,
+            "reply": c.reply,
+            "timestamp": c.timestamp
+        }
+        for c in InstagramComment.objects.filter(recipient_id=instagram_id).order_by("-timestamp")[:limit]
+    ]
+
+
+def latest_facebook_comments(page_id, limit=5):
+    return [
+        {
+            "sender_id": c.sender_id,
+            "sender_name": c.sender_name,
+            "comment": c.comment,
+            "reply": c.reply,
+            "timestamp": c.timestamp
+        }
+        for c in FacebookComment.objects.filter(recipient_id=page_id).order_by("-timestamp")[:limit]
+    ]
+
+
+INSTAGRAM_MEDIA_FIELDS = "id,media_type,media_url,thumbnail_url,permalink,timestamp,caption,like_count,comments_count"
+FACEBOOK_POST_FIELDS = "id,message,created_time,attachments{media},permalink_url,shares,likes.summary(true),comments.summary(true)"
+
+
+def _strip_post_paging(data):
+    posts = data.get("data", [])
+    for post in posts:
+        # Remove paging inside likes / comments
+        if "likes" in post:
+            post["likes"].pop("paging", None)
+        if "comments" in post:
+            post["comments"].pop("paging", None)
+    return posts
+
+
+def instagram_media(instagram_id, access_token, limit=10):
+    data = graph.get(f"{instagram_id}/media", access_token, fields=INSTAGRAM_MEDIA_FIELDS, limit=limit)
+    return data.get("data", [])
+
+
+def facebook_posts(page_id, access_token, limit=10):
+    data = graph.get(f"{page_id}/posts", access_token, fields=FACEBOOK_POST_FIELDS, limit=limit)
+    return _strip_post_paging(data)
+
+
+def _list_data(data):
+    return data.get("data", [])
+
+
+def _as_is(data):
+    return data
+
+
+# Graph-backed parts are described as (path, token, cache kind, params, shape)
+# rather than callables so a dashboard can send them all in one batch.
+
+def instagram_graph_calls(user):
+    instagram_id = user.instagram_account_id
+    token = user.instagram_access_token
+    return {
+        "instagram.profile": (
+            instagram_id, token, "profile",
+            {"fields": "username,profile_picture_url,followers_count,follows_count,media_count"},
+            _as_is,
+        ),
+        "instagram.insights": (
+            f"{instagram_id}/insights", token, "insights", {"metric": "reach", "period": "day"}, _list_data,
+        ),
+        "instagram.media": (
+            f"{instagram_id}/media", token, None, {"fields": INSTAGRAM_MEDIA_FIELDS, "limit": 10}, _list_data,
+        ),
+    }
+
+
+def facebook_graph_calls(user):
+    page_id = user.facebook_page_id
+    token = user.facebook_access_token
+    return {
+        # FacebookPageProfileView reads the page profile with the Instagram token too
+        "facebook.profile": (
+            page_id, user.instagram_access_token, "profile",
+            {"fields": "id,name,link,category,picture,fan_count,about,followers_count"},
+            _as_is,
+        ),
+        "facebook.insights": (
+            f"{page_id}/insights", token, "insights",
+            {"metric": "page_impressions_unique", "period": "day"},
+            _list_data,
+        ),
+        "facebook.posts": (
+            f"{page_id}/posts", token, None, {"fields": FACEBOOK_POST_FIELDS, "limit": 10}, _strip_post_paging,
+        ),
+    }
+
+
+def instagram_parts(user):
+    instagram_id = user.instagram_account_id
+    return {
+        "instagram.latest_comments": lambda: latest_instagram_comments(instagram_id),
+        "instagram.stats": lambda: message_totals("instagram", instagram_id),
+    }
+
+
+def facebook_parts(user):
+    page_id = user.facebook_page_id
+    return {
+        "facebook.latest_comments": lambda: latest_facebook_comments(page_id),
+        "facebook.stats": lambda: message_totals("facebook", page_id),
+    }
+
+
+def graph_parts(calls):
+    """
+    Fetches every Graph-backed part in `calls` through one cached batch.
+    Returns (results, errors) keyed by part name, like gather().
+    """
+    names = list(calls)
+    entries = cached_graph_get_many([calls[name][:4] for name in names])
+
+    results, errors = {}, {}
+    for name, (data, _) in zip(names, entries):
+        if isinstance(data, GraphAPIError):
+            errors[name] = data.payload.get("error", {}).get("message") or str(data)
+        else:
+            results[name] = calls[name][4](data)
+    return results, errors
+
+
+def social_dashboard(user, platforms=("instagram", "facebook")):
+    """
+    Profile, insights, latest media/posts, latest comments and rollup stats
+    for each connected platform, gathered concurrently. The Graph reads of
+    both platforms share one batch request. Parts that fail or time out are
+    listed under "errors" and the rest are still returned.
+    """
+    parts, calls = {}, {}
+    if "instagram" in platforms and user.instagram_account_id and user.instagram_access_token:
+        parts.update(instagram_parts(user))
+        calls.update(instagram_graph_calls(user))
+    if "facebook" in platforms and user.facebook_page_id and user.facebook_access_token:
+        parts.update(facebook_parts(user))
+        calls.update(facebook_graph_calls(user))
+    if calls:
+        parts["graph"] = lambda: graph_parts(calls)
+
+    results, errors = gather(parts)
+
+    if "graph" in results:
+        graph_results, graph_errors = results.pop("graph")
+        results.update(graph_results)
+        errors.update(graph_errors)
+    elif "graph" in errors:
+        reason = errors.pop("graph")
+        errors.update({name: reason for name in calls})
+
+    dashboard = {}
+    for name, value in results.items():
+        platform, part = name.split(".", 1)
+        dashboard.setdefault(platform, {})[part] = value
+
+    return {**dashboard, "errors": errors, "partial": bool(errors)}
@@ -0,0 +1,177 @@
+import csv
+import json
+import zlib
+from django.core.serializers.json import DjangoJSONEncoder
+from ..models import (
+    InstagramMessage,
+    InstagramComment,
+    FacebookMessage,
+    FacebookComment,
+    ChatHistory,
+    BusinessSession,
+)
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+# source name -> (model, account field, account attribute on the user, exported columns)
+EXPORT_SOURCES = {
+    "instagram_messages": (
+        InstagramMessage,
+        "recipient_id",
+        "instagram_account_id",
+        ["id", "recipient_id", "sender_id", "sender_username", "message", "reply", "timestamp"],
+    ),
+    "instagram_comments": (
+        InstagramComment,
+        "recipient_id",
+        "instagram_account_id",
+        ["id", "recipient_id", "sender_id", "sender_username", "comment", "reply", "timestamp"],
+    ),
+    "facebook_messages": (
+        FacebookMessage,
+        "recipient_page_id",
+        "facebook_page_id",
+        ["id", "recipient_page_id", "sender_id", "sender_name", "message", "reply", "timestamp"],
+    ),
+    "facebook_comments": (
+        FacebookComment,
+        "recipient_id",
+        "facebook_page_id",
+        ["id", "recipient_id", "sender_id", "sender_name", "comment", "reply", "timestamp"],
+    ),
+    "chat_history": (
+        ChatHistory,
+        "user_id",
+        "id",
+        ["id", "user_id", "message", "response", "is_bot", "timestamp"],
+    ),
+}
+
+BUSINESS_CHAT_FIELDS = ["session_id", "session_name", "turn", "chat_id", "role", "content"]
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+
+def export_fields(source):
+    if source == "business_chat":
+        return BUSINESS_CHAT_FIELDS
+    return EXPORT_SOURCES[source][3]
+
+
+def iter_export_rows(source, user=None, since=None, until=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields export rows as dicts, reading through a server-side cursor.
+    When user is None every row is exported (management command only).
+    """
+    if source == "business_chat":
+        yield from _iter_business_chat_rows(user, chunk_size)
+        return
+
+    if source not in EXPORT_SOURCES:
+        raise ValueError(f"Unknown export source: {source}")
+
+    model, account_field, user_attr, fields = EXPORT_SOURCES[source]
+    queryset = model.objects.all()
+
+    if user is not None:
+        account_id = getattr(user, user_attr)
+        if not account_id:
+            return
+        queryset = queryset.filter(**{account_field: account_id})
+
+    if since:
+        queryset = queryset.filter(timestamp__date__gte=since)
+    if until:
+        queryset = queryset.filter(timestamp__date__lte=until)
+
+    yield from queryset.order_by("id").values(*fields).iterator(chunk_size=chunk_size)
+
+
+def _iter_business_chat_rows(user, chunk_size):
+    # chat turns live in a JSON list on the session, so we expand one session at a time
+    sessions = BusinessSession.objects.all()
+    if user is not None:
+        sessions = sessions.filter(user=user)
+
+    sessions = sessions.order_by("id").values("id", "name", "chat_history")
+
+    for session in sessions.iterator(chunk_size=max(1, chunk_size // 100)):
+        for idx, turn in enumerate(session["chat_history"] or []):
+            yield {
+                "session_id": session["id"],
+                "session_name": session["name"],
+                "turn": idx + 1,
+                "chat_id": turn.get("chat_id"),
+                "role": turn.get("role"),
+                "content": turn.get("content"),
+            }
+
+
+class _LineBuffer:
+    """File-like object that hands back whatever csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+def csv_lines(rows, fields):
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_csv_value(row.get(field)) for field in fields])
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def gzip_stream(lines, flush_every=64 * 1024):
+    """
+    Compresses an iterable of text lines into gzip chunks.
+    Only the compressor state and one pending block are held in memory.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    pending = 0
+
+    for line in lines:
+        encoded = line.encode("utf-8")
+        data = compressor.compress(encoded)
+        pending += len(encoded)
+        if data:
+            yield data
+        if pending >= flush_every:
+            data = compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+            if data:
+                yield data
+
+    yield compressor.flush()
+
+
+def export_stream(source, export_format="ndjson", compress=True, **filters):
+    """
+    Returns an iterator of bytes for the requested source and format.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    rows = iter_export_rows(source, **filters)
+
+    if export_format == "csv":
+        lines = csv_lines(rows, export_fields(source))
+    else:
+        lines = ndjson_lines(rows)
+
+    if compress:
+        return gzip_stream(lines)
+    return (line.encode("utf-8") for line in lines)
@@ -0,0 +1,505 @@
+import hashlib
+import logging
+from datetime import date, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from ..models import SocialClassification
+from ..utils import get_month_range
+from .classifier import classify_texts, current_model_version
+from .local_classifier import get_local_classifier
+from .social_sources import SOCIAL_SOURCES, source_for
+from .topics import cluster_texts, topic_terms
+from .anomalies import observe_labels
+from .jobs import enqueue, task
+
+
+logger = logging.getLogger(__name__)
+
+CLASSIFY_CHUNK = 500
+
+
+def text_hash(text):
+    return hashlib.sha1((text or "").strip().encode("utf-8")).hexdigest()
+
+
+# ---------- ingest ----------
+
+def record_classification_row(obj, cluster_text_hash=None):
+    """
+    Creates the pending label row for a new message/comment and wakes the
+    worker. Near-duplicate comments pass their cluster's text hash, so the
+    whole cluster shares one label.
+    """
+    source = source_for(obj)
+    account_id = getattr(obj, source.account_field)
+    if not account_id:
+        return
+
+    SocialClassification.objects.get_or_create(
+        source=source.name,
+        object_id=obj.pk,
+        defaults={
+            "platform": source.platform,
+            "account_id": account_id,
+            "timestamp": obj.timestamp,
+            "text_hash": cluster_text_hash or text_hash(getattr(obj, source.text_field)),
+        },
+    )
+
+    if getattr(settings, "CLASSIFY_ON_INGEST", True):
+        transaction.on_commit(schedule_classification)
+
+
+def create_missing_rows(source, account_id=None, start_date=None, end_date=None, chunk_size=2000):
+    """Adds pending label rows for messages/comments that have none yet."""
+    rows = source.model.objects.exclude(**{source.account_field: ""})
+    if account_id:
+        rows = rows.filter(**{source.account_field: account_id})
+    if start_date and end_date:
+        rows = rows.filter(timestamp__date__range=(start_date, end_date))
+
+    labelled = SocialClassification.objects.filter(source=source.name).values("object_id")
+    fields = ["id", source.account_field, "timestamp", source.text_field]
+    if source.kind == "comment":
+        # comments label by their near-duplicate cluster when they have one
+        fields.append("dup_cluster__text_hash")
+    rows = rows.exclude(id__in=labelled).values_list(*fields)
+
+    batch = []
+    created = 0
+    for obj_id, obj_account, timestamp, text, *cluster_hash in rows.iterator(chunk_size=chunk_size):
+        batch.append(SocialClassification(
+            source=source.name,
+            object_id=obj_id,
+            platform=source.platform,
+            account_id=obj_account,
+            timestamp=timestamp,
+            text_hash=cluster_hash[0] if cluster_hash and cluster_hash[0] else text_hash(text),
+        ))
+        if len(batch) >= chunk_size:
+            SocialClassification.objects.bulk_create(batch, ignore_conflicts=True)
+            created += len(batch)
+            batch = []
+
+    if batch:
+        SocialClassification.objects.bulk_create(batch, ignore_conflicts=True)
+        created += len(batch)
+    return created
+
+
+# ---------- labelling ----------
+
+def accepted_versions():
+    """Model versions whose labels count as current: the LLM and the active local tier."""
+    versions = [current_model_version()]
+    local = get_local_classifier()
+    if local is not None:
+        versions.append(local.version)
+    return versions
+
+
+def pending_labels(include_stale=False):
+    pending = Q(classified_at__isnull=True)
+    if include_stale:
+        pending |= ~Q(model_version__in=accepted_versions())
+    return SocialClassification.objects.filter(pending)
+
+
+def _load_texts(rows):
+    """Fetches the current text of each row's message/comment, keyed by row id."""
+    by_source = {}
+    for row in rows:
+        by_source.setdefault(row.source, []).append(row)
+
+    texts = {}
+    for source_name, source_rows in by_source.items():
+        source = SOCIAL_SOURCES[source_name]
+        values = dict(
+            source.model.objects
+            .filter(id__in=[row.object_id for row in source_rows])
+            .values_list("id", source.text_field)
+        )
+        for row in source_rows:
+            if row.object_id in values:
+                texts[row.id] = values[row.object_id] or ""
+    return texts
+
+
+def label_rows(rows):
+    """
+    Labels the given SocialClassification rows. Texts already labelled by
+    a current model version (same text hash) are copied; the rest go to the
+    local classifier first and only low-confidence texts are escalated to
+    the LLM. Returns the number of rows labelled.
+    """
+    if not rows:
+        return 0
+
+    version = current_model_version()
+    texts = _load_texts(rows)
+
+    # rows whose message/comment was deleted have nothing left to classify
+    orphaned = [row.id for row in rows if row.id not in texts]
+    if orphaned:
+        SocialClassification.objects.filter(id__in=orphaned).delete()
+    rows = [row for row in rows if row.id in texts]
+
+    known = {}
+    for h, sentiment, is_complaint, label_version in SocialClassification.objects.filter(
+        text_hash__in={row.text_hash for row in rows},
+        model_version__in=accepted_versions(),
+        classified_at__isnull=False,
+    ).values_list("text_hash", "sentiment", "is_complaint", "model_version"):
+        # prefer an LLM label over a local one for the same text
+        if h not in known or label_version == version:
+            known[h] = (sentiment, is_complaint, label_version)
+
+    # one text per hash: near-duplicate comments share their cluster's hash
+    to_classify = list({row.text_hash: row for row in rows if row.text_hash not in known}.values())
+
+    local = get_local_classifier()
+    if local is not None and to_classify:
+        escalated = []
+        for row, label in zip(to_classify, local.classify([texts[row.id] for row in to_classify])):
+            if label is None:
+                escalated.append(row)
+            else:
+                known[row.text_hash] = (label["sentiment"], label["complaint"], local.version)
+        to_classify = escalated
+
+    labels = classify_texts([texts[row.id] for row in to_classify])
+    for row, label in zip(to_classify, labels):
+        if label is not None:
+            known[row.text_hash] = (label["sentiment"], label["complaint"], version)
+
+    now = timezone.now()
+    updated, first_labels = [], []
+    for row in rows:
+        if row.text_hash not in known:
+            continue  # classifier failed; stays pending for the next pass
+        if row.classified_at is None:
+            first_labels.append(row)
+        row.sentiment, row.is_complaint, row.model_version = known[row.text_hash]
+        row.classified_at = now
+        updated.append(row)
+
+    SocialClassification.objects.bulk_update(
+        updated, ["sentiment", "is_complaint", "model_version", "classified_at"]
+    )
+    observe_labels(first_labels)
+    for platform, account_id, month in {
+        (row.platform, row.account_id, timezone.localdate(row.timestamp).replace(day=1))
+        for row in updated if row.is_complaint
+    }:
+        schedule_topics(platform, account_id, month)
+    return len(updated)
+
+
+def llm_labelled_samples(chunk_size=2000):
+    """
+    Yields (text_hash, text, label) once per distinct text labelled by an
+    LLM (never by the local tier), for training the local classifier.
+    """
+    rows = (
+        SocialClassification.objects
+        .filter(classified_at__isnull=False)
+        .exclude(model_version="")
+        .exclude(model_version__startswith="local/")
+        .order_by("text_hash", "id")
+    )
+    seen = None
+    batch = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        if row.text_hash == seen:
+            continue
+        seen = row.text_hash
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            yield from _samples(batch)
+            batch = []
+    if batch:
+        yield from _samples(batch)
+
+
+def _samples(rows):
+    texts = _load_texts(rows)
+    for row in rows:
+        if row.id in texts:
+            yield row.text_hash, texts[row.id], {"sentiment": row.sentiment, "complaint": bool(row.is_complaint)}
+
+
+def classify_pending(queryset=None, include_stale=False, limit=CLASSIFY_CHUNK):
+    """Labels up to `limit` pending rows. Returns how many were labelled."""
+    pending = pending_labels(include_stale)
+    if queryset is not None:
+        pending = pending & queryset
+    return label_rows(list(pending.order_by("id")[:limit]))
+
+
+# ---------- background worker ----------
+
+def _more_pending(labelled, pending):
+    # a chunk that labelled nothing (classifier down) ends the run; the next ingest retries
+    return labelled and pending.exists()
+
+
+@task("classify_pending", queue="classification")
+def drain_pending():
+    """
+    Labels one chunk of pending rows and queues the next chunk while more
+    are waiting. Jobs stay short, so a long backlog is never mistaken for a
+    stalled worker (JOB_STALE_SECONDS) and drained twice.
+    """
+    if _more_pending(classify_pending(), pending_labels()):
+        enqueue("classify_pending", dedupe_key="classify_pending")
+
+
+def schedule_classification(platform=None, account_id=None, start_date=None, end_date=None):
+    """
+    Queues a drain of the pending labels unless one is already waiting. The
+    short delay lets a burst of ingests accumulate into full batches.
+
+    Given an account and date range, queues that period instead: label rows
+    are created for messages/comments that have none, and rows labelled by
+    an older model version are relabelled too.
+    """
+    delay = getattr(settings, "CLASSIFY_DEBOUNCE_SECONDS", 2)
+    if platform is None:
+        enqueue("classify_pending", delay=delay, dedupe_key="classify_pending")
+        return
+    _enqueue_period(platform, account_id, start_date, end_date, delay=delay)
+
+
+def _enqueue_period(platform, account_id, start_date, end_date, delay=0, create_rows=True):
+    enqueue(
+        "classify_period",
+        args=[platform, account_id, start_date.isoformat(), end_date.isoformat()],
+        kwargs={"create_rows": create_rows},
+        delay=delay,
+        dedupe_key=f"classify:{platform}:{account_id}:{start_date}:{end_date}"[:100],
+    )
+
+
+def _period_rows(platform, account_id, start_date, end_date):
+    return SocialClassification.objects.filter(
+        platform=platform,
+        account_id=account_id,
+        timestamp__date__range=(start_date, end_date),
+    )
+
+
+@task("classify_period", queue="classification")
+def classify_period(platform, account_id, start_date, end_date, create_rows=True):
+    """
+    Labels one chunk of an account's pending and stale rows in a date range
+    (ISO dates), creating missing label rows first, and queues the next
+    chunk while there may be more.
+    """
+    start_date, end_date = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    if create_rows:
+        for source in SOCIAL_SOURCES.values():
+            if source.platform == platform:
+                create_missing_rows(source, account_id, start_date, end_date)
+
+    rows = _period_rows(platform, account_id, start_date, end_date)
+    if _more_pending(classify_pending(rows, include_stale=True), pending_labels(include_stale=True) & rows):
+        _enqueue_period(platform, account_id, start_date, end_date, create_rows=False)
+
+
+# ---------- complaint topics ----------
+
+# topic of complaints that share no content word with any topic
+OTHER_TOPIC = "other"
+
+
+def schedule_topics(platform, account_id, month):
+    """
+    Queues re-clustering of an account's complaint topics for the month
+    starting at `month`, unless it is already waiting. The delay lets a
+    stream of new complaint labels settle into one run.
+    """
+    enqueue(
+        "assign_topics",
+        args=[platform, account_id, month.isoformat()],
+        delay=getattr(settings, "CLASSIFY_TOPIC_DELAY_SECONDS", 60),
+        dedupe_key=f"topics:{platform}:{account_id}:{month:%Y-%m}"[:100],
+    )
+
+
+@task("assign_topics", queue="classification")
+def assign_topics(platform, account_id, month):
+    """
+    Clusters the complaints of an account's month (ISO date of its first
+    day) into topics and stores each row's topic; reports only read them.
+    Bursts of near-duplicate comments count once, so spam does not become
+    a topic of its own. Returns the number of topics.
+    """
+    month = date.fromisoformat(month)
+    start_date, end_date = get_month_range(month.year, month.month)
+    complaints = _period_rows(platform, account_id, start_date, end_date).filter(
+        classified_at__isnull=False, is_complaint=True
+    )
+    clusterer = cluster_texts(lambda: _complaint_groups(complaints, include_bursts=False))
+
+    # texts go to the nearest final topic, written a chunk at a time
+    labels = {}
+    batch = {}
+    assigned = 0
+    for key, text, _ in _complaint_groups(complaints, include_bursts=False):
+        topic = clusterer.nearest(topic_terms(text))
+        if topic is not None and id(topic) not in labels:
+            labels[id(topic)] = topic.label()[:255] or OTHER_TOPIC
+        batch.setdefault(labels[id(topic)] if topic is not None else OTHER_TOPIC, []).append(key)
+        assigned += 1
+        if assigned % CLASSIFY_CHUNK == 0:
+            _store_topics(complaints, batch)
+            batch = {}
+    _store_topics(complaints, batch)
+    # complaints whose text is gone cannot be placed
+    complaints.filter(topic="").update(topic=OTHER_TOPIC)
+    return len(clusterer.topics)
+
+
+def _store_topics(complaints, batch):
+    for label, keys in batch.items():
+        complaints.filter(text_hash__in=keys).update(topic=label)
+
+
+def _months(start_date, end_date):
+    month = start_date.replace(day=1)
+    while month <= end_date:
+        yield month
+        month = (month + timedelta(days=32)).replace(day=1)
+
+
+def _topic_examples(complaints, topic, limit=3):
+    """Up to `limit` distinct texts of a topic, newest first."""
+    rows = []
+    seen = set()
+    for row in complaints.filter(topic=topic).order_by("-id")[:limit * 10]:
+        if row.text_hash not in seen:
+            seen.add(row.text_hash)
+            rows.append(row)
+            if len(rows) == limit:
+                break
+    texts = _load_texts(rows)
+    return [texts[row.id] for row in rows if row.id in texts]
+
+
+def pending_count(platform, account_id, start_date, end_date):
+    """
+    Messages/comments of an account and date range without a current label:
+    pending or stale label rows, plus items that have no label row yet.
+    """
+    rows = _period_rows(platform, account_id, start_date, end_date)
+    stored = rows.count()
+    items = sum(
+        source.model.objects.filter(
+            **{source.account_field: account_id, "timestamp__date__range": (start_date, end_date)}
+        ).count()
+        for source in SOCIAL_SOURCES.values()
+        if source.platform == platform
+    )
+    stale = rows.filter(Q(classified_at__isnull=True) | ~Q(model_version__in=accepted_versions())).count()
+    return max(items - stored, 0) + stale
+
+
+# ---------- reporting ----------
+
+_COMMENT_ROWS = Q(source__endswith="_comment")
+
+
+def _complaint_groups(rows, include_bursts=True, chunk_size=CLASSIFY_CHUNK):
+    """
+    Yields (text_hash, text, count) per distinct complaint text, using its
+    newest occurrence. Without bursts, a near-duplicate comment cluster
+    counts once.
+    """
+    groups = (
+        rows.values("text_hash")
+        .annotate(
+            messages=Count("id", filter=~_COMMENT_ROWS),
+            comments=Count("id", filter=_COMMENT_ROWS),
+            example=Max("id"),
+        )
+        .order_by("text_hash")
+    )
+    batch = []
+    for group in groups.iterator(chunk_size=chunk_size):
+        comments = group["comments"] if include_bursts else min(group["comments"], 1)
+        group["total"] = group["messages"] + comments
+        batch.append(group)
+        if len(batch) >= chunk_size:
+            yield from _load_groups(batch)
+            batch = []
+    if batch:
+        yield from _load_groups(batch)
+
+
+def _load_groups(groups):
+    examples = list(SocialClassification.objects.filter(id__in=[g["example"] for g in groups]))
+    texts = _load_texts(examples)
+    for group in groups:
+        if group["example"] in texts:
+            yield group["text_hash"], texts[group["example"]], group["total"]
+
+
+def feedback_report(platform, account_id, start_date, end_date, top=5, include_bursts=True):
+    """
+    Sentiment counts and the largest complaint topics for an account and
+    date range, aggregated from stored labels only. Items that are not yet
+    labelled, or were labelled by an older model version, are queued for
+    classification and counted as `pending` (stale labels still count until
+    they are replaced). Complaints are grouped by the topic the
+    assign_topics job stored on them; complaints it has not reached yet
+    also count as pending and schedule it.
+
+    With include_bursts=False, near-duplicate comments (which share a text
+    hash) count once.
+    """
+    sentiment = {"Positive": 0, "Neutral": 0, "Negative": 0}
+    if not account_id:
+        return {"sentiment": sentiment, "top_complaints": [], "pending": 0}
+
+    pending = pending_count(platform, account_id, start_date, end_date)
+    if pending:
+        schedule_classification(platform, account_id, start_date, end_date)
+
+    rows = _period_rows(platform, account_id, start_date, end_date)
+
+    labelled = rows.filter(classified_at__isnull=False)
+    comment_total = Count("id", filter=_COMMENT_ROWS)
+    if not include_bursts:
+        comment_total = Count("text_hash", filter=_COMMENT_ROWS, distinct=True)
+    counts = labelled.values("sentiment").annotate(
+        messages=Count("id", filter=~_COMMENT_ROWS),
+        comments=comment_total,
+    )
+    for row in counts:
+        if row["sentiment"] in sentiment:
+            sentiment[row["sentiment"]] = row["messages"] + row["comments"]
+
+    complaints = labelled.filter(is_complaint=True)
+    unassigned = complaints.filter(topic="").count()
+    if unassigned:
+        pending += unassigned
+        for month in _months(start_date, end_date):
+            schedule_topics(platform, account_id, month)
+
+    topics = complaints.exclude(topic="").values("topic").annotate(
+        messages=Count("id", filter=~_COMMENT_ROWS),
+        comments=comment_total,
+    )
+    ranked = sorted(topics, key=lambda row: (-(row["messages"] + row["comments"]), row["topic"]))
+    top_complaints = [
+        {
+            "topic": row["topic"],
+            "count": row["messages"] + row["comments"],
+            "examples": _topic_examples(complaints, row["topic"]),
+        }
+        for row in ranked[:top]
+    ]
+
+    return {"sentiment": sentiment, "top_complaints": top_complaints, "pending": pending}
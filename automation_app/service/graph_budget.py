@@ -0,0 +1,237 @@
+import json
+import time
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Meta computes usage over a rolling one-hour window
+WINDOW_SECONDS = 3600
+# error codes that mean a scope is already throttled by Meta
+THROTTLE_ERROR_CODES = {4, 17, 32, 613} | set(range(80000, 80015))
+DEFAULT_THROTTLE_SECONDS = 60
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+_local = threading.local()
+
+
+class BudgetExhausted(Exception):
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def token_key(access_token):
+    return hashlib.sha1(access_token.encode("utf-8")).hexdigest()[:16] if access_token else None
+
+
+def current_priority():
+    return getattr(_local, "priority", INTERACTIVE)
+
+
+@contextmanager
+def graph_priority(priority):
+    """Runs the Graph calls made inside the block (on this thread) at `priority`."""
+    previous = current_priority()
+    _local.priority = priority
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+def _usage_percent(usage):
+    return max(
+        float(usage.get(field) or 0)
+        for field in ("call_count", "total_cputime", "total_time", "acc_id_util_pct")
+    )
+
+
+def _parse_header(value):
+    if not value:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return None
+
+
+class Scope:
+    """Last reported usage (percent of the limit) of one app, token or business."""
+
+    __slots__ = ("usage", "updated_at", "regain_at")
+
+    def __init__(self):
+        self.usage = 0.0
+        self.updated_at = 0.0
+        self.regain_at = 0.0
+
+    def current(self, now):
+        # calls age out of the rolling window, so assume usage falls linearly
+        return self.usage * max(0.0, 1 - (now - self.updated_at) / WINDOW_SECONDS)
+
+    def as_dict(self, now):
+        return {
+            "usage": round(self.current(now), 1),
+            "reported_usage": self.usage,
+            "reported_at": self.updated_at or None,
+            "throttled_for": max(0, round(self.regain_at - now)),
+        }
+
+
+class RateGovernor:
+    """
+    Per-app, per-token and per-business Graph API budget, fed from the
+    X-App-Usage, X-Page-Usage and X-Business-Use-Case-Usage headers of every
+    response this process sees.
+
+    Interactive calls go straight through until a scope is throttled or
+    within GRAPH_BUDGET_INTERACTIVE_LIMIT percent of its limit; then they
+    fail fast instead of extending Meta's block. Background calls are queued
+    (GRAPH_BUDGET_BACKGROUND_CONCURRENCY at a time), slowed down once usage
+    passes GRAPH_BUDGET_SLOWDOWN_FROM and held back entirely above
+    GRAPH_BUDGET_BACKGROUND_LIMIT, so they give way long before interactive
+    traffic would be throttled.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scopes = {}
+        self._token_businesses = {}
+        self._background = threading.BoundedSemaphore(
+            getattr(settings, "GRAPH_BUDGET_BACKGROUND_CONCURRENCY", 2)
+        )
+
+    def _scope(self, name):
+        scope = self._scopes.get(name)
+        if scope is None:
+            scope = self._scopes[name] = Scope()
+        return scope
+
+    def _update(self, name, usage, regain_minutes=None):
+        now = time.time()
+        with self._lock:
+            scope = self._scope(name)
+            scope.usage = usage
+            scope.updated_at = now
+            # X-App-Usage carries no regain estimate; keep any throttle we saw
+            if regain_minutes is not None:
+                scope.regain_at = now + regain_minutes * 60
+
+    def record(self, access_token, headers):
+        """Updates the budget from the usage headers of one response."""
+        key = token_key(access_token)
+
+        app_usage = _parse_header(headers.get("X-App-Usage"))
+        if app_usage:
+            self._update("app", _usage_percent(app_usage))
+
+        page_usage = _parse_header(headers.get("X-Page-Usage"))
+        if page_usage and key:
+            self._update(f"token:{key}", _usage_percent(page_usage),
+                         page_usage.get("estimated_time_to_regain_access") or 0)
+
+        business_usage = _parse_header(headers.get("X-Business-Use-Case-Usage"))
+        if business_usage:
+            for business_id, entries in business_usage.items():
+                for entry in entries:
+                    name = f"business:{business_id}:{entry.get('type', 'default')}"
+                    self._update(name, _usage_percent(entry), entry.get("estimated_time_to_regain_access") or 0)
+                    if key:
+                        with self._lock:
+                            self._token_businesses.setdefault(key, set()).add(name)
+
+    def record_throttle(self, access_token, code):
+        """Marks the scope behind a throttling error as blocked for a while."""
+        if code not in THROTTLE_ERROR_CODES:
+            return
+        name = "app" if code == 4 else f"token:{token_key(access_token)}" if access_token else "app"
+        now = time.time()
+        with self._lock:
+            scope = self._scope(name)
+            scope.usage = max(scope.usage, 100.0)
+            scope.updated_at = now
+            scope.regain_at = max(scope.regain_at, now + DEFAULT_THROTTLE_SECONDS)
+
+    def usage(self, access_token):
+        """(estimated usage percent, seconds until unthrottled) of the tightest scope a call would hit."""
+        key = token_key(access_token)
+        now = time.time()
+        with self._lock:
+            names = ["app"]
+            if key:
+                names.append(f"token:{key}")
+                names.extend(self._token_businesses.get(key, ()))
+            scopes = [self._scopes[name] for name in names if name in self._scopes]
+            usage = max((scope.current(now) for scope in scopes), default=0.0)
+            blocked = max((scope.regain_at - now for scope in scopes), default=0.0)
+        return usage, max(blocked, 0.0)
+
+    @staticmethod
+    def _seconds_until_below(usage, limit):
+        if usage < limit:
+            return 0.0
+        return WINDOW_SECONDS * (1 - limit / usage)
+
+    @contextmanager
+    def acquire(self, access_token, priority=None):
+        """Waits, or raises BudgetExhausted, until a call at `priority` may go out."""
+        priority = priority or current_priority()
+        if priority != BACKGROUND:
+            usage, blocked = self.usage(access_token)
+            limit = getattr(settings, "GRAPH_BUDGET_INTERACTIVE_LIMIT", 95)
+            if blocked or usage >= limit:
+                retry_after = max(blocked, self._seconds_until_below(usage, limit))
+                raise BudgetExhausted(f"Graph API budget exhausted ({usage:.0f}% used)", retry_after)
+            yield
+            return
+
+        max_wait = getattr(settings, "GRAPH_BUDGET_BACKGROUND_MAX_WAIT", 300)
+        deadline = time.monotonic() + max_wait
+        if not self._background.acquire(timeout=max_wait):
+            raise BudgetExhausted("Timed out queueing background Graph API call", max_wait)
+        try:
+            limit = getattr(settings, "GRAPH_BUDGET_BACKGROUND_LIMIT", 75)
+            slowdown_from = getattr(settings, "GRAPH_BUDGET_SLOWDOWN_FROM", 50)
+            while True:
+                usage, blocked = self.usage(access_token)
+                wait = max(blocked, self._seconds_until_below(usage, limit))
+                if not wait:
+                    break
+                if time.monotonic() + wait > deadline:
+                    raise BudgetExhausted(f"Graph API budget too low for background work ({usage:.0f}% used)", wait)
+                logger.info(f"Holding background Graph API call for {wait:.0f}s ({usage:.0f}% used)")
+                time.sleep(min(wait, 30))
+
+            if usage > slowdown_from:
+                # stretch background calls out as the budget shrinks
+                time.sleep(getattr(settings, "GRAPH_BUDGET_MAX_DELAY", 2.0) * (usage - slowdown_from) / (limit - slowdown_from))
+            yield
+        finally:
+            self._background.release()
+
+    def snapshot(self, access_tokens=None):
+        """Current budget of the app and of the given tokens (with their businesses)."""
+        now = time.time()
+        with self._lock:
+            result = {"app": self._scope("app").as_dict(now), "tokens": {}}
+            for access_token in access_tokens or []:
+                key = token_key(access_token)
+                if not key:
+                    continue
+                budget = {}
+                if f"token:{key}" in self._scopes:
+                    budget["token"] = self._scopes[f"token:{key}"].as_dict(now)
+                for name in sorted(self._token_businesses.get(key, ())):
+                    budget[name] = self._scopes[name].as_dict(now)
+                result["tokens"][key] = budget
+        return result
+
+
+governor = RateGovernor()
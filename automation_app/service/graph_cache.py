@@ -0,0 +1,186 @@
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from .graph_client import graph, GraphAPIError
+from .graph_budget import graph_priority, BACKGROUND
+
+
+logger = logging.getLogger(__name__)
+
+# seconds a response is fresh, per endpoint kind; "insights:<metric>" overrides a metric
+DEFAULT_TTLS = {
+    "profile": 600,
+    "media": 300,
+    "insights": 1800,
+    "insights:reach": 3600,
+    "insights:page_impressions_unique": 3600,
+}
+# how long past its TTL a response may still be served while it refreshes
+DEFAULT_STALE_SECONDS = 6 * 3600
+REFRESH_LOCK_SECONDS = 30
+
+_refresher = ThreadPoolExecutor(max_workers=4, thread_name_prefix="graph-cache")
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def ttl_for(kind, metric=None):
+    ttls = {**DEFAULT_TTLS, **getattr(settings, "GRAPH_CACHE_TTLS", {})}
+    if metric:
+        # several comma-separated metrics: the shortest TTL wins
+        metric_ttls = [ttls.get(f"{kind}:{m.strip()}") for m in str(metric).split(",")]
+        metric_ttls = [ttl for ttl in metric_ttls if ttl]
+        if metric_ttls:
+            return min(metric_ttls)
+    return ttls.get(kind, 300)
+
+
+def cache_key(path, access_token, params):
+    """(endpoint, account, params) key; the token is hashed in so users never share entries."""
+    raw = "|".join([
+        graph.version,
+        path,
+        hashlib.sha1((access_token or "").encode("utf-8")).hexdigest()[:16],
+        "&".join(f"{k}={params[k]}" for k in sorted(params)),
+    ])
+    return "graph:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _fetch(key, path, access_token, params, ttl, stale):
+    data = graph.get(path, access_token, **params)
+    cache.set(key, {"data": data, "fetched_at": time.time()}, timeout=ttl + stale)
+    return data
+
+
+def _single_flight(key, path, access_token, params, ttl, stale):
+    """Fetches once per key in this process; concurrent callers wait for the same result."""
+    with _inflight_lock:
+        event = _inflight.get(key)
+        leader = event is None
+        if leader:
+            event = _inflight[key] = threading.Event()
+
+    if not leader:
+        event.wait(timeout=graph.timeout * 2)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry["data"]
+        # the leader failed; fetch ourselves so the error reaches this caller too
+
+    try:
+        return _fetch(key, path, access_token, params, ttl, stale)
+    finally:
+        if leader:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+            event.set()
+
+
+def _refresh(key, path, access_token, params, ttl, stale):
+    try:
+        # nobody is waiting on a refresh, so it yields to interactive calls
+        with graph_priority(BACKGROUND):
+            _single_flight(key, path, access_token, params, ttl, stale)
+    except Exception as e:
+        logger.warning(f"Background refresh of {path} failed: {e}")
+    finally:
+        cache.delete(f"{key}:refreshing")
+
+
+def cached_graph_get(path, access_token, kind, ttl=None, **params):
+    """
+    graph.get() behind a TTL cache with stale-while-revalidate.
+
+    Fresh entries are returned directly. Entries past their TTL but within
+    GRAPH_CACHE_STALE_SECONDS are returned immediately while one background
+    refresh runs; the cache.add lock keeps other workers/processes from
+    refreshing the same key at the same time. Misses fetch synchronously,
+    deduplicated within the process. Errors are never cached.
+
+    `kind` picks the TTL (see DEFAULT_TTLS) unless `ttl` is given.
+    Returns (data, status) where status is "hit", "stale" or "miss".
+    """
+    ttl = ttl or ttl_for(kind, params.get("metric"))
+    stale = getattr(settings, "GRAPH_CACHE_STALE_SECONDS", DEFAULT_STALE_SECONDS)
+    key = cache_key(path, access_token, params)
+
+    entry = cache.get(key)
+    if entry is not None:
+        age = time.time() - entry["fetched_at"]
+        if age < ttl:
+            return entry["data"], "hit"
+        if cache.add(f"{key}:refreshing", 1, timeout=REFRESH_LOCK_SECONDS):
+            _refresher.submit(_refresh, key, path, access_token, params, ttl, stale)
+        return entry["data"], "stale"
+
+    return _single_flight(key, path, access_token, params, ttl, stale), "miss"
+
+
+def _store_many(keyed_calls, ttl_stale):
+    """Fetches keyed calls in Graph batches and caches the successful items."""
+    results = graph.get_many([(path, token, params) for _, path, token, params in keyed_calls])
+    for (key, *_), result in zip(keyed_calls, results):
+        if key is not None and not isinstance(result, GraphAPIError):
+            ttl, stale = ttl_stale[key]
+            cache.set(key, {"data": result, "fetched_at": time.time()}, timeout=ttl + stale)
+    return results
+
+
+def _refresh_many(keyed_calls, ttl_stale):
+    try:
+        with graph_priority(BACKGROUND):
+            _store_many(keyed_calls, ttl_stale)
+    except Exception as e:
+        logger.warning(f"Background batch refresh of {len(keyed_calls)} Graph calls failed: {e}")
+    finally:
+        cache.delete_many([f"{key}:refreshing" for key, *_ in keyed_calls])
+
+
+def cached_graph_get_many(calls):
+    """
+    cached_graph_get() for several calls at once. `calls` is a list of
+    (path, access_token, kind, params) tuples; kind=None bypasses the cache.
+    Fresh and stale entries are served from the cache as usual, and every
+    miss (and every background refresh) goes out together as Graph batch
+    requests, so a page touching many endpoints costs one round-trip.
+
+    Returns one (data, status) pair per call, in order; a failed item has a
+    GraphAPIError as its data and "error" as its status.
+    """
+    stale_seconds = getattr(settings, "GRAPH_CACHE_STALE_SECONDS", DEFAULT_STALE_SECONDS)
+    entries = [None] * len(calls)
+    misses, refreshes, ttl_stale = [], [], {}
+
+    for i, (path, access_token, kind, params) in enumerate(calls):
+        params = dict(params or {})
+        if kind is None:
+            misses.append((i, (None, path, access_token, params)))
+            continue
+
+        ttl = ttl_for(kind, params.get("metric"))
+        key = cache_key(path, access_token, params)
+        ttl_stale[key] = (ttl, stale_seconds)
+
+        entry = cache.get(key)
+        if entry is None:
+            misses.append((i, (key, path, access_token, params)))
+        elif time.time() - entry["fetched_at"] < ttl:
+            entries[i] = (entry["data"], "hit")
+        else:
+            entries[i] = (entry["data"], "stale")
+            if cache.add(f"{key}:refreshing", 1, timeout=REFRESH_LOCK_SECONDS):
+                refreshes.append((key, path, access_token, params))
+
+    if refreshes:
+        _refresher.submit(_refresh_many, refreshes, ttl_stale)
+
+    if misses:
+        results = _store_many([call for _, call in misses], ttl_stale)
+        for (i, _), result in zip(misses, results):
+            entries[i] = (result, "error" if isinstance(result, GraphAPIError) else "miss")
+
+    return entries
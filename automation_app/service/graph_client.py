@@ -0,0 +1,220 @@
+import time
+import json
+import random
+import logging
+import requests
+from urllib.parse import urlencode, urlsplit, parse_qs
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+from django.conf import settings
+from .graph_budget import governor, BudgetExhausted
+
+
+logger = logging.getLogger(__name__)
+
+GRAPH_BASE_URL = "https://graph.facebook.com"
+
+# Graph error codes that mean "try again": unknown/service errors and throttling
+TRANSIENT_ERROR_CODES = {1, 2, 4, 17, 32, 341, 613}
+
+# the Graph API accepts at most this many sub-requests per batch call
+MAX_BATCH_SIZE = 50
+
+
+class GraphAPIError(Exception):
+    """A failed Graph API call. `payload` is the decoded error body when there is one."""
+
+    def __init__(self, message, status=None, payload=None):
+        super().__init__(message)
+        self.status = status
+        self.payload = payload or {}
+
+    @property
+    def code(self):
+        return self.payload.get("error", {}).get("code")
+
+    @property
+    def is_transient(self):
+        error = self.payload.get("error", {})
+        return self.code in TRANSIENT_ERROR_CODES or bool(error.get("is_transient"))
+
+
+class GraphClient:
+    """
+    Meta Graph API client on one pooled requests.Session.
+
+    Connection errors and 5xx responses are retried by the transport;
+    transient Graph error codes (throttling, "please retry") are retried
+    here with jittered exponential backoff. Every call uses the configured
+    GRAPH_API_VERSION and a default timeout.
+    """
+
+    def __init__(self, version=None, timeout=None, retries=None, pool_size=None):
+        self.version = version or getattr(settings, "GRAPH_API_VERSION", "v24.0")
+        self.timeout = timeout or getattr(settings, "GRAPH_API_TIMEOUT", 15)
+        self.retries = retries if retries is not None else getattr(settings, "GRAPH_API_RETRIES", 3)
+        pool_size = pool_size or getattr(settings, "GRAPH_API_POOL_SIZE", 20)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=self.retries,
+                backoff_factor=0.5,
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("https://", adapter)
+
+    def url(self, path):
+        return f"{GRAPH_BASE_URL}/{self.version}/{path.lstrip('/')}"
+
+    def request(self, method, path, access_token=None, params=None, priority=None, **kwargs):
+        """
+        Performs one call and returns the decoded JSON body, or raises
+        GraphAPIError. Every call first passes the rate-limit governor at
+        `priority` (default: the thread's graph_priority(), "interactive").
+        """
+        params = dict(params or {})
+        if access_token:
+            params["access_token"] = access_token
+        url = path if path.startswith("https://") else self.url(path)
+        kwargs.setdefault("timeout", self.timeout)
+        # paging links carry their token in the URL
+        budget_token = access_token or parse_qs(urlsplit(url).query).get("access_token", [None])[0]
+
+        for attempt in range(self.retries + 1):
+            try:
+                with governor.acquire(budget_token, priority):
+                    response = self.session.request(method, url, params=params, **kwargs)
+            except BudgetExhausted as e:
+                raise GraphAPIError(
+                    str(e),
+                    status=429,
+                    payload={"error": {"message": str(e), "type": "BudgetExhausted", "retry_after": round(e.retry_after)}},
+                ) from e
+            except requests.RequestException as e:
+                raise GraphAPIError(f"Graph API request failed: {e}") from e
+            governor.record(budget_token, response.headers)
+
+            try:
+                data = response.json()
+            except ValueError:
+                data = {}
+
+            if response.ok and not (isinstance(data, dict) and "error" in data):
+                return data
+            if not isinstance(data, dict):
+                data = {}
+
+            error = GraphAPIError(
+                data.get("error", {}).get("message") or f"Graph API returned {response.status_code}",
+                status=response.status_code,
+                payload=data,
+            )
+            governor.record_throttle(budget_token, error.code)
+            if not error.is_transient or attempt == self.retries:
+                raise error
+
+            delay = min(0.5 * 2 ** attempt, 8) * random.uniform(0.5, 1.5)
+            logger.warning(f"Transient Graph API error {error.code} on {path}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    def get(self, path, access_token=None, priority=None, **params):
+        return self.request("GET", path, access_token=access_token, params=params, priority=priority)
+
+    def paginate(self, path, access_token=None, max_pages=None, **params):
+        """
+        Yields the items of a list edge (e.g. /{id}/media) across all pages,
+        following the `paging.next` cursors. Stop iterating early to avoid
+        fetching further pages.
+        """
+        data = self.get(path, access_token=access_token, **params)
+        pages = 1
+        while True:
+            yield from data.get("data", [])
+
+            next_url = data.get("paging", {}).get("next")
+            if not next_url or (max_pages and pages >= max_pages):
+                return
+            # the next link already carries every parameter, including the token
+            data = self.request("GET", next_url)
+            pages += 1
+
+    def get_many(self, calls):
+        """
+        Runs many GETs as Graph batch requests, MAX_BATCH_SIZE per HTTP call.
+        `calls` is a list of (path, access_token, params) tuples; sub-requests
+        may use different tokens. Returns one entry per call, in order: the
+        decoded body, or a GraphAPIError for that item alone. Items Graph
+        left unanswered (it returns null for sub-requests that time out) are
+        retried once in a follow-up batch.
+        """
+        results = [None] * len(calls)
+        pending = list(range(len(calls)))
+
+        for _ in range(2):
+            unanswered = []
+            for start in range(0, len(pending), MAX_BATCH_SIZE):
+                chunk = pending[start:start + MAX_BATCH_SIZE]
+                batch = []
+                for i in chunk:
+                    path, access_token, params = calls[i]
+                    query = dict(params or {})
+                    if access_token:
+                        query["access_token"] = access_token
+                    batch.append({"method": "GET", "relative_url": f"{path.lstrip('/')}?{urlencode(query)}"})
+
+                try:
+                    responses = self.request(
+                        "POST",
+                        "",
+                        # the top-level token is only a fallback; each item carries its own
+                        access_token=calls[chunk[0]][1],
+                        data={"batch": json.dumps(batch), "include_headers": "true"},
+                    )
+                except GraphAPIError as e:
+                    for i in chunk:
+                        results[i] = e
+                    continue
+
+                for i, item in zip(chunk, responses):
+                    if item is None:
+                        unanswered.append(i)
+                        continue
+                    # sub-requests report usage for their own token
+                    governor.record(calls[i][1], CaseInsensitiveDict({h["name"]: h["value"] for h in item.get("headers") or []}))
+                    results[i] = self._decode_batch_item(item)
+                    if isinstance(results[i], GraphAPIError):
+                        governor.record_throttle(calls[i][1], results[i].code)
+
+            pending = unanswered
+            if not pending:
+                break
+
+        for i in pending:
+            results[i] = GraphAPIError("Graph batch sub-request did not complete")
+        return results
+
+    @staticmethod
+    def _decode_batch_item(item):
+        try:
+            body = json.loads(item.get("body") or "{}")
+        except ValueError:
+            body = {}
+        if item.get("code") == 200 and not (isinstance(body, dict) and "error" in body):
+            return body
+        if not isinstance(body, dict):
+            body = {}
+        return GraphAPIError(
+            body.get("error", {}).get("message") or f"Graph API returned {item.get('code')}",
+            status=item.get("code"),
+            payload=body,
+        )
+
+
+graph = GraphClient()
@@ -0,0 +1,100 @@
+import sys
+from array import array
+from datetime import timezone as dt_timezone
+from zoneinfo import ZoneInfo
+from django.db import transaction
+from django.utils import timezone
+from ..models import ActivityHeatmap
+from .social_sources import source_for
+
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+SLOTS = 7 * 24
+
+
+def pack_counts(counts):
+    packed = array("I", counts)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_counts(blob):
+    counts = array("I")
+    if blob:
+        counts.frombytes(bytes(blob))
+        if sys.byteorder == "big":
+            counts.byteswap()
+    return counts if len(counts) == SLOTS else array("I", [0] * SLOTS)
+
+
+def slot(moment):
+    """Heatmap slot (Monday 00:00 UTC = 0) of an aware datetime."""
+    moment = moment.astimezone(dt_timezone.utc)
+    return moment.weekday() * 24 + moment.hour
+
+
+def merge_heatmap(platform, account_id, kind, increments):
+    """Adds {slot: count} into the account's heatmap row, locking it for the update."""
+    with transaction.atomic():
+        row, _ = ActivityHeatmap.objects.select_for_update().get_or_create(
+            platform=platform, account_id=account_id, kind=kind
+        )
+        counts = unpack_counts(row.counts)
+        for index, count in increments.items():
+            counts[index] += count
+        row.counts = pack_counts(counts)
+        row.save(update_fields=["counts", "updated_at"])
+
+
+def record_activity(obj):
+    """Counts one freshly ingested message/comment into its account's heatmap."""
+    source = source_for(obj)
+    account_id = getattr(obj, source.account_field)
+    if not account_id or not obj.timestamp:
+        return
+    merge_heatmap(source.platform, account_id, source.kind, {slot(obj.timestamp): 1})
+
+
+def _offset_hours(tz_name):
+    # whole-hour shift of the zone's current UTC offset (half-hour zones round down)
+    offset = timezone.now().astimezone(ZoneInfo(tz_name)).utcoffset()
+    return int(offset.total_seconds() // 3600)
+
+
+def activity_heatmap(platform, account_id, kind="message", tz_name=None):
+    """
+    7x24 activity matrix (rows Monday..Sunday, columns hours 0..23) of an
+    account, optionally shifted into `tz_name` (an IANA zone such as
+    "Asia/Riyadh") by its current offset. Also returns totals per day and
+    hour and the busiest slots. Raises ValueError for unknown zones.
+    """
+    try:
+        shift = _offset_hours(tz_name) if tz_name else 0
+    except (KeyError, ValueError):
+        raise ValueError(f"Unknown time zone: {tz_name}")
+
+    blob = ActivityHeatmap.objects.filter(
+        platform=platform, account_id=account_id, kind=kind
+    ).values_list("counts", flat=True).first()
+    counts = unpack_counts(blob)
+    if shift:
+        # a UTC slot s shows up at local slot s + shift
+        counts = array("I", [counts[(index - shift) % SLOTS] for index in range(SLOTS)])
+
+    matrix = [list(counts[day * 24:(day + 1) * 24]) for day in range(7)]
+    peaks = sorted(range(SLOTS), key=lambda index: -counts[index])[:3]
+    return {
+        "platform": platform,
+        "kind": kind,
+        "timezone": tz_name or "UTC",
+        "days": WEEKDAYS,
+        "matrix": matrix,
+        "total": sum(counts),
+        "by_day": dict(zip(WEEKDAYS, (sum(row) for row in matrix))),
+        "by_hour": [sum(matrix[day][hour] for day in range(7)) for hour in range(24)],
+        "peak_slots": [
+            {"day": WEEKDAYS[index // 24], "hour": index % 24, "count": counts[index]}
+            for index in peaks if counts[index]
+        ],
+    }
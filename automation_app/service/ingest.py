@@ -0,0 +1,38 @@
+from django.db import transaction
+from .neardup import assign_comment_cluster
+from .search import index_social_object
+from .rollups import record_social_rollup
+from .feedback import record_classification_row
+from .heatmap import record_activity
+from .sender_stats import record_sender
+from .response_times import record_response
+from .anomalies import observe_ingest
+
+
+def ingest_social(model, **fields):
+    """
+    Creates a social message/comment and its derived data in one
+    transaction: a failure anywhere (e.g. a locked SQLite database) rolls
+    the whole item back, so the webhook's retry cannot store a duplicate
+    and the rollups always match the stored rows. Work queued on commit
+    (classification, alerts) runs only once it is in.
+    """
+    with transaction.atomic():
+        obj = model.objects.create(**fields)
+        handle_social_ingest(obj)
+    return obj
+
+
+def handle_social_ingest(obj):
+    """
+    Runs the derived-data updates for a freshly saved social message/comment.
+    Call inside the transaction that created the row (see ingest_social).
+    """
+    cluster = assign_comment_cluster(obj)
+    index_social_object(obj)
+    record_social_rollup(obj, duplicate=cluster is not None and cluster.duplicate)
+    record_activity(obj)
+    record_sender(obj)
+    record_response(obj)
+    observe_ingest(obj)
+    record_classification_row(obj, cluster_text_hash=cluster.text_hash if cluster else None)
@@ -0,0 +1,381 @@
+import sys
+import math
+import logging
+from array import array
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from ..models import InsightSeries
+from .graph_budget import graph_priority, BACKGROUND
+from .graph_client import graph, GraphAPIError
+
+
+logger = logging.getLogger(__name__)
+
+# kind: "series" = Graph daily time series (period=day), "total" = Graph
+# total_value over a one-day window, "gauge" = current value of a profile
+# field, sampled hourly by the collector. aggregate: how buckets combine
+# when downsampled ("sum" for flows, "last" for gauges).
+InsightMetric = namedtuple("InsightMetric", ["platform", "name", "kind", "aggregate"])
+
+INSIGHT_METRICS = {
+    "instagram": {
+        "reach": InsightMetric("instagram", "reach", "series", "sum"),
+        "likes": InsightMetric("instagram", "likes", "total", "sum"),
+        "comments": InsightMetric("instagram", "comments", "total", "sum"),
+        "shares": InsightMetric("instagram", "shares", "total", "sum"),
+        "saves": InsightMetric("instagram", "saves", "total", "sum"),
+        "followers_count": InsightMetric("instagram", "followers_count", "gauge", "last"),
+        "follows_count": InsightMetric("instagram", "follows_count", "gauge", "last"),
+        "media_count": InsightMetric("instagram", "media_count", "gauge", "last"),
+    },
+    "facebook": {
+        "page_impressions_unique": InsightMetric("facebook", "page_impressions_unique", "series", "sum"),
+        "page_post_engagements": InsightMetric("facebook", "page_post_engagements", "series", "sum"),
+        "fan_count": InsightMetric("facebook", "fan_count", "gauge", "last"),
+        "followers_count": InsightMetric("facebook", "followers_count", "gauge", "last"),
+    },
+}
+
+# Graph rejects longer insights ranges (30 days for Instagram)
+MAX_GRAPH_SPAN_DAYS = 30
+
+NAN = float("nan")
+
+
+def pack_values(values):
+    packed = array("d", values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_values(blob):
+    values = array("d")
+    if blob:
+        values.frombytes(bytes(blob))
+        if sys.byteorder == "big":
+            values.byteswap()
+    return values
+
+
+def _present(value):
+    return not math.isnan(value)
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+# ---------- writing ----------
+
+def store_daily(platform, account_id, metric, points):
+    """Upserts {day: value} daily points of one metric."""
+    if not points:
+        return
+    existing = {
+        row.day: row
+        for row in InsightSeries.objects.filter(
+            platform=platform, account_id=account_id, metric=metric, resolution="day", day__in=list(points)
+        )
+    }
+    created, changed = [], []
+    for day, value in points.items():
+        blob = pack_values([value])
+        row = existing.get(day)
+        if row is None:
+            created.append(InsightSeries(
+                platform=platform, account_id=account_id, metric=metric, resolution="day", day=day, values=blob
+            ))
+        elif bytes(row.values) != blob:
+            row.values = blob
+            row.updated_at = timezone.now()  # bulk_update skips auto_now
+            changed.append(row)
+    InsightSeries.objects.bulk_create(created, ignore_conflicts=True)
+    if changed:
+        InsightSeries.objects.bulk_update(changed, ["values", "updated_at"])
+
+
+def store_hourly_sample(platform, account_id, metric, value, at=None):
+    """Puts a gauge sample into its hour slot of the day's hourly row."""
+    at = (at or timezone.now()).astimezone(dt_timezone.utc)
+    with transaction.atomic():
+        row, _ = InsightSeries.objects.select_for_update().get_or_create(
+            platform=platform, account_id=account_id, metric=metric, resolution="hour", day=at.date(),
+            defaults={"values": pack_values([NAN] * 24)},
+        )
+        values = unpack_values(row.values)
+        values[at.hour] = value
+        row.values = pack_values(values)
+        row.save(update_fields=["values", "updated_at"])
+
+
+# ---------- fetching from Graph ----------
+
+def _graph_day(end_time):
+    # Graph stamps a day's value with the end of that day
+    return (datetime.fromisoformat(end_time.replace("+0000", "+00:00")) - timedelta(days=1)).date()
+
+
+def _series_path(platform, account_id, metric):
+    # page insights address the metric in the path, as FacebookPageInsightsMetricView does
+    if platform == "facebook":
+        return f"{account_id}/insights/{metric}"
+    return f"{account_id}/insights"
+
+
+def fetch_daily(platform, account_id, access_token, metric, since, until):
+    """
+    Daily values of a flow metric for since..until (inclusive) from Graph,
+    as {day: value}. Long ranges are split into MAX_GRAPH_SPAN_DAYS spans
+    and one-day totals are requested together in Graph batches. Days Graph
+    has no value for come back as NaN, so storing them records that they
+    were fetched and they are not asked for again.
+    """
+    spec = INSIGHT_METRICS[platform][metric]
+    points = {}
+
+    if spec.kind == "series":
+        calls = []
+        start = since
+        while start <= until:
+            end = min(start + timedelta(days=MAX_GRAPH_SPAN_DAYS - 1), until)
+            params = {"period": "day", "since": start.isoformat(), "until": (end + timedelta(days=1)).isoformat()}
+            if platform != "facebook":
+                params["metric"] = metric
+            calls.append((_series_path(platform, account_id, metric), access_token, params))
+            start = end + timedelta(days=1)
+
+        for result in graph.get_many(calls):
+            if isinstance(result, GraphAPIError):
+                raise result
+            for series in result.get("data", []):
+                for point in series.get("values", []):
+                    day = _graph_day(point["end_time"])
+                    if since <= day <= until and isinstance(point.get("value"), (int, float)):
+                        points[day] = float(point["value"])
+
+    elif spec.kind == "total":
+        days = [since + timedelta(days=i) for i in range((until - since).days + 1)]
+        calls = [
+            (f"{account_id}/insights", access_token, {
+                "metric": metric,
+                "period": "day",
+                "metric_type": "total_value",
+                "since": day.isoformat(),
+                "until": (day + timedelta(days=1)).isoformat(),
+            })
+            for day in days
+        ]
+        for day, result in zip(days, graph.get_many(calls)):
+            if isinstance(result, GraphAPIError):
+                raise result
+            for series in result.get("data", []):
+                value = series.get("total_value", {}).get("value")
+                if isinstance(value, (int, float)):
+                    points[day] = float(value)
+
+    for i in range((until - since).days + 1):
+        points.setdefault(since + timedelta(days=i), NAN)
+    return points
+
+
+# ---------- collector ----------
+
+def collect_account(platform, account_id, access_token, days=None):
+    """
+    Scheduled collection for one account at background Graph priority:
+    re-fetches the last `days` complete days of every flow metric (Meta
+    revises recent days) and samples every gauge into this hour's slot.
+    Returns the number of daily points stored.
+    """
+    days = days or getattr(settings, "INSIGHTS_COLLECT_DAYS", 3)
+    until = timezone.now().date() - timedelta(days=1)
+    since = until - timedelta(days=days - 1)
+    metrics = INSIGHT_METRICS[platform]
+    stored = 0
+
+    with graph_priority(BACKGROUND):
+        for spec in metrics.values():
+            if spec.kind == "gauge":
+                continue
+            try:
+                points = fetch_daily(platform, account_id, access_token, spec.name, since, until)
+            except GraphAPIError as e:
+                logger.warning(f"Collecting {platform} {spec.name} for {account_id} failed: {e}")
+                continue
+            store_daily(platform, account_id, spec.name, points)
+            stored += len(points)
+
+        gauges = [spec.name for spec in metrics.values() if spec.kind == "gauge"]
+        if gauges:
+            try:
+                profile = graph.get(account_id, access_token, fields=",".join(gauges))
+            except GraphAPIError as e:
+                logger.warning(f"Sampling {platform} profile counts for {account_id} failed: {e}")
+            else:
+                now = timezone.now()
+                for name in gauges:
+                    if isinstance(profile.get(name), (int, float)):
+                        store_hourly_sample(platform, account_id, name, float(profile[name]), now)
+
+    return stored
+
+
+def _aggregate(values, how):
+    present = [value for value in values if _present(value)]
+    if not present:
+        return None
+    return present[-1] if how == "last" else sum(present)
+
+
+def downsample(today=None):
+    """
+    Rolls finished hourly rows into daily values, drops hourly rows past
+    INSIGHTS_HOURLY_RETENTION_DAYS, and folds complete weeks of daily rows
+    older than INSIGHTS_DAILY_RETENTION_DAYS into weekly rows.
+    Returns (days written, weeks written).
+    """
+    today = today or timezone.now().date()
+    specs = {(spec.platform, spec.name): spec for metrics in INSIGHT_METRICS.values() for spec in metrics.values()}
+    days_written = weeks_written = 0
+
+    finished = InsightSeries.objects.filter(resolution="hour", day__lt=today)
+    by_series = {}
+    for row in finished.iterator():
+        spec = specs.get((row.platform, row.metric))
+        value = _aggregate(unpack_values(row.values), spec.aggregate if spec else "last")
+        if value is not None:
+            by_series.setdefault((row.platform, row.account_id, row.metric), {})[row.day] = value
+    for (platform, account_id, metric), points in by_series.items():
+        store_daily(platform, account_id, metric, points)
+        days_written += len(points)
+
+    hourly_cutoff = today - timedelta(days=getattr(settings, "INSIGHTS_HOURLY_RETENTION_DAYS", 14))
+    InsightSeries.objects.filter(resolution="hour", day__lt=hourly_cutoff).delete()
+
+    # only whole weeks that ended before the cutoff, so no week is folded twice
+    daily_cutoff = week_start(today - timedelta(days=getattr(settings, "INSIGHTS_DAILY_RETENTION_DAYS", 400)))
+    old_days = InsightSeries.objects.filter(resolution="day", day__lt=daily_cutoff).order_by(
+        "platform", "account_id", "metric", "day"
+    )
+    weeks = {}
+    for row in old_days.iterator():
+        key = (row.platform, row.account_id, row.metric, week_start(row.day))
+        weeks.setdefault(key, []).append(unpack_values(row.values)[0])
+
+    with transaction.atomic():
+        for (platform, account_id, metric, monday), values in weeks.items():
+            spec = specs.get((platform, metric))
+            value = _aggregate(values, spec.aggregate if spec else "sum")
+            # a week of fetched-but-empty days stays marked empty
+            InsightSeries.objects.update_or_create(
+                platform=platform, account_id=account_id, metric=metric, resolution="week", day=monday,
+                defaults={"values": pack_values([NAN if value is None else value])},
+            )
+            weeks_written += 1
+        old_days.delete()
+
+    return days_written, weeks_written
+
+
+# ---------- reading ----------
+
+def _missing_spans(days):
+    """Groups sorted days into contiguous (first, last) spans."""
+    spans = []
+    for day in days:
+        if spans and day == spans[-1][1] + timedelta(days=1):
+            spans[-1][1] = day
+        else:
+            spans.append([day, day])
+    return [tuple(span) for span in spans]
+
+
+def daily_series(platform, account_id, access_token, metric, since, until):
+    """
+    Values of a stored metric over since..until (inclusive), served from the
+    time-series table. Days not stored locally (and not already folded into
+    a weekly bucket) are fetched from Graph, saved, and included. Spans old
+    enough to have been downsampled come back as weekly points.
+
+    Returns (points, source): points are {"day", "value", "period"} dicts
+    in date order; source is "local", "graph" (some spans were fetched) or
+    "partial" (some spans could not be fetched). When nothing is stored for
+    the range and Graph fails, the GraphAPIError is raised instead.
+    """
+    spec = INSIGHT_METRICS[platform][metric]
+    rows = InsightSeries.objects.filter(
+        platform=platform,
+        account_id=account_id,
+        metric=metric,
+        resolution__in=["day", "week"],
+        day__gte=week_start(since),
+        day__lte=until,
+    ).values_list("resolution", "day", "values")
+
+    daily, weekly = {}, {}
+    for resolution, day, blob in rows:
+        value = unpack_values(blob)[0]
+        if resolution == "day" and since <= day:
+            daily[day] = value
+        elif resolution == "week":
+            weekly[day] = value
+
+    today = timezone.now().date()
+    last_complete = min(until, today - timedelta(days=1))
+    history_start = today - timedelta(days=getattr(settings, "INSIGHTS_GRAPH_HISTORY_DAYS", 730))
+    missing = [
+        day for day in (since + timedelta(days=i) for i in range((last_complete - since).days + 1))
+        if day not in daily and week_start(day) not in weekly and day >= history_start
+    ]
+
+    source = "local"
+    stored = bool(daily or weekly)
+    error = None
+    if missing and spec.kind != "gauge":
+        for first, last in _missing_spans(missing):
+            try:
+                points = fetch_daily(platform, account_id, access_token, metric, first, last)
+            except GraphAPIError as e:
+                logger.warning(f"Graph fallback for {platform} {metric} {first}..{last} failed: {e}")
+                source = "partial"
+                error = e
+                continue
+            store_daily(platform, account_id, metric, points)
+            daily.update(points)
+            stored = True
+            if source == "local":
+                source = "graph"
+    if error is not None and not stored:
+        raise error
+
+    points = [
+        {"day": day, "value": value, "period": "week"}
+        for day, value in weekly.items() if _present(value)
+    ] + [
+        {"day": day, "value": value, "period": "day"}
+        for day, value in daily.items() if _present(value)
+    ]
+    points.sort(key=lambda point: point["day"])
+    return points, source
+
+
+def graph_shaped(metric, points):
+    """Points in the {"data": [{"name", "period", "values"}]} shape of a Graph insights response."""
+    return {
+        "data": [{
+            "name": metric,
+            "period": "day",
+            "values": [
+                {
+                    "value": int(point["value"]) if float(point["value"]).is_integer() else point["value"],
+                    "end_time": f"{point['day'] + timedelta(days=7 if point['period'] == 'week' else 1)}T08:00:00+0000",
+                    **({"period": "week"} if point["period"] == "week" else {}),
+                }
+                for point in points
+            ],
+        }]
+    }
@@ -1,102 +1,79 @@
-from datetime import datetime, time
-from collections import Counter
-from ..utils import get_month_range,gpt_classify_text
-from ..models import InstagramMessage, InstagramComment
-import requests
-
-def monthly_report(user, year, month):
-    start_date, end_date = get_month_range(year, month)
-    instagram_id = user.instagram_account_id
-
-    start_dt = datetime.combine(start_date, time.min)
-    end_dt = datetime.combine(end_date, time.max)
-
-    messages = InstagramMessage.objects.filter(
-        recipient_id=instagram_id,
-        timestamp__range=(start_dt, end_dt)
+from .feedback import feedback_report
+from ..utils import get_month_range
+from .graph_client import GraphAPIError
+from . import analytics, social_posts, post_stats
+
+def monthly_report(user, year, month, exact=False, include_bursts=True):
+    return analytics.monthly_report(
+        "instagram", user.instagram_account_id, year, month, exact=exact, include_bursts=include_bursts
     )
 
-    comments = InstagramComment.objects.filter(
-        recipient_id=instagram_id,
-        timestamp__range=(start_dt, end_dt)
-    )
-
-    unique_senders = set(
-        list(messages.values_list("sender_id", flat=True)) +
-        list(comments.values_list("sender_id", flat=True))
-    )
-
-    days = (end_date - start_date).days + 1
 
+def _media_dict(post, score):
+    # same shape as the Graph media objects this report used to return
     return {
-        "period": start_date.strftime("%Y-%m"),
-        "messages_total": messages.count(),
-        "messages_daily_avg": round(messages.count() / days, 2),
-        "comments_total": comments.count(),
-        "comments_daily_avg": round(comments.count() / days, 2),
-        "conversations": len(unique_senders),
+        "id": post.post_id,
+        "permalink": post.permalink,
+        "timestamp": post.posted_at.isoformat(),
+        "like_count": post.likes,
+        "comments_count": post.comments,
+        "engagement": post.engagement,
+        "score": score,
     }
 
 
-def best_worst_posts(user, year, month):
+def best_worst_posts(user, year, month, limit=1, weights=None):
+    """
+    Best and worst posts of a month from the synced post mirror, ranked by
+    likes + comments unless other score `weights` are given. best_post /
+    worst_post are the top entries of the `limit`-long lists.
+    """
     start_date, end_date = get_month_range(year, month)
 
-    url = f"https://graph.facebook.com/v23.0/{user.instagram_account_id}/media"
-    params = {
-        "fields": "id,permalink,timestamp,like_count,comments_count",
-        "access_token": user.instagram_access_token,
-        "limit": 50
-    }
-
-    data = requests.get(url, params=params).json().get("data", [])
+    try:
+        social_posts.ensure_synced("instagram", user.instagram_account_id, user.instagram_access_token)
+    except GraphAPIError as e:
+        return {"error": "Instagram API error", "details": e.payload}
 
-    posts = []
-    for post in data:
-        post_date = datetime.fromisoformat(post["timestamp"]).date()
-        if start_date <= post_date <= end_date:
-            engagement = post.get("like_count", 0) + post.get("comments_count", 0)
-            post["engagement"] = engagement
-            posts.append(post)
-
-    if not posts:
-        return None
+    result = social_posts.best_worst_posts("instagram", user.instagram_account_id, start_date, end_date, limit, weights)
+    if result is None:
+        return social_posts.still_syncing("instagram", user.instagram_account_id, start_date)
 
+    best = [_media_dict(post, score) for score, post in result["best"]]
+    worst = [_media_dict(post, score) for score, post in result["worst"]]
     return {
-        "best_post": max(posts, key=lambda x: x["engagement"]),
-        "worst_post": min(posts, key=lambda x: x["engagement"]),
+        "best_post": best[0],
+        "worst_post": worst[0],
+        "best_posts": best,
+        "worst_posts": worst,
     }
 
 
-def complaints_and_reviews(user, year, month):
-    start_date, end_date = get_month_range(year, month)
-    instagram_id = user.instagram_account_id
-
-    messages = InstagramMessage.objects.filter(
-        recipient_id=instagram_id,
-        timestamp__date__range=(start_date, end_date)
-    )
+def post_statistics(user, year=None, month=None):
+    """
+    Percentiles, trends, day/hour effects and outliers of post engagement
+    for one month, or the whole synced history when no month is given.
+    """
+    start_date = end_date = None
+    if year and month:
+        start_date, end_date = get_month_range(year, month)
 
-    comments = InstagramComment.objects.filter(
-        recipient_id=instagram_id,
-        timestamp__date__range=(start_date, end_date)
-    )
+    if not user.instagram_account_id or not user.instagram_access_token:
+        return {"error": "Instagram account or access token missing"}
 
-    complaints = []
-    sentiment = {"Positive": 0, "Neutral": 0, "Negative": 0}
+    try:
+        social_posts.ensure_synced("instagram", user.instagram_account_id, user.instagram_access_token)
+    except GraphAPIError as e:
+        return {"error": "Instagram API error", "details": e.payload}
 
-    for obj in list(messages) + list(comments):
-        text = getattr(obj, "message", None) or obj.comment
-        s = gpt_classify_text(text, "sentiment")
-        c = gpt_classify_text(text, "complaint")
+    stats = post_stats.post_statistics("instagram", user.instagram_account_id, start_date, end_date)
+    if stats is None:
+        return social_posts.still_syncing("instagram", user.instagram_account_id, start_date) or {"message": "No posts in this period"}
+    return stats
 
-        if s in sentiment:
-            sentiment[s] += 1
-        if c == "Yes":
-            complaints.append(text)
 
-    top = Counter(complaints).most_common(5)
+def complaints_and_reviews(user, year, month, include_bursts=True):
+    start_date, end_date = get_month_range(year, month)
+    instagram_id = user.instagram_account_id
 
-    return {
-        "sentiment": sentiment,
-        "top_complaints": [{"topic": k, "count": v} for k, v in top]
-    }
+    return feedback_report("instagram", instagram_id, start_date, end_date, include_bursts=include_bursts)
@@ -0,0 +1,248 @@
+import random
+import threading
+import logging
+import traceback
+from collections import namedtuple
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from ..models import Job
+
+
+logger = logging.getLogger(__name__)
+
+# queue/priority/max_attempts are the defaults for jobs of this task; enqueue() may override them
+Task = namedtuple("Task", ["name", "run", "queue", "priority", "max_attempts"])
+
+TASKS = {}
+
+
+def task(name, queue="default", priority=0, max_attempts=None):
+    """Registers a function as a task that enqueue() can defer by name."""
+    def register(run):
+        TASKS[name] = Task(name, run, queue, priority, max_attempts or getattr(settings, "JOB_MAX_ATTEMPTS", 5))
+        return run
+    return register
+
+
+def _run_eagerly(spec, args, kwargs):
+    try:
+        spec.run(*args, **kwargs)
+    except Exception:
+        logger.exception(f"Job {spec.name} failed")
+
+
+def enqueue(name, args=(), kwargs=None, queue=None, priority=None, delay=0, max_attempts=None, dedupe_key=""):
+    """
+    Stores a job to run `name(*args, **kwargs)` on a worker, no sooner than
+    `delay` seconds from now. Arguments must be JSON-serialisable (dates are
+    sent as ISO strings). The row is part of the caller's transaction, so a
+    rolled back request never leaves a job behind.
+
+    With a `dedupe_key`, nothing is added while a job with that key is still
+    waiting to run; returns None in that case.
+    """
+    spec = TASKS[name]
+    kwargs = kwargs or {}
+    if getattr(settings, "JOBS_EAGER", False):
+        # no worker (local development): run right after the caller commits
+        transaction.on_commit(lambda: _run_eagerly(spec, list(args), kwargs))
+        return None
+
+    if dedupe_key and Job.objects.filter(dedupe_key=dedupe_key, status="queued").exists():
+        return None
+    return Job.objects.create(
+        queue=queue or spec.queue,
+        task=name,
+        args=list(args),
+        kwargs=kwargs,
+        priority=spec.priority if priority is None else priority,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or spec.max_attempts,
+        dedupe_key=dedupe_key,
+    )
+
+
+def _stale_before(now):
+    return now - timedelta(seconds=getattr(settings, "JOB_STALE_SECONDS", 900))
+
+
+def _full_queues(now):
+    """Queues already running as many jobs as JOB_QUEUE_CONCURRENCY allows (across all workers)."""
+    limits = getattr(settings, "JOB_QUEUE_CONCURRENCY", {})
+    if not limits:
+        return []
+    running = (
+        Job.objects.filter(status="running", queue__in=list(limits), locked_at__gte=_stale_before(now))
+        .values("queue")
+        .annotate(n=Count("id"))
+    )
+    return [row["queue"] for row in running if row["n"] >= limits[row["queue"]]]
+
+
+def claim(worker, queues=None):
+    """
+    Takes the most urgent due job (highest priority, then oldest run_at) and
+    marks it running for `worker`. Returns None when nothing can run.
+
+    Databases with SKIP LOCKED (PostgreSQL, MySQL 8) lock the row so
+    concurrent workers pass over it instead of waiting; on SQLite, which
+    serialises writers anyway, the job is taken by a conditional UPDATE and
+    the next candidate is tried if another worker won the race.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(status="queued", run_at__lte=now)
+    if queues:
+        candidates = candidates.filter(queue__in=queues)
+    full = _full_queues(now)
+    if full:
+        candidates = candidates.exclude(queue__in=full)
+    candidates = candidates.order_by("-priority", "run_at", "id")
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = candidates.select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            job.status = "running"
+            job.locked_by = worker
+            job.locked_at = now
+            job.attempts += 1
+            job.save(update_fields=["status", "locked_by", "locked_at", "attempts"])
+        return _within_limit(job, now)
+
+    for job_id in candidates.values_list("id", flat=True)[:10]:
+        taken = Job.objects.filter(id=job_id, status="queued").update(
+            status="running", locked_by=worker, locked_at=now, attempts=F("attempts") + 1
+        )
+        if taken:
+            return _within_limit(Job.objects.get(id=job_id), now)
+    return None
+
+
+def _within_limit(job, now):
+    """
+    Workers that claimed from a queue at the same moment can overshoot its
+    limit; once committed they all see each other, and the ones that came
+    last (by lock time, then id) hand their job back untouched.
+    """
+    limit = getattr(settings, "JOB_QUEUE_CONCURRENCY", {}).get(job.queue)
+    if not limit:
+        return job
+    first = (
+        Job.objects.filter(status="running", queue=job.queue, locked_at__gte=_stale_before(now))
+        .order_by("locked_at", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+    if job.id in set(first):
+        return job
+    Job.objects.filter(id=job.id, status="running", locked_by=job.locked_by).update(
+        status="queued", locked_by="", locked_at=None, attempts=F("attempts") - 1
+    )
+    return None
+
+
+def backoff(attempts):
+    """Seconds before retry number `attempts`: doubling from JOB_RETRY_BASE_SECONDS, capped, with jitter."""
+    base = getattr(settings, "JOB_RETRY_BASE_SECONDS", 30)
+    cap = getattr(settings, "JOB_RETRY_MAX_SECONDS", 3600)
+    return min(base * 2 ** (attempts - 1), cap) * random.uniform(0.8, 1.2)
+
+
+def fail(job, error):
+    """Schedules the job's retry, or dead-letters it once it is out of attempts."""
+    update = {"locked_by": "", "locked_at": None, "last_error": error}
+    if job.attempts >= job.max_attempts:
+        update["status"] = "dead"
+        logger.error(f"Job {job.id} ({job.task}) dead after {job.attempts} attempts")
+    else:
+        update["status"] = "queued"
+        update["run_at"] = timezone.now() + timedelta(seconds=backoff(job.attempts))
+    # a reclaimed job may already be running elsewhere; only its current holder may release it
+    Job.objects.filter(id=job.id, status="running", locked_by=job.locked_by).update(**update)
+
+
+def run_job(job):
+    """Runs a claimed job. Returns True if it succeeded (and was deleted)."""
+    spec = TASKS.get(job.task)
+    try:
+        if spec is None:
+            raise LookupError(f"Unknown task: {job.task}")
+        spec.run(*job.args, **job.kwargs)
+    except Exception:
+        logger.exception(f"Job {job.id} ({job.task}) failed on attempt {job.attempts}")
+        fail(job, traceback.format_exc())
+        return False
+    Job.objects.filter(id=job.id).delete()
+    return True
+
+
+def heartbeat(workers):
+    """
+    Refreshes the lock time of the jobs these workers are running, so only
+    jobs of workers that stopped (crashed, killed) ever turn stale.
+    """
+    return Job.objects.filter(status="running", locked_by__in=list(workers)).update(locked_at=timezone.now())
+
+
+def reclaim_stale(now=None):
+    """
+    Fails jobs whose worker has held them longer than JOB_STALE_SECONDS
+    (crashed or killed), so they are retried or dead-lettered. Returns how
+    many were reclaimed.
+    """
+    stale = Job.objects.filter(status="running", locked_at__lt=_stale_before(now or timezone.now()))
+    reclaimed = 0
+    for job in stale:
+        fail(job, f"Worker {job.locked_by} stopped responding")
+        reclaimed += 1
+    return reclaimed
+
+
+def requeue_dead(queue=None, task_name=None):
+    """Gives dead jobs a fresh set of attempts. Returns how many were requeued."""
+    dead = Job.objects.filter(status="dead")
+    if queue:
+        dead = dead.filter(queue=queue)
+    if task_name:
+        dead = dead.filter(task=task_name)
+    return dead.update(status="queued", attempts=0, run_at=timezone.now(), last_error="")
+
+
+def queue_stats():
+    """{queue: {status: count}} over every stored job."""
+    stats = {}
+    for row in Job.objects.values("queue", "status").annotate(n=Count("id")).order_by("queue"):
+        stats.setdefault(row["queue"], {})[row["status"]] = row["n"]
+    return stats
+
+
+def work(worker, queues=None, poll=1.0, burst=False, stop=None):
+    """
+    One worker thread: claims and runs jobs until `stop` is set, sleeping
+    `poll` seconds whenever nothing is due. With `burst` it returns as soon
+    as nothing is due instead. Returns how many jobs it ran.
+    """
+    stop = stop or threading.Event()
+    ran = 0
+    try:
+        while not stop.is_set():
+            job = None
+            try:
+                job = claim(worker, queues)
+                if job is not None:
+                    run_job(job)
+                    ran += 1
+            except Exception:
+                logger.exception(f"Worker {worker} failed to claim a job")
+            finally:
+                close_old_connections()
+            if job is None:
+                if burst:
+                    break
+                stop.wait(poll)
+    finally:
+        connection.close()
+    return ran
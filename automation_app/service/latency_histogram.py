@@ -0,0 +1,103 @@
+import math
+import sys
+from array import array
+
+
+# four buckets per doubling: bucket bounds are 2^(i/4) seconds apart, so any
+# percentile read back is within ~9% of the true value
+BUCKETS_PER_DOUBLING = 4
+# bucket 0 is [0, 1s); the last one is open-ended from 2^22 s (~48 days)
+BUCKET_COUNT = 1 + 22 * BUCKETS_PER_DOUBLING
+
+
+def bucket_index(seconds):
+    if seconds < 1:
+        return 0
+    index = int(math.log2(seconds) * BUCKETS_PER_DOUBLING) + 1
+    return min(index, BUCKET_COUNT - 1)
+
+
+def bucket_bounds(index):
+    """(lower, upper) seconds of a bucket; the last bucket's upper bound is None."""
+    if index == 0:
+        return 0.0, 1.0
+    lower = 2 ** ((index - 1) / BUCKETS_PER_DOUBLING)
+    upper = 2 ** (index / BUCKETS_PER_DOUBLING) if index < BUCKET_COUNT - 1 else None
+    return lower, upper
+
+
+class LatencyHistogram:
+    """
+    Fixed log-bucket histogram of durations in seconds.
+
+    Constant size (BUCKET_COUNT uint32 counters, ~360 bytes packed) no matter
+    how many values it has seen, and histograms merge by adding counters, so
+    per-day rows can be summed into any period without the raw values.
+    """
+
+    def __init__(self, counts=None):
+        self.counts = array("I", counts) if counts is not None else array("I", [0] * BUCKET_COUNT)
+        if len(self.counts) != BUCKET_COUNT:
+            raise ValueError("bucket count does not match")
+
+    def add(self, seconds, count=1):
+        self.counts[bucket_index(max(seconds, 0))] += count
+
+    def update(self, values):
+        for seconds in values:
+            self.add(seconds)
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        return self
+
+    def total(self):
+        return sum(self.counts)
+
+    def quantile(self, q):
+        """
+        Estimated q-quantile (0..1) in seconds, interpolated geometrically
+        inside the bucket it falls in. None when the histogram is empty.
+        """
+        total = self.total()
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if not count or seen + count < rank:
+                seen += count
+                continue
+            lower, upper = bucket_bounds(index)
+            if upper is None:
+                return lower
+            fraction = (rank - seen) / count
+            if index == 0:
+                return upper * fraction
+            return lower * (upper / lower) ** fraction
+        return bucket_bounds(BUCKET_COUNT - 1)[0]
+
+    def buckets(self):
+        """Non-empty buckets as [(lower, upper, count)]."""
+        return [
+            (*bucket_bounds(index), count)
+            for index, count in enumerate(self.counts) if count
+        ]
+
+    def to_bytes(self):
+        packed = array("I", self.counts)
+        if sys.byteorder == "big":
+            packed.byteswap()
+        return packed.tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob):
+        if not blob:
+            return cls()
+        counts = array("I")
+        counts.frombytes(bytes(blob))
+        if sys.byteorder == "big":
+            counts.byteswap()
+        return cls(counts)
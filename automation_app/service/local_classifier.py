@@ -0,0 +1,327 @@
+import re
+import json
+import math
+import time
+import zlib
+import threading
+from collections import Counter, defaultdict
+from django.conf import settings
+from ..models import LocalClassifier
+from .classifier import DEFAULT_LABEL
+
+
+# bump when the lexicon or tokenizer changes; lexicon-only labels then go stale
+LEXICON_VERSION = 1
+
+_ARABIC_DIACRITICS = re.compile(r"[\u064B-\u0652\u0670\u0640]")  # harakat + tatweel
+_ARABIC_LETTERS = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ى": "ي", "ة": "ه", "ؤ": "و", "ئ": "ي"})
+_REPEATS = re.compile(r"(.)\1{2,}")  # "soooo" / "حلووووو"
+
+# a word (any script, letters only) or a single emoji / symbol
+_TOKEN = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?|[\u2600-\u27BF\U0001F300-\U0001FAFF]")
+
+_NEGATION_SCOPE = 3
+
+
+def normalize_token(token):
+    token = _ARABIC_DIACRITICS.sub("", token.lower()).translate(_ARABIC_LETTERS)
+    token = _REPEATS.sub(r"\1\1", token)
+    if len(token) > 4 and token.startswith("ال"):
+        token = token[2:]
+    return token.replace("'", "")
+
+
+def _lexicon(words):
+    return frozenset(normalize_token(word) for word in words.split())
+
+
+NEGATIONS = _lexicon("""
+    not no never dont didnt doesnt isnt wasnt cant cannot wont nothing nobody
+    لا ما مش مو ليس لم لن مافي
+""")
+
+POSITIVE = _lexicon("""
+    love loved lovely great amazing awesome thanks thank thx perfect excellent good nice
+    best beautiful wonderful happy recommend fantastic helpful fast delicious cute
+    ❤ 😍 👍 🔥 🥰 😊 🙏 👏 💯 😘 🌹 💕 💖 ♥ ✨ 🤩
+    شكرا مشكور مشكورين ممتاز ممتازه رائع رائعه روعه جميل جميله حلو حلوه افضل احسن
+    تسلم تسلمو يعطيكم عافيه حبيت بحب احبكم مبدع مبدعين موفقين
+""")
+
+NEGATIVE = _lexicon("""
+    bad worst terrible awful horrible hate disappointed disappointing poor useless scam
+    rude angry fake overpriced disgusting
+    😡 😠 👎 😞 😢 🤬 😤 💔
+    سيء سيئ سيئه زفت خايس اسوا فاشل نصب نصابين حرامي حراميه كذب كذابين مقرف زعلان
+    غالي مخيب
+""")
+
+COMPLAINT = _lexicon("""
+    refund late delay delayed broken damaged missing wrong cancel cancelled complaint
+    problem issue waiting charged return returned support nobody never arrived
+    مشكله تاخير متاخر استرجاع استرداد مرتجع خربان مكسور تالف ناقص غلط الغاء شكوى
+    وين انتظر
+""")
+
+
+def tokenize(text):
+    """
+    Normalized tokens for a text. Words within a few tokens after a
+    negation are prefixed with "not_" so "not good" doesn't read as praise.
+    """
+    tokens = []
+    negated = 0
+    for raw in _TOKEN.findall(text or ""):
+        token = normalize_token(raw)
+        if token in NEGATIONS:
+            negated = _NEGATION_SCOPE
+            tokens.append(token)
+            continue
+        if negated:
+            token = f"not_{token}"
+            negated -= 1
+        tokens.append(token)
+    return tokens
+
+
+def lexicon_hits(tokens):
+    """Counts of (positive, negative, complaint) lexicon words; negated praise counts as negative."""
+    positive = negative = complaint = 0
+    for token in tokens:
+        negated = token.startswith("not_")
+        word = token[4:] if negated else token
+        if word in POSITIVE:
+            if negated:
+                negative += 1
+            else:
+                positive += 1
+        elif word in NEGATIVE:
+            if negated:
+                positive += 1
+            else:
+                negative += 1
+        if word in COMPLAINT:
+            complaint += 1
+    return positive, negative, complaint
+
+
+def features(tokens):
+    """Bag of tokens plus lexicon indicator features."""
+    positive, negative, complaint = lexicon_hits(tokens)
+    feats = list(tokens)
+    if positive:
+        feats.append("__positive__")
+    if negative:
+        feats.append("__negative__")
+    if complaint:
+        feats.append("__complaint__")
+    return feats
+
+
+def lexicon_label(tokens):
+    """
+    A label from the lexicon alone, only for short one-sided texts such as
+    "thanks ❤️" or "late and broken, terrible". Anything else returns None.
+    """
+    if not tokens or len(tokens) > 8 or any(token.startswith("not_") for token in tokens):
+        return None
+    positive, negative, complaint = lexicon_hits(tokens)
+    if positive and not negative and not complaint:
+        return {"sentiment": "Positive", "complaint": False}
+    if negative and not positive:
+        return {"sentiment": "Negative", "complaint": bool(complaint)} if complaint else None
+    return None
+
+
+class NaiveBayes:
+    """Multinomial naive Bayes with Laplace smoothing over token features."""
+
+    def __init__(self, priors, log_probs):
+        self.priors = priors          # class -> log prior
+        self.log_probs = log_probs    # class -> {feature: log likelihood}
+
+    @classmethod
+    def train(cls, samples, alpha=1.0, min_count=2, max_vocab=20000):
+        """`samples` is a list of (features, label) pairs."""
+        class_docs = Counter()
+        class_counts = defaultdict(Counter)
+        totals = Counter()
+        for feats, label in samples:
+            class_docs[label] += 1
+            class_counts[label].update(feats)
+            totals.update(feats)
+
+        vocab = [feat for feat, count in totals.most_common(max_vocab) if count >= min_count]
+        n_docs = sum(class_docs.values())
+
+        priors, log_probs = {}, {}
+        for label, docs in class_docs.items():
+            counts = class_counts[label]
+            denominator = sum(counts[feat] for feat in vocab) + alpha * (len(vocab) + 1)
+            priors[label] = math.log(docs / n_docs)
+            log_probs[label] = {feat: math.log((counts[feat] + alpha) / denominator) for feat in vocab}
+        return cls(priors, log_probs)
+
+    def predict(self, feats):
+        """Returns (label, probability)."""
+        scores = {}
+        for label, prior in self.priors.items():
+            log_probs = self.log_probs[label]
+            # features outside the vocabulary carry no evidence either way
+            scores[label] = prior + sum(log_probs[feat] for feat in feats if feat in log_probs)
+
+        best = max(scores, key=scores.get)
+        # softmax in log space
+        total = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / total
+
+    def to_dict(self):
+        return {"priors": self.priors, "log_probs": self.log_probs}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["priors"], data["log_probs"])
+
+
+class LocalTextClassifier:
+    """
+    Offline sentiment/complaint tier. Returns a label only when confident;
+    otherwise None, meaning the text should be escalated to the LLM.
+
+    Without a trained model only the lexicon fast path is used.
+    """
+
+    def __init__(self, sentiment_model=None, complaint_model=None, version=None, min_confidence=None):
+        self.sentiment_model = sentiment_model
+        self.complaint_model = complaint_model
+        self.version = version or f"local/lexicon{LEXICON_VERSION}"
+        self.min_confidence = min_confidence or getattr(settings, "LOCAL_CLASSIFIER_MIN_CONFIDENCE", 0.9)
+
+    @classmethod
+    def train(cls, texts, labels):
+        """Fits both models on texts and their {"sentiment", "complaint"} labels."""
+        sentiment_samples = []
+        complaint_samples = []
+        for text, label in zip(texts, labels):
+            feats = features(tokenize(text))
+            sentiment_samples.append((feats, label["sentiment"]))
+            complaint_samples.append((feats, "yes" if label["complaint"] else "no"))
+        return cls(NaiveBayes.train(sentiment_samples), NaiveBayes.train(complaint_samples))
+
+    def predict(self, text):
+        """Returns ({"sentiment", "complaint"}, confidence)."""
+        if not (text or "").strip():
+            return dict(DEFAULT_LABEL), 1.0
+
+        tokens = tokenize(text)
+        rule = lexicon_label(tokens)
+        if self.sentiment_model is None:
+            return (rule, 1.0) if rule else (None, 0.0)
+
+        feats = features(tokens)
+        sentiment, sentiment_p = self.sentiment_model.predict(feats)
+        complaint, complaint_p = self.complaint_model.predict(feats)
+        label = {"sentiment": sentiment, "complaint": complaint == "yes"}
+
+        confidence = min(sentiment_p, complaint_p)
+        if rule and rule != label:
+            confidence = 0.0  # model and lexicon disagree: let the LLM decide
+        return label, confidence
+
+    def classify(self, texts):
+        """One label per text, or None where confidence is below the threshold."""
+        labels = []
+        for text in texts:
+            label, confidence = self.predict(text)
+            labels.append(label if label is not None and confidence >= self.min_confidence else None)
+        return labels
+
+    def to_bytes(self):
+        data = {
+            "lexicon": LEXICON_VERSION,
+            "sentiment": self.sentiment_model.to_dict(),
+            "complaint": self.complaint_model.to_dict(),
+        }
+        return zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+    @classmethod
+    def from_bytes(cls, blob, version=None):
+        data = json.loads(zlib.decompress(bytes(blob)).decode("utf-8"))
+        return cls(
+            NaiveBayes.from_dict(data["sentiment"]),
+            NaiveBayes.from_dict(data["complaint"]),
+            version=version,
+        )
+
+
+def benchmark(classifier, texts, labels):
+    """
+    Throughput and agreement of `classifier` against reference (LLM) labels.
+    Agreement is reported over all texts and over the confident ones that
+    would not be escalated.
+    """
+    started = time.perf_counter()
+    predictions = [classifier.predict(text) for text in texts]
+    elapsed = time.perf_counter() - started
+
+    total = len(texts)
+    sentiment_hits = complaint_hits = 0
+    confident = confident_sentiment_hits = confident_complaint_hits = 0
+    for (label, confidence), expected in zip(predictions, labels):
+        if label is None:
+            continue
+        sentiment_ok = label["sentiment"] == expected["sentiment"]
+        complaint_ok = label["complaint"] == expected["complaint"]
+        sentiment_hits += sentiment_ok
+        complaint_hits += complaint_ok
+        if confidence >= classifier.min_confidence:
+            confident += 1
+            confident_sentiment_hits += sentiment_ok
+            confident_complaint_hits += complaint_ok
+
+    def ratio(part, whole):
+        return round(part / whole, 4) if whole else None
+
+    return {
+        "texts": total,
+        "texts_per_second": round(total / elapsed) if elapsed else None,
+        "sentiment_agreement": ratio(sentiment_hits, total),
+        "complaint_agreement": ratio(complaint_hits, total),
+        "coverage": ratio(confident, total),
+        "confident_sentiment_agreement": ratio(confident_sentiment_hits, confident),
+        "confident_complaint_agreement": ratio(confident_complaint_hits, confident),
+    }
+
+
+# ---------- active model ----------
+
+_cache = {"classifier": None, "pk": None, "checked_at": 0.0}
+_cache_lock = threading.Lock()
+
+
+def get_local_classifier():
+    """
+    The newest trained model (or the lexicon-only tier before any training),
+    reloaded at most every LOCAL_CLASSIFIER_RELOAD_SECONDS. Returns None
+    when the local tier is disabled.
+    """
+    if not getattr(settings, "LOCAL_CLASSIFIER_ENABLED", True):
+        return None
+
+    with _cache_lock:
+        now = time.monotonic()
+        if _cache["classifier"] is not None and now - _cache["checked_at"] < getattr(
+            settings, "LOCAL_CLASSIFIER_RELOAD_SECONDS", 60
+        ):
+            return _cache["classifier"]
+        _cache["checked_at"] = now
+
+        latest_pk = LocalClassifier.objects.values_list("pk", flat=True).first()
+        if _cache["classifier"] is None or latest_pk != _cache["pk"]:
+            if latest_pk is None:
+                _cache["classifier"] = LocalTextClassifier()
+            else:
+                row = LocalClassifier.objects.get(pk=latest_pk)
+                _cache["classifier"] = LocalTextClassifier.from_bytes(row.payload, version=row.version)
+            _cache["pk"] = latest_pk
+        return _cache["classifier"]
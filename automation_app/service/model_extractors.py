@@ -1,20 +1,18 @@
-from django.db.models import Count
-from ..models import InstagramMessage,FacebookMessage
+from .sender_stats import leaderboard
+
 
 def most_active_users(user, limit=5):
-    return list(
-        InstagramMessage.objects
-        .filter(recipient_id=user.instagram_account_id)
-        .values("sender_username")
-        .annotate(total=Count("id"))
-        .order_by("-total")[:limit]
-    )
+    if not user.instagram_account_id:
+        return []
+    return [
+        {"sender_username": row["sender_name"], "sender_id": row["sender_id"], "total": row["messages"]}
+        for row in leaderboard("instagram", user.instagram_account_id, "messages", limit)
+    ]
 
 def Facebook_most_active_users(user, limit=5):
-    return list(
-        FacebookMessage.objects
-        .filter(recipient_page_id=user.facebook_page_id)
-        .values("sender_name", "sender_id")
-        .annotate(total=Count("id"))
-        .order_by("-total")[:limit]
-    )
\ No newline at end of file
+    if not user.facebook_page_id:
+        return []
+    return [
+        {"sender_name": row["sender_name"], "sender_id": row["sender_id"], "total": row["messages"]}
+        for row in leaderboard("facebook", user.facebook_page_id, "messages", limit)
+    ]
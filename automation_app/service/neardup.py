@@ -0,0 +1,193 @@
+import re
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from ..models import CommentCluster
+from .feedback import text_hash
+from .local_classifier import normalize_token
+from .social_sources import source_for
+
+
+ClusterMatch = namedtuple("ClusterMatch", ["id", "text_hash", "duplicate"])
+
+_MASK64 = (1 << 64) - 1
+_BANDS = 4
+_BAND_BITS = 64 // _BANDS
+_RECENT_PER_ACCOUNT = 128
+
+_MENTION = re.compile(r"@[\w.]+")
+_URL = re.compile(r"https?://\S+")
+_WORD = re.compile(r"[^\W\d_]+|[\u2600-\u27BF\U0001F300-\U0001FAFF]")
+
+
+def shingles(text):
+    """Word unigrams and bigrams; mentions and links are collapsed so tag spam matches."""
+    text = _URL.sub(" url ", _MENTION.sub(" mention ", text or ""))
+    words = [normalize_token(w) for w in _WORD.findall(text)]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+# Bit-sliced voting: each byte value maps to its 8 bits spread into 16-bit
+# lanes, so summing the spread hashes counts every bit position at once
+# instead of looping over 64 bits per feature.
+_LANE = 16
+_SPREAD = [
+    sum(1 << (bit * _LANE) for bit in range(8) if byte >> bit & 1)
+    for byte in range(256)
+]
+
+
+def _spread(value):
+    total = 0
+    for i in range(8):
+        total |= _SPREAD[value >> (i * 8) & 0xFF] << (i * 8 * _LANE)
+    return total
+
+
+def simhash(text):
+    """64-bit SimHash of a text; similar texts differ in few bits. 0 for empty texts."""
+    features = shingles(text)[:(1 << _LANE) - 1]
+    if not features:
+        return 0
+    lanes = sum(_spread(_feature_hash(feature)) for feature in features)
+    lane_mask = (1 << _LANE) - 1
+    value = 0
+    for bit in range(64):
+        # bit is set when more than half of the features have it set
+        if 2 * (lanes >> (bit * _LANE) & lane_mask) > len(features):
+            value |= 1 << bit
+    return value
+
+
+def hamming(a, b):
+    return ((a ^ b) & _MASK64).bit_count()
+
+
+def bands(value):
+    mask = (1 << _BAND_BITS) - 1
+    return [(value >> (i * _BAND_BITS)) & mask for i in range(_BANDS)]
+
+
+def _to_signed(value):
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+# ---------- recent clusters (per process) ----------
+
+# bursts hit the same cluster over and over; keeping each account's recent
+# clusters in memory avoids a DB lookup for most burst comments
+_recent = OrderedDict()
+_recent_lock = threading.Lock()
+
+
+def _cached_match(key, value, max_distance, since):
+    with _recent_lock:
+        clusters = _recent.get(key)
+        if not clusters:
+            return None
+        for cluster_id, (cluster_hash, cluster_text_hash, last_seen) in clusters.items():
+            if last_seen >= since and hamming(value, cluster_hash) <= max_distance:
+                clusters.move_to_end(cluster_id)
+                return cluster_id, cluster_text_hash, last_seen
+    return None
+
+
+def _remember(key, cluster_id, value, cluster_text_hash, seen):
+    with _recent_lock:
+        clusters = _recent.setdefault(key, OrderedDict())
+        _recent.move_to_end(key)
+        clusters[cluster_id] = (value, cluster_text_hash, seen)
+        clusters.move_to_end(cluster_id)
+        if len(clusters) > _RECENT_PER_ACCOUNT:
+            clusters.popitem(last=False)
+        if len(_recent) > getattr(settings, "NEAR_DUP_CACHED_ACCOUNTS", 1000):
+            _recent.popitem(last=False)
+
+
+# ---------- ingest ----------
+
+def find_cluster(platform, account_id, value, since, max_distance):
+    """DB lookup of the closest recent cluster within `max_distance` bits."""
+    b0, b1, b2, b3 = bands(value)
+    candidates = CommentCluster.objects.filter(
+        Q(band0=b0) | Q(band1=b1) | Q(band2=b2) | Q(band3=b3),
+        platform=platform,
+        account_id=account_id,
+        last_seen__gte=since,
+    ).values_list("id", "simhash", "text_hash", "last_seen")
+
+    best = None
+    for cluster_id, cluster_hash, cluster_text_hash, last_seen in candidates:
+        distance = hamming(value, cluster_hash)
+        if distance <= max_distance and (best is None or distance < best[0]):
+            best = (distance, cluster_id, cluster_text_hash, last_seen)
+    return best[1:] if best else None
+
+
+def assign_comment_cluster(obj, save=True):
+    """
+    Puts a freshly ingested comment into a near-duplicate cluster, starting
+    a new one when nothing recent on the account is within
+    NEAR_DUP_MAX_DISTANCE bits. Returns a ClusterMatch, or None for
+    messages and empty comments.
+
+    With save=False only obj.dup_cluster_id is set, so callers processing
+    many comments can write them back in bulk.
+    """
+    source = source_for(obj)
+    account_id = getattr(obj, source.account_field)
+    if source.kind != "comment" or not account_id:
+        return None
+
+    value = simhash(getattr(obj, source.text_field))
+    if not value:
+        return None
+
+    max_distance = getattr(settings, "NEAR_DUP_MAX_DISTANCE", 3)
+    seen = obj.timestamp or timezone.now()
+    since = seen - timedelta(hours=getattr(settings, "NEAR_DUP_WINDOW_HOURS", 48))
+    touch_after = timedelta(minutes=getattr(settings, "NEAR_DUP_TOUCH_MINUTES", 10))
+    key = (source.platform, account_id)
+
+    match = _cached_match(key, value, max_distance, since)
+    if match is None:
+        match = find_cluster(source.platform, account_id, value, since, max_distance)
+
+    if match is not None:
+        cluster_id, cluster_text_hash, last_seen = match
+        duplicate = True
+        # a burst hits the same cluster many times a second; only move its
+        # window forward occasionally rather than writing on every comment
+        if seen - last_seen >= touch_after:
+            CommentCluster.objects.filter(pk=cluster_id).update(last_seen=seen)
+            last_seen = seen
+    else:
+        b0, b1, b2, b3 = bands(value)
+        cluster = CommentCluster.objects.create(
+            platform=source.platform,
+            account_id=account_id,
+            simhash=_to_signed(value),
+            band0=b0, band1=b1, band2=b2, band3=b3,
+            first_object_id=obj.pk,
+            text_hash=text_hash(getattr(obj, source.text_field)),
+            last_seen=seen,
+        )
+        cluster_id, cluster_text_hash, last_seen = cluster.pk, cluster.text_hash, seen
+        duplicate = False
+
+    obj.dup_cluster_id = cluster_id
+    if save:
+        source.model.objects.filter(pk=obj.pk).update(dup_cluster_id=cluster_id)
+
+    # only once committed: a rolled back ingest must not leave a cluster id behind that no row has
+    transaction.on_commit(lambda: _remember(key, cluster_id, value, cluster_text_hash, last_seen))
+    return ClusterMatch(cluster_id, cluster_text_hash, duplicate)
@@ -0,0 +1,184 @@
+import numpy as np
+from ..models import InsightSeries
+from .insights_store import unpack_values
+from .social_posts import period_posts
+
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+PERCENTILES = [10, 25, 50, 75, 90, 99]
+# robust z-score (median/MAD) beyond which a post counts as an outlier
+OUTLIER_Z = 3.5
+FOLLOWER_METRICS = {"instagram": "followers_count", "facebook": "followers_count"}
+
+
+def load_post_columns(platform, account_id, start_date=None, end_date=None):
+    """
+    Engagement columns of an account's mirrored posts as NumPy arrays, read
+    with a single query: post ids/permalinks (object arrays), posted_at as
+    datetime64[s] (UTC), and likes, comments, shares and engagement.
+    """
+    rows = list(
+        period_posts(platform, account_id, start_date, end_date)
+        .order_by("posted_at")
+        .values_list("post_id", "permalink", "posted_at", "likes", "comments", "shares", "engagement")
+    )
+    if not rows:
+        return None
+
+    post_ids, permalinks, posted_at, likes, comments, shares, engagement = zip(*rows)
+    return {
+        "post_id": np.array(post_ids, dtype=object),
+        "permalink": np.array(permalinks, dtype=object),
+        "posted_at": np.array([ts.replace(tzinfo=None) for ts in posted_at], dtype="datetime64[s]"),
+        "likes": np.array(likes, dtype=np.float64),
+        "comments": np.array(comments, dtype=np.float64),
+        "shares": np.array(shares, dtype=np.float64),
+        "engagement": np.array(engagement, dtype=np.float64),
+    }
+
+
+def follower_counts(platform, account_id, posted_at):
+    """
+    Follower count in effect when each post went out, from the stored
+    followers_count gauge (the latest daily value on or before the post day,
+    or the earliest known value for older posts). NaN when never collected.
+    """
+    rows = list(
+        InsightSeries.objects.filter(
+            platform=platform,
+            account_id=account_id,
+            metric=FOLLOWER_METRICS[platform],
+            resolution__in=["day", "week"],
+        ).order_by("day").values_list("day", "values")
+    )
+    if not rows:
+        return np.full(len(posted_at), np.nan)
+
+    days = np.array([day for day, _ in rows], dtype="datetime64[D]")
+    counts = np.array([unpack_values(blob)[0] for _, blob in rows])
+    index = np.searchsorted(days, posted_at.astype("datetime64[D]"), side="right") - 1
+    return counts[np.clip(index, 0, len(counts) - 1)]
+
+
+def _weekday(posted_at):
+    # 1970-01-01 was a Thursday, so shift day numbers to make Monday 0
+    return (posted_at.astype("datetime64[D]").astype(np.int64) + 3) % 7
+
+
+def _rounded(values, digits=2):
+    return [None if np.isnan(v) else round(float(v), digits) for v in values]
+
+
+def _grouped_means(keys, values, size):
+    counts = np.bincount(keys, minlength=size)
+    sums = np.bincount(keys, weights=values, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    return counts, means
+
+
+def _effects(keys, engagement, labels):
+    """Mean engagement per group and its lift over the overall mean."""
+    counts, means = _grouped_means(keys, engagement, len(labels))
+    overall = engagement.mean()
+    lifts = (means / overall - 1) * 100 if overall else np.full(len(labels), np.nan)
+    return [
+        {"group": label, "posts": int(count), "avg_engagement": mean, "lift_percent": lift}
+        for label, count, mean, lift in zip(labels, counts, _rounded(means), _rounded(lifts, 1))
+    ]
+
+
+def _trend(posted_at, engagement, rate):
+    """Least-squares slope of engagement (and rate) over time, plus weekly means."""
+    days = (posted_at - posted_at[0]).astype(np.float64) / 86400
+    trend = {"weekly": []}
+
+    if len(engagement) >= 2 and days[-1] > 0:
+        slope = np.polyfit(days, engagement, 1)[0]
+        trend["engagement_change_per_30_days"] = round(float(slope * 30), 2)
+        known = ~np.isnan(rate)
+        if known.sum() >= 2 and np.ptp(days[known]) > 0:
+            trend["engagement_rate_change_per_30_days"] = round(float(np.polyfit(days[known], rate[known], 1)[0] * 30), 4)
+
+    days_of_posts = posted_at.astype("datetime64[D]")
+    mondays = days_of_posts - _weekday(posted_at).astype("timedelta64[D]")
+    week_keys, week_index = np.unique(mondays, return_inverse=True)
+    counts, means = _grouped_means(week_index, engagement, len(week_keys))
+    trend["weekly"] = [
+        {"week_start": str(monday), "posts": int(count), "avg_engagement": mean}
+        for monday, count, mean in zip(week_keys, counts, _rounded(means))
+    ]
+    return trend
+
+
+def _outliers(columns, engagement, limit=10):
+    median = np.median(engagement)
+    mad = np.median(np.abs(engagement - median))
+    if not mad:
+        return []
+    z = 0.6745 * (engagement - median) / mad
+    flagged = np.flatnonzero(np.abs(z) > OUTLIER_Z)
+    flagged = flagged[np.argsort(-np.abs(z[flagged]))][:limit]
+    return [
+        {
+            "post_id": columns["post_id"][i],
+            "permalink": columns["permalink"][i],
+            "posted_at": str(columns["posted_at"][i]),
+            "engagement": int(engagement[i]),
+            "direction": "high" if z[i] > 0 else "low",
+            "robust_z": round(float(z[i]), 2),
+        }
+        for i in flagged
+    ]
+
+
+def post_statistics(platform, account_id, start_date=None, end_date=None):
+    """
+    Engagement statistics over an account's mirrored posts, computed on
+    NumPy arrays: percentiles, engagement rate (engagement per follower, when
+    follower counts have been collected), trends, day-of-week and hour-of-day
+    effects (UTC) and robust-z outliers. None when there are no posts.
+    """
+    columns = load_post_columns(platform, account_id, start_date, end_date)
+    if columns is None:
+        return None
+
+    engagement = columns["engagement"]
+    posted_at = columns["posted_at"]
+    followers = follower_counts(platform, account_id, posted_at)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = np.where(followers > 0, engagement / followers * 100, np.nan)
+
+    weekday = _weekday(posted_at)
+    hour = (posted_at.astype("datetime64[h]").astype(np.int64)) % 24
+
+    known_rate = rate[~np.isnan(rate)]
+    return {
+        "posts": int(len(engagement)),
+        "period": {
+            "first_post": str(posted_at[0]),
+            "last_post": str(posted_at[-1]),
+        },
+        "totals": {
+            "likes": int(columns["likes"].sum()),
+            "comments": int(columns["comments"].sum()),
+            "shares": int(columns["shares"].sum()),
+            "engagement": int(engagement.sum()),
+        },
+        "engagement": {
+            "mean": round(float(engagement.mean()), 2),
+            "std": round(float(engagement.std()), 2),
+            "percentiles": dict(zip(
+                (f"p{p}" for p in PERCENTILES), _rounded(np.percentile(engagement, PERCENTILES))
+            )),
+        },
+        "engagement_rate": {
+            "posts_with_followers": int(len(known_rate)),
+            "mean_percent": round(float(known_rate.mean()), 4) if len(known_rate) else None,
+            "median_percent": round(float(np.median(known_rate)), 4) if len(known_rate) else None,
+        },
+        "trend": _trend(posted_at, engagement, rate),
+        "day_of_week": _effects(weekday, engagement, WEEKDAYS),
+        "hour_of_day": _effects(hour, engagement, [f"{h:02d}:00" for h in range(24)]),
+        "outliers": _outliers(columns, engagement),
+    }
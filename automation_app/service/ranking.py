@@ -0,0 +1,83 @@
+import heapq
+from itertools import count
+from django.conf import settings
+
+
+# likes + comments, the engagement the reports have always ranked by
+DEFAULT_WEIGHTS = {"likes": 1.0, "comments": 1.0, "shares": 0.0, "saves": 0.0}
+
+
+def score_weights(overrides=None):
+    """DEFAULT_WEIGHTS, then POST_SCORE_WEIGHTS from settings, then `overrides`."""
+    weights = {**DEFAULT_WEIGHTS, **getattr(settings, "POST_SCORE_WEIGHTS", {})}
+    for name, weight in (overrides or {}).items():
+        if name not in DEFAULT_WEIGHTS:
+            raise ValueError(f"Unknown score weight: {name}")
+        weights[name] = float(weight)
+    return weights
+
+
+def parse_weights(value):
+    """Parses "likes:1,comments:2" (e.g. a query param) into a weights dict."""
+    weights = {}
+    for part in filter(None, (value or "").split(",")):
+        name, _, weight = part.partition(":")
+        try:
+            weights[name.strip()] = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid weight for {name.strip()}: {weight!r}")
+    return weights
+
+
+def weighted_score(counters, weights):
+    """Score of one post from a mapping of its counters (missing counters count as 0)."""
+    return sum(weight * (counters.get(name) or 0) for name, weight in weights.items() if weight)
+
+
+class TopK:
+    """
+    Keeps the k highest and k lowest scored items of a stream in two
+    bounded heaps: O(log k) per item and O(k) memory, whatever the stream
+    length. Items are stored as given and never modified. Ties keep the
+    item seen first.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self._best = []    # min-heap of (score, -seq, item): root is the weakest of the best
+        self._worst = []   # min-heap of (-score, -seq, item): root is the strongest of the worst
+        self._seq = count()
+
+    def add(self, item, score):
+        seq = next(self._seq)
+        best = (score, -seq, item)
+        if len(self._best) < self.k:
+            heapq.heappush(self._best, best)
+        elif best[:2] > self._best[0][:2]:
+            heapq.heapreplace(self._best, best)
+
+        worst = (-score, -seq, item)
+        if len(self._worst) < self.k:
+            heapq.heappush(self._worst, worst)
+        elif worst[:2] > self._worst[0][:2]:
+            heapq.heapreplace(self._worst, worst)
+
+    def best(self):
+        """[(score, item)] from the highest score down."""
+        return [(score, item) for score, _, item in sorted(self._best, key=lambda e: e[:2], reverse=True)]
+
+    def worst(self):
+        """[(score, item)] from the lowest score up."""
+        return [(-score, item) for score, _, item in sorted(self._worst, key=lambda e: e[:2], reverse=True)]
+
+
+def rank(items, k=1, score=None):
+    """
+    Streams `items` (a Graph pagination generator, a queryset .iterator(),
+    ...) through a TopK. `score` maps an item to its score.
+    Returns the TopK.
+    """
+    top = TopK(k)
+    for item in items:
+        top.add(item, score(item))
+    return top
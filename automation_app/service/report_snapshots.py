@@ -0,0 +1,149 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from ..models import ReportSnapshot
+from ..utils import get_month_range
+from . import instagram_reports, Facebook_reports
+from .rollups import rollups_complete
+from .social_posts import mirror_complete
+from .social_sources import PLATFORM_ACCOUNT_ATTRS
+
+
+logger = logging.getLogger(__name__)
+
+REPORT_MODULES = {"instagram": instagram_reports, "facebook": Facebook_reports}
+REPORTS = ["monthly_report", "best_worst_posts", "complaints_and_reviews"]
+
+
+def _post_limit():
+    return getattr(settings, "REPORT_SNAPSHOT_POST_LIMIT", 10)
+
+
+def _compute(user, platform, report, year, month):
+    module = REPORT_MODULES[platform]
+    if report == "best_worst_posts":
+        # snapshots keep the top/bottom REPORT_SNAPSHOT_POST_LIMIT; smaller limits are slices of them
+        return module.best_worst_posts(user, year, month, _post_limit())
+    return getattr(module, report)(user, year, month)
+
+
+def _is_error(result):
+    return isinstance(result, dict) and "error" in result
+
+
+def _inputs_complete(platform, account_id, report, result, start_date, end_date):
+    """
+    Whether a report was computed from complete data and may be frozen:
+    monthly reports need every item in the rollups, post rankings a full
+    post mirror of the month, and complaint reports no pending labels.
+    """
+    if report == "monthly_report":
+        return rollups_complete(platform, account_id, start_date, end_date)
+    if report == "best_worst_posts":
+        return mirror_complete(platform, account_id, start_date, end_date)
+    return not result.get("pending")
+
+
+def is_closed(period, today=None):
+    """A month is final (snapshot-able) once the next one has started."""
+    today = today or timezone.localdate()
+    return period < today.replace(day=1)
+
+
+def snapshot_report(user, platform, report, year, month):
+    """
+    Returns one month's report from its snapshot, computing and storing the
+    snapshot first if there is none. Reports that come back as errors
+    (missing token, Graph failure), are empty, or were computed before
+    their inputs were complete (see _inputs_complete) are returned but not
+    stored, so the next run retries them.
+    """
+    period, end_date = get_month_range(year, month)
+    account_id = getattr(user, PLATFORM_ACCOUNT_ATTRS[platform])
+    existing = ReportSnapshot.objects.filter(
+        platform=platform, account_id=account_id, report=report, period=period
+    ).values_list("data", flat=True).first()
+    if existing is not None:
+        return existing["result"]
+
+    result = _compute(user, platform, report, year, month)
+    if result is None or _is_error(result):
+        return result
+    if not _inputs_complete(platform, account_id, report, result, period, end_date):
+        return result
+    try:
+        with transaction.atomic():
+            ReportSnapshot.objects.create(
+                platform=platform, account_id=account_id, report=report, period=period, data={"result": result}
+            )
+    except IntegrityError:
+        pass  # another node stored the same month first; snapshots are never overwritten
+    return result
+
+
+def _trim_posts(result, limit):
+    if not result or _is_error(result) or "syncing" in result:
+        return result
+    return {
+        **result,
+        "best_posts": result["best_posts"][:limit],
+        "worst_posts": result["worst_posts"][:limit],
+    }
+
+
+def get_report(user, platform, report, year=None, month=None, limit=None):
+    """
+    A report for a closed month is served from its snapshot (computed and
+    stored on first use if the scheduler has not reached it yet); the
+    current month is always computed live. `limit` applies to
+    best_worst_posts only and must not exceed REPORT_SNAPSHOT_POST_LIMIT to
+    be served from a snapshot.
+    """
+    period, _ = get_month_range(year, month)
+    year, month = period.year, period.month
+    limit = limit or 1
+
+    live = (
+        not is_closed(period)
+        or not getattr(user, PLATFORM_ACCOUNT_ATTRS[platform])
+        or (report == "best_worst_posts" and limit > _post_limit())
+    )
+    if live:
+        if report == "best_worst_posts":
+            return REPORT_MODULES[platform].best_worst_posts(user, year, month, limit)
+        return _compute(user, platform, report, year, month)
+
+    result = snapshot_report(user, platform, report, year, month)
+    if report == "best_worst_posts":
+        result = _trim_posts(result, limit)
+    return result
+
+
+def connected_users(platform):
+    attr = PLATFORM_ACCOUNT_ATTRS[platform]
+    return get_user_model().objects.filter(~Q(**{attr: ""}) & Q(**{f"{attr}__isnull": False})).order_by("id")
+
+
+def precompute_previous_month(today=None):
+    """
+    Snapshots every report of the previous month for every connected
+    account. Existing snapshots are skipped, so re-runs only fill gaps,
+    including reports whose inputs were still incomplete last time.
+    Returns the number of reports computed without error.
+    """
+    today = today or timezone.localdate()
+    previous = today.replace(day=1) - timedelta(days=1)
+    stored = 0
+    for platform in REPORT_MODULES:
+        for user in connected_users(platform):
+            for report in REPORTS:
+                try:
+                    if not _is_error(snapshot_report(user, platform, report, previous.year, previous.month)):
+                        stored += 1
+                except Exception:
+                    logger.exception(f"Snapshot of {platform} {report} for user {user.id} failed")
+    return stored
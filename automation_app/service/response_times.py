@@ -0,0 +1,142 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .latency_histogram import LatencyHistogram
+from .rollups import merge_rollup, rollup_range
+from .social_sources import source_for
+
+
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+
+def parse_moment(value, field="timestamp"):
+    """
+    An ISO timestamp sent by the caller, or None when missing. Naive values
+    are taken in the server time zone. Raises ValueError if unparseable.
+    """
+    if value in (None, ""):
+        return None
+    if isinstance(value, str):
+        try:
+            moment = parse_datetime(value)
+        except ValueError:
+            moment = None
+        if moment is None:
+            raise ValueError(f"Invalid {field}: {value}")
+    else:
+        moment = value
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def reply_time(value=None):
+    """
+    When a reply went out: the caller's ISO timestamp (e.g. n8n reporting
+    when the automation answered), or now. Raises ValueError if unparseable.
+    """
+    return parse_moment(value, "replied_at") or timezone.now()
+
+
+def ingest_times(data, reply_text):
+    """
+    (received_at, replied_at) of an ingest webhook payload; replied_at is
+    None when no reply came with the message. Raises ValueError.
+    """
+    received_at = parse_moment(data.get("received_at"), "received_at")
+    replied_at = reply_time(data.get("replied_at")) if reply_text else None
+    return received_at, replied_at
+
+
+def elapsed_seconds(received_at, timestamp, replied_at):
+    """
+    Seconds from a message arriving to its reply, or None when unknown. The
+    arrival is the platform's received_at, else the time the row was stored.
+    A reply stamped before the arrival is one that came in with the message
+    without a received_at to measure from (or clock skew): not a sample.
+    """
+    arrived = received_at or timestamp
+    if not arrived or not replied_at or replied_at < arrived:
+        return None
+    return (replied_at - arrived).total_seconds()
+
+
+def response_seconds(obj):
+    """Seconds between a message/comment arriving and its reply, or None."""
+    if not obj.reply:
+        return None
+    return elapsed_seconds(obj.received_at, obj.timestamp, obj.replied_at)
+
+
+def record_response(obj):
+    """
+    Counts a replied message/comment's response time into the rollup of the
+    day it arrived. Called once per object: on ingest when the reply came
+    with it, or from record_reply when it was answered later.
+    """
+    seconds = response_seconds(obj)
+    source = source_for(obj)
+    account_id = getattr(obj, source.account_field)
+    if seconds is None or not account_id:
+        return
+    merge_rollup(source.platform, account_id, timezone.localdate(obj.timestamp), response_seconds=[seconds])
+
+
+def record_reply(obj, reply, replied_at=None):
+    """
+    Stores a reply sent after ingest. Only the first reply is timed; later
+    edits just replace the text.
+    """
+    first = not obj.replied_at
+    if first:
+        obj.replied_at = reply_time(replied_at)
+    obj.reply = reply
+    obj.save(update_fields=["reply", "replied_at"])
+    if first:
+        record_response(obj)
+    return obj
+
+
+def _summary(histogram, replies, total_seconds):
+    return {
+        "replies": replies,
+        "mean_seconds": round(total_seconds / replies, 1) if replies else None,
+        **{
+            name: None if value is None else round(value, 1)
+            for name, value in ((name, histogram.quantile(q)) for name, q in PERCENTILES.items())
+        },
+    }
+
+
+def response_time_summary(platform, account_id, start_date=None, end_date=None):
+    """
+    Response-time distribution of an account over a date range (inclusive),
+    merged from the daily rollup histograms: reply count, mean, p50/p90/p99
+    (within ~9%), the non-empty histogram buckets and a per-day breakdown.
+    Cost is proportional to the number of days, not the number of replies.
+    """
+    rows = (
+        rollup_range(platform, account_id, start_date, end_date)
+        .filter(replies__gt=0)
+        .order_by("day")
+        .values_list("day", "replies", "response_seconds", "response_histogram")
+    )
+
+    merged = LatencyHistogram()
+    replies = 0
+    total_seconds = 0.0
+    daily = []
+    for day, day_replies, day_seconds, blob in rows.iterator():
+        histogram = LatencyHistogram.from_bytes(blob)
+        merged.merge(histogram)
+        replies += day_replies
+        total_seconds += day_seconds
+        daily.append({"day": day.isoformat(), **_summary(histogram, day_replies, day_seconds)})
+
+    return {
+        **_summary(merged, replies, total_seconds),
+        "histogram": [
+            {"from_seconds": round(lower, 1), "to_seconds": round(upper, 1) if upper else None, "count": count}
+            for lower, upper, count in merged.buckets()
+        ],
+        "daily": daily,
+    }
@@ -0,0 +1,193 @@
+import hashlib
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from ..models import SocialDailyRollup, SocialDailySender
+from .social_sources import SOCIAL_SOURCES, source_for
+from .hyperloglog import HyperLogLog
+from .latency_histogram import LatencyHistogram
+
+
+def sender_hash(sender_id):
+    """Stable 64-bit hash of a sender id."""
+    digest = hashlib.blake2b(str(sender_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def signed_hash(value):
+    """A 64-bit hash as the signed integer a BigIntegerField stores."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def record_senders(platform, account_id, day, hashes):
+    """Adds sender hashes to a day's exact sender set: one insert, senders already in it are skipped."""
+    SocialDailySender.objects.bulk_create(
+        [
+            SocialDailySender(platform=platform, account_id=account_id, day=day, sender_hash=signed_hash(value))
+            for value in hashes
+        ],
+        batch_size=5000,
+        ignore_conflicts=True,
+    )
+
+
+def day_senders(platform, account_id, day):
+    """The day's sender hashes, as stored (signed)."""
+    return SocialDailySender.objects.filter(platform=platform, account_id=account_id, day=day).values_list(
+        "sender_hash", flat=True
+    )
+
+
+def merge_rollup(
+    platform, account_id, day, messages=0, comments=0, sender_hashes=(), duplicate_comments=0, response_seconds=()
+):
+    """
+    Adds counts, sender hashes and response times (seconds from a
+    message/comment to its reply) into the (platform, account, day) rollup
+    row, creating it if needed. The row is locked for the read-modify-write.
+
+    Senders go to SocialDailySender at a constant cost per ingest; the day's
+    HyperLogLog sketch is built by seal_sender_sketches once the day is over,
+    and only touched here when a backfill adds senders to a sealed day.
+    """
+    with transaction.atomic():
+        rollup, _ = SocialDailyRollup.objects.select_for_update().get_or_create(
+            platform=platform,
+            account_id=account_id,
+            day=day,
+        )
+
+        rollup.messages += messages
+        rollup.comments += comments
+        rollup.duplicate_comments += duplicate_comments
+
+        sender_hashes = set(sender_hashes)
+        if sender_hashes:
+            record_senders(platform, account_id, day, sender_hashes)
+            if rollup.sender_sketch:
+                # adding a known sender leaves a sketch unchanged, so no need to tell new ones apart
+                sketch = HyperLogLog.from_bytes(rollup.sender_sketch)
+                sketch.update(sender_hashes)
+                rollup.sender_sketch = sketch.to_bytes()
+
+        response_seconds = list(response_seconds)
+        if response_seconds:
+            histogram = LatencyHistogram.from_bytes(rollup.response_histogram)
+            histogram.update(response_seconds)
+            rollup.response_histogram = histogram.to_bytes()
+            rollup.replies += len(response_seconds)
+            rollup.response_seconds += sum(response_seconds)
+
+        rollup.save()
+    return rollup
+
+
+def rollup_sketch(platform, account_id, day, blob):
+    """A rollup's sender sketch: the sealed one, or built from the day's sender rows if not sealed yet."""
+    if blob:
+        return HyperLogLog.from_bytes(blob)
+    sketch = HyperLogLog()
+    sketch.update(day_senders(platform, account_id, day).iterator())
+    return sketch
+
+
+def seal_sender_sketches(today=None):
+    """
+    Stores the sender sketch of every finished day that has none yet, so
+    range queries merge one small blob per day instead of reading the
+    day's sender rows. Returns the number of days sealed.
+    """
+    today = today or timezone.localdate()
+    unsealed = SocialDailyRollup.objects.filter(sender_sketch=b"", day__lt=today).values_list(
+        "id", "platform", "account_id", "day"
+    )
+    sealed = 0
+    for rollup_id, platform, account_id, day in list(unsealed):
+        # locked like merge_rollup, so a late backfill's senders are either in the sketch or added to it
+        with transaction.atomic():
+            rollup = SocialDailyRollup.objects.select_for_update().filter(id=rollup_id, sender_sketch=b"").first()
+            if rollup is None:
+                continue
+            sketch = rollup_sketch(platform, account_id, day, b"")
+            if sketch.is_empty():
+                continue
+            rollup.sender_sketch = sketch.to_bytes()
+            rollup.save(update_fields=["sender_sketch"])
+        sealed += 1
+    return sealed
+
+
+def record_social_rollup(obj, duplicate=False):
+    """
+    Counts one freshly ingested message/comment into its daily rollup.
+    `duplicate` marks a comment that joined an existing near-duplicate cluster.
+    """
+    source = source_for(obj)
+    account_id = getattr(obj, source.account_field)
+    if not account_id:
+        return
+
+    merge_rollup(
+        source.platform,
+        account_id,
+        timezone.localdate(obj.timestamp),
+        messages=1 if source.kind == "message" else 0,
+        comments=1 if source.kind == "comment" else 0,
+        sender_hashes=[sender_hash(obj.sender_id)],
+        duplicate_comments=1 if duplicate else 0,
+    )
+
+
+def rollup_range(platform, account_id, start_date=None, end_date=None):
+    rollups = SocialDailyRollup.objects.filter(platform=platform, account_id=account_id)
+    if start_date:
+        rollups = rollups.filter(day__gte=start_date)
+    if end_date:
+        rollups = rollups.filter(day__lte=end_date)
+    return rollups
+
+
+def rollups_complete(platform, account_id, start_date, end_date):
+    """
+    Whether the rollups of a date range count every stored message and
+    comment, i.e. nothing in it predates the rollups without having been
+    through backfill_rollups. Two COUNTs per source.
+    """
+    totals = rollup_range(platform, account_id, start_date, end_date).aggregate(
+        message=Sum("messages"), comment=Sum("comments")
+    )
+    for source in SOCIAL_SOURCES.values():
+        if source.platform != platform:
+            continue
+        stored = source.model.objects.filter(
+            **{source.account_field: account_id, "timestamp__date__range": (start_date, end_date)}
+        ).count()
+        if stored != (totals[source.kind] or 0):
+            return False
+    return True
+
+
+def sender_sketch(platform, account_id, start_date=None, end_date=None):
+    """
+    Merged HyperLogLog of an account's senders over a date range. Sketches
+    from several accounts/platforms can be merged further with .merge().
+    """
+    sketch = HyperLogLog()
+    rows = rollup_range(platform, account_id, start_date, end_date).values_list("day", "sender_sketch")
+    for day, blob in rows.iterator():
+        sketch.merge(rollup_sketch(platform, account_id, day, blob))
+    return sketch
+
+
+def sender_range(platform, account_id, start_date=None, end_date=None):
+    senders = SocialDailySender.objects.filter(platform=platform, account_id=account_id)
+    if start_date:
+        senders = senders.filter(day__gte=start_date)
+    if end_date:
+        senders = senders.filter(day__lte=end_date)
+    return senders
+
+
+def exact_sender_count(platform, account_id, start_date=None, end_date=None):
+    """Exact unique senders, counted by the database."""
+    return sender_range(platform, account_id, start_date, end_date).values("sender_hash").distinct().count()
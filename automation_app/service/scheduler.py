@@ -0,0 +1,83 @@
+import os
+import socket
+import logging
+from collections import namedtuple
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Q
+from django.utils import timezone
+from ..models import SchedulerLease
+from .report_snapshots import precompute_previous_month
+from .rollups import seal_sender_sketches
+
+
+logger = logging.getLogger(__name__)
+
+# every: seconds between runs; lease: how long a run may hold the job before
+# another node may take it over (should comfortably exceed the run time)
+ScheduledJob = namedtuple("ScheduledJob", ["name", "every", "lease", "run"])
+
+
+def scheduled_jobs():
+    return [
+        ScheduledJob(
+            "report_snapshots",
+            getattr(settings, "REPORT_SNAPSHOT_EVERY", 3600),
+            getattr(settings, "REPORT_SNAPSHOT_LEASE", 3600),
+            precompute_previous_month,
+        ),
+        ScheduledJob(
+            "sender_sketches",
+            getattr(settings, "SENDER_SKETCH_EVERY", 3600),
+            getattr(settings, "SENDER_SKETCH_LEASE", 1800),
+            seal_sender_sketches,
+        ),
+    ]
+
+
+def node_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def acquire_lease(job, owner, now=None):
+    """
+    Takes the job's lease if the job is due and nobody else holds a live
+    lease. One conditional UPDATE, so concurrent nodes cannot both win.
+    """
+    now = now or timezone.now()
+    try:
+        SchedulerLease.objects.get_or_create(name=job.name)
+    except IntegrityError:
+        pass  # created concurrently by another node
+
+    return bool(
+        SchedulerLease.objects.filter(name=job.name)
+        .filter(Q(owner="") | Q(lease_expires_at__lt=now) | Q(owner=owner))
+        .filter(Q(last_finished_at__isnull=True) | Q(last_finished_at__lte=now - timedelta(seconds=job.every)))
+        .update(owner=owner, lease_expires_at=now + timedelta(seconds=job.lease), last_started_at=now)
+    )
+
+
+def release_lease(job, owner, error=""):
+    SchedulerLease.objects.filter(name=job.name, owner=owner).update(
+        owner="", lease_expires_at=None, last_finished_at=timezone.now(), last_error=error
+    )
+
+
+def run_due_jobs(owner=None):
+    """Runs every due job this node can lease. Returns {job name: result or error}."""
+    owner = owner or node_name()
+    results = {}
+    for job in scheduled_jobs():
+        if not acquire_lease(job, owner):
+            continue
+        try:
+            results[job.name] = job.run()
+        except Exception as e:
+            logger.exception(f"Scheduled job {job.name} failed")
+            release_lease(job, owner, error=str(e))
+            results[job.name] = {"error": str(e)}
+        else:
+            release_lease(job, owner)
+    return results
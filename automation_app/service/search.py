@@ -0,0 +1,220 @@
+import re
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from ..models import SearchDocument
+from .social_sources import SOCIAL_SOURCES, source_for, user_account_ids
+
+
+SEARCH_TABLE = SearchDocument._meta.db_table
+FTS_TABLE = f"{SEARCH_TABLE}_fts"
+SEARCH_SOURCES = list(SOCIAL_SOURCES) + ["business_chat"]
+
+_TERM_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+
+# ---------- indexing ----------
+
+def index_social_object(obj):
+    """Adds or refreshes the search document of a social message/comment."""
+    source = source_for(obj)
+    body = getattr(obj, source.text_field) or ""
+
+    SearchDocument.objects.update_or_create(
+        source=source.name,
+        object_id=obj.pk,
+        position=0,
+        defaults={
+            "account_id": getattr(obj, source.account_field) or "",
+            "user_id": obj.user_id,
+            "sender": getattr(obj, source.sender_name_field) or obj.sender_id or "",
+            "body": body,
+            "timestamp": obj.timestamp,
+        },
+    )
+
+
+def index_business_turns(session, start=0, timestamp=None):
+    """
+    Indexes the chat turns of a BusinessSession from position `start` onwards.
+    Turns are append-only, so callers pass the length before their append.
+    Turns carry no time of their own; live turns are stamped with now().
+    """
+    turns = session.chat_history or []
+    timestamp = timestamp or timezone.now()
+    documents = [
+        SearchDocument(
+            source="business_chat",
+            object_id=session.pk,
+            position=idx,
+            user_id=session.user_id,
+            sender=turn.get("role") or "",
+            body=turn.get("content") or "",
+            timestamp=timestamp,
+        )
+        for idx, turn in enumerate(turns[start:], start=start)
+    ]
+    SearchDocument.objects.bulk_create(documents, ignore_conflicts=True)
+
+
+# ---------- querying ----------
+
+def parse_query_terms(query):
+    """Splits a user query into words and "quoted phrases"."""
+    terms = []
+    for phrase, word in _TERM_RE.findall(query or ""):
+        term = (phrase or word).strip()
+        if term:
+            terms.append(term)
+    return terms
+
+
+def _fts5_match(terms):
+    # every term becomes a quoted FTS5 string, so user input can't inject operators
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _scope_sql(account_ids, user, sources):
+    clauses = []
+    params = []
+
+    if account_ids:
+        placeholders = ", ".join(["%s"] * len(account_ids))
+        clauses.append(f"(d.account_id IN ({placeholders}) AND d.source != 'business_chat')")
+        params.extend(account_ids)
+    if user is not None:
+        clauses.append("(d.source = 'business_chat' AND d.user_id = %s)")
+        params.append(user.pk)
+
+    if not clauses:
+        return "1 = 0", []
+
+    sql = "(" + " OR ".join(clauses) + ")"
+    if sources:
+        placeholders = ", ".join(["%s"] * len(sources))
+        sql += f" AND d.source IN ({placeholders})"
+        params.extend(sources)
+    return sql, params
+
+
+def _search_sqlite(terms, scope_sql, scope_params, limit, offset):
+    match = _fts5_match(terms)
+    base = f"""
+        FROM {FTS_TABLE}
+        JOIN {SEARCH_TABLE} d ON d.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH %s AND {scope_sql}
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) {base}", [match] + scope_params)
+        total = cursor.fetchone()[0]
+
+        cursor.execute(
+            f"""
+            SELECT d.id, -bm25({FTS_TABLE}) AS rank,
+                   snippet({FTS_TABLE}, 0, '<b>', '</b>', '…', 16)
+            {base}
+            ORDER BY rank DESC, d.timestamp DESC
+            LIMIT %s OFFSET %s
+            """,
+            [match] + scope_params + [limit, offset],
+        )
+        rows = cursor.fetchall()
+    return total, rows
+
+
+def _search_postgres(terms, scope_sql, scope_params, limit, offset):
+    query = " ".join(f'"{term}"' if " " in term else term for term in terms)
+    base = f"""
+        FROM {SEARCH_TABLE} d, websearch_to_tsquery('simple', %s) q
+        WHERE d.search_vector @@ q AND {scope_sql}
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) {base}", [query] + scope_params)
+        total = cursor.fetchone()[0]
+
+        cursor.execute(
+            f"""
+            SELECT d.id, ts_rank_cd(d.search_vector, q) AS rank,
+                   ts_headline('simple', d.body, q, 'StartSel=<b>, StopSel=</b>, MaxWords=16, MinWords=8')
+            {base}
+            ORDER BY rank DESC, d.timestamp DESC
+            LIMIT %s OFFSET %s
+            """,
+            [query] + scope_params + [limit, offset],
+        )
+        rows = cursor.fetchall()
+    return total, rows
+
+
+def _search_fallback(terms, account_ids, user, sources, limit, offset):
+    scope = Q(pk__in=[])
+    if account_ids:
+        scope |= Q(account_id__in=account_ids) & ~Q(source="business_chat")
+    if user is not None:
+        scope |= Q(source="business_chat", user=user)
+
+    queryset = SearchDocument.objects.filter(scope)
+    if sources:
+        queryset = queryset.filter(source__in=sources)
+    for term in terms:
+        queryset = queryset.filter(body__icontains=term)
+
+    total = queryset.count()
+    rows = [
+        (doc_id, 0.0, body)
+        for doc_id, body in queryset.order_by("-timestamp").values_list("id", "body")[offset:offset + limit]
+    ]
+    return total, rows
+
+
+def search_documents(query, account_ids, user=None, sources=None, page=1, page_size=20):
+    """
+    Ranked full-text search scoped to the given accounts (and the user's own
+    business chat turns). Returns {"count", "page", "page_size", "results"}.
+    """
+    terms = parse_query_terms(query)
+    page = max(1, int(page))
+    page_size = max(1, min(int(page_size), 100))
+    offset = (page - 1) * page_size
+
+    if not terms:
+        return {"count": 0, "page": page, "page_size": page_size, "results": []}
+
+    vendor = connection.vendor
+    if vendor in ("sqlite", "postgresql"):
+        scope_sql, scope_params = _scope_sql(account_ids, user, sources)
+        search = _search_sqlite if vendor == "sqlite" else _search_postgres
+        total, rows = search(terms, scope_sql, scope_params, page_size, offset)
+    else:
+        total, rows = _search_fallback(terms, account_ids, user, sources, page_size, offset)
+
+    documents = SearchDocument.objects.in_bulk([row[0] for row in rows])
+    results = []
+    for doc_id, rank, snippet in rows:
+        doc = documents.get(doc_id)
+        if doc is None:
+            continue
+        results.append({
+            "source": doc.source,
+            "object_id": doc.object_id,
+            "position": doc.position,
+            "account_id": doc.account_id,
+            "sender": doc.sender,
+            "text": doc.body,
+            "snippet": snippet,
+            "timestamp": doc.timestamp,
+            "rank": round(float(rank), 4),
+        })
+
+    return {"count": total, "page": page, "page_size": page_size, "results": results}
+
+
+def search_for_user(user, query, sources=None, page=1, page_size=20):
+    return search_documents(
+        query,
+        user_account_ids(user),
+        user=user,
+        sources=sources,
+        page=page,
+        page_size=page_size,
+    )
@@ -0,0 +1,111 @@
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from ..models import SenderStats
+from .social_sources import source_for
+
+
+LEADERBOARD_METRICS = ["messages", "comments", "interactions"]
+
+
+def merge_sender(platform, account_id, sender_id, sender_name="", messages=0, comments=0, first_seen=None, last_seen=None):
+    """
+    Adds counts into a sender's stats row, creating it if needed, and widens
+    its first/last seen window. The row is locked for the read-modify-write.
+    """
+    with transaction.atomic():
+        stats, _ = SenderStats.objects.select_for_update().get_or_create(
+            platform=platform, account_id=account_id, sender_id=sender_id
+        )
+        stats.messages += messages
+        stats.comments += comments
+        stats.interactions += messages + comments
+        if first_seen and (stats.first_seen is None or first_seen < stats.first_seen):
+            stats.first_seen = first_seen
+        if last_seen and (stats.last_seen is None or last_seen >= stats.last_seen):
+            stats.last_seen = last_seen
+            # the name the sender used most recently wins
+            stats.sender_name = (sender_name or stats.sender_name)[:255]
+        elif not stats.sender_name:
+            stats.sender_name = (sender_name or "")[:255]
+        stats.save()
+    return stats
+
+
+def record_sender(obj):
+    """Counts one freshly ingested message/comment into its sender's stats."""
+    source = source_for(obj)
+    account_id = getattr(obj, source.account_field)
+    if not account_id or not obj.sender_id:
+        return
+    merge_sender(
+        source.platform,
+        account_id,
+        obj.sender_id,
+        getattr(obj, source.sender_name_field) or "",
+        messages=1 if source.kind == "message" else 0,
+        comments=1 if source.kind == "comment" else 0,
+        first_seen=obj.timestamp,
+        last_seen=obj.timestamp,
+    )
+
+
+def _summary(stats):
+    return {
+        "sender_id": stats.sender_id,
+        "sender_name": stats.sender_name,
+        "messages": stats.messages,
+        "comments": stats.comments,
+        "interactions": stats.interactions,
+        "first_seen": stats.first_seen.isoformat() if stats.first_seen else None,
+        "last_seen": stats.last_seen.isoformat() if stats.last_seen else None,
+    }
+
+
+def leaderboard(platform, account_id, metric="interactions", limit=10, active_since=None):
+    """
+    The account's senders ranked by `metric` (messages, comments or
+    interactions), optionally only those seen since `active_since`.
+    """
+    if metric not in LEADERBOARD_METRICS:
+        raise ValueError(f"Unknown leaderboard metric: {metric}")
+    rows = SenderStats.objects.filter(platform=platform, account_id=account_id, **{f"{metric}__gt": 0})
+    if active_since:
+        rows = rows.filter(last_seen__gte=active_since)
+    return [_summary(stats) for stats in rows.order_by(f"-{metric}", "sender_id")[:limit]]
+
+
+def top_fans(platform, account_id, days=30, limit=10):
+    """Senders with the most interactions overall among those active in the last `days` days."""
+    return leaderboard(platform, account_id, "interactions", limit, timezone.now() - timedelta(days=days))
+
+
+def churned_fans(platform, account_id, inactive_days=30, min_interactions=5, limit=10):
+    """
+    Once-engaged senders (at least `min_interactions`) who have not written
+    for `inactive_days` days, the most engaged first.
+    """
+    rows = SenderStats.objects.filter(
+        platform=platform,
+        account_id=account_id,
+        interactions__gte=min_interactions,
+        last_seen__lt=timezone.now() - timedelta(days=inactive_days),
+    ).order_by("-interactions", "sender_id")
+    return [_summary(stats) for stats in rows[:limit]]
+
+
+SENDER_VIEWS = ["leaderboard", "top_fans", "churned_fans"]
+
+
+def sender_report(platform, account_id, view="leaderboard", limit=10, days=30):
+    """
+    One of SENDER_VIEWS for an account: the message leaderboard, top fans
+    active in the last `days` days, or fans silent for `days` days.
+    """
+    if view == "leaderboard":
+        return leaderboard(platform, account_id, "messages", limit)
+    if view == "top_fans":
+        return top_fans(platform, account_id, days, limit)
+    if view == "churned_fans":
+        return churned_fans(platform, account_id, days, limit=limit)
+    raise ValueError(f"Unknown sender view: {view}")
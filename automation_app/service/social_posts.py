@@ -0,0 +1,316 @@
+import logging
+from collections import namedtuple
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Min, Sum
+from django.utils import timezone
+from ..models import SocialPost, SocialPostSnapshot, SocialSyncCursor
+from .graph_budget import graph_priority, BACKGROUND, INTERACTIVE
+from .graph_client import graph, GraphAPIError
+from .ranking import rank, score_weights, weighted_score
+
+
+logger = logging.getLogger(__name__)
+
+PostSource = namedtuple("PostSource", ["platform", "account_field", "token_field", "edge", "fields", "parse"])
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00").replace("+0000", "+00:00"))
+
+
+def _parse_instagram_media(item):
+    return {
+        "permalink": item.get("permalink", ""),
+        "caption": item.get("caption", ""),
+        "media_type": item.get("media_type", ""),
+        "posted_at": _parse_time(item["timestamp"]),
+        "likes": item.get("like_count", 0),
+        "comments": item.get("comments_count", 0),
+        "shares": 0,
+    }
+
+
+def _parse_facebook_post(item):
+    return {
+        "permalink": item.get("permalink_url", ""),
+        "caption": item.get("message", ""),
+        "media_type": item.get("status_type", ""),
+        "posted_at": _parse_time(item["created_time"]),
+        "likes": item.get("likes", {}).get("summary", {}).get("total_count", 0),
+        "comments": item.get("comments", {}).get("summary", {}).get("total_count", 0),
+        "shares": item.get("shares", {}).get("count", 0),
+    }
+
+
+POST_SOURCES = {
+    "instagram": PostSource(
+        "instagram",
+        "instagram_account_id",
+        "instagram_access_token",
+        "media",
+        "id,caption,media_type,permalink,timestamp,like_count,comments_count",
+        _parse_instagram_media,
+    ),
+    "facebook": PostSource(
+        "facebook",
+        "facebook_page_id",
+        "facebook_access_token",
+        "posts",
+        "id,message,status_type,created_time,permalink_url,shares,"
+        "likes.summary(true).limit(0),comments.summary(true).limit(0)",
+        _parse_facebook_post,
+    ),
+}
+
+
+# ---------- sync ----------
+
+def _pages(source, account_id, access_token, after=""):
+    """Yields (items, next_after) newest first, starting after the `after` cursor."""
+    page_size = getattr(settings, "SOCIAL_POST_PAGE_SIZE", 50)
+    while True:
+        params = {"fields": source.fields, "limit": page_size}
+        if after:
+            params["after"] = after
+        data = graph.get(f"{account_id}/{source.edge}", access_token, **params)
+        has_next = bool(data.get("paging", {}).get("next"))
+        after = data.get("paging", {}).get("cursors", {}).get("after", "") if has_next else ""
+        yield data.get("data", []), after
+        if not after:
+            return
+
+
+def store_posts(source, account_id, items):
+    """
+    Upserts one page of Graph posts. New posts and posts whose counters
+    moved get an engagement snapshot. Returns (created, updated, oldest
+    posted_at of the page).
+    """
+    parsed = {item["id"]: source.parse(item) for item in items if item.get("id")}
+    if not parsed:
+        return 0, 0, None
+
+    existing = {
+        post.post_id: post
+        for post in SocialPost.objects.filter(platform=source.platform, post_id__in=list(parsed))
+    }
+
+    created, changed = [], []
+    for post_id, fields in parsed.items():
+        fields["engagement"] = fields["likes"] + fields["comments"]
+        post = existing.get(post_id)
+        if post is None:
+            created.append(SocialPost(platform=source.platform, account_id=account_id, post_id=post_id, **fields))
+            continue
+        counters = (post.likes, post.comments, post.shares)
+        for name, value in fields.items():
+            setattr(post, name, value)
+        if counters != (post.likes, post.comments, post.shares):
+            changed.append(post)
+
+    SocialPost.objects.bulk_create(created)
+    if changed:
+        SocialPost.objects.bulk_update(
+            changed, ["permalink", "caption", "media_type", "likes", "comments", "shares", "engagement"]
+        )
+
+    if created and created[0].pk is None:
+        # backends that don't return ids from bulk_create
+        ids = dict(SocialPost.objects.filter(
+            platform=source.platform, post_id__in=[post.post_id for post in created]
+        ).values_list("post_id", "id"))
+        for post in created:
+            post.pk = ids[post.post_id]
+
+    SocialPostSnapshot.objects.bulk_create([
+        SocialPostSnapshot(post=post, likes=post.likes, comments=post.comments, shares=post.shares)
+        for post in created + changed
+    ])
+    return len(created), len(changed), min(fields["posted_at"] for fields in parsed.values())
+
+
+def sync_account(platform, account_id, access_token, backfill_pages=None, refresh_days=None, priority=BACKGROUND):
+    """
+    Incremental post sync of one account, at background Graph priority
+    unless told otherwise.
+
+    The forward pass walks from the newest post back to `refresh_days`
+    before the newest post already stored, picking up new posts and the
+    moving counters of recent ones. The backfill pass then continues the
+    walk into older history from the stored cursor, at most
+    `backfill_pages` pages per run, until the account is fully mirrored.
+    Returns counts of created and updated posts.
+    """
+    source = POST_SOURCES[platform]
+    refresh_days = refresh_days if refresh_days is not None else getattr(settings, "SOCIAL_POST_REFRESH_DAYS", 7)
+    backfill_pages = backfill_pages if backfill_pages is not None else getattr(settings, "SOCIAL_POST_BACKFILL_PAGES", 5)
+    cursor, _ = SocialSyncCursor.objects.get_or_create(platform=platform, account_id=account_id)
+    stats = {"created": 0, "updated": 0}
+
+    def store(items):
+        created, updated, oldest = store_posts(source, account_id, items)
+        stats["created"] += created
+        stats["updated"] += updated
+        return oldest
+
+    try:
+        with graph_priority(priority):
+            if cursor.newest_posted_at:
+                horizon = cursor.newest_posted_at - timedelta(days=refresh_days)
+                for items, after in _pages(source, account_id, access_token):
+                    oldest = store(items)
+                    if oldest is None or oldest < horizon:
+                        break
+                    if not after:
+                        # the whole history fits inside the refresh window
+                        cursor.backfilled = True
+
+            if not cursor.backfilled:
+                pages = 0
+                for items, after in _pages(source, account_id, access_token, cursor.backfill_after):
+                    store(items)
+                    pages += 1
+                    cursor.backfill_after = after
+                    cursor.backfilled = not after
+                    # persist per page so an interrupted backfill resumes here
+                    cursor.save(update_fields=["backfill_after", "backfilled"])
+                    if backfill_pages and pages >= backfill_pages:
+                        break
+        cursor.last_synced_at = timezone.now()
+        cursor.last_error = ""
+    except GraphAPIError as e:
+        cursor.last_error = str(e)
+        logger.warning(f"Post sync of {platform} {account_id} failed: {e}")
+        raise
+    finally:
+        newest = SocialPost.objects.filter(platform=platform, account_id=account_id).aggregate(
+            newest=Max("posted_at")
+        )["newest"]
+        cursor.newest_posted_at = newest
+        cursor.save()
+
+    return stats
+
+
+def sync_user(user, platforms=("instagram", "facebook"), **options):
+    """Syncs every connected account of a user; returns {platform: stats or error}."""
+    results = {}
+    for platform in platforms:
+        source = POST_SOURCES[platform]
+        account_id = getattr(user, source.account_field)
+        access_token = getattr(user, source.token_field)
+        if not account_id or not access_token:
+            continue
+        try:
+            results[platform] = sync_account(platform, account_id, access_token, **options)
+        except GraphAPIError as e:
+            results[platform] = {"error": str(e)}
+    return results
+
+
+def ensure_synced(platform, account_id, access_token):
+    """
+    Makes sure an account has been synced at least once, syncing the most
+    recent pages inline (someone is waiting) if the worker has not reached
+    it yet.
+    """
+    if SocialSyncCursor.objects.filter(platform=platform, account_id=account_id, last_synced_at__isnull=False).exists():
+        return
+    sync_account(platform, account_id, access_token, priority=INTERACTIVE)
+
+
+def _day_start(day):
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def _reaches_back(cursor, start_date):
+    """Whether the mirror holds every post from `start_date` on (None: the whole history)."""
+    if cursor.backfilled:
+        return True
+    if start_date is None:
+        return False
+    oldest = SocialPost.objects.filter(platform=cursor.platform, account_id=cursor.account_id).aggregate(
+        oldest=Min("posted_at")
+    )["oldest"]
+    return oldest is not None and oldest < _day_start(start_date)
+
+
+def mirror_complete(platform, account_id, start_date, end_date):
+    """
+    Whether the mirror holds every post of a closed period: the backfill
+    has walked back past its start, and a sync has run since it ended.
+    """
+    cursor = SocialSyncCursor.objects.filter(platform=platform, account_id=account_id).first()
+    if cursor is None or cursor.last_synced_at is None:
+        return False
+    if cursor.last_synced_at < _day_start(end_date + timedelta(days=1)):
+        return False
+    return _reaches_back(cursor, start_date)
+
+
+def still_syncing(platform, account_id, start_date=None):
+    """
+    The "still syncing" state of a period with no mirrored posts, when the
+    backfill has not reached back to `start_date` yet (None: the whole
+    history), so the posts may exist on Graph; None when the period is
+    really empty.
+    """
+    cursor = SocialSyncCursor.objects.filter(platform=platform, account_id=account_id).first()
+    if cursor is not None and _reaches_back(cursor, start_date):
+        return None
+    return {"syncing": True, "message": "Post history is still syncing, try again later"}
+
+
+# ---------- queries ----------
+
+def period_posts(platform, account_id, start_date=None, end_date=None):
+    """Mirrored posts of an account published between two dates (inclusive)."""
+    posts = SocialPost.objects.filter(platform=platform, account_id=account_id)
+    if start_date:
+        posts = posts.filter(posted_at__gte=_day_start(start_date))
+    if end_date:
+        posts = posts.filter(posted_at__lt=_day_start(end_date + timedelta(days=1)))
+    return posts
+
+
+def best_worst_posts(platform, account_id, start_date=None, end_date=None, limit=1, weights=None):
+    """
+    The `limit` highest and lowest scoring posts of a period, streamed from
+    the DB through bounded heaps (see ranking.TopK), or None when there are
+    none. Scores use ranking.score_weights(weights); the default is likes +
+    comments. Returns {"best": [(score, post)], "worst": [(score, post)]}.
+    """
+    weights = score_weights(weights)
+    posts = (
+        period_posts(platform, account_id, start_date, end_date)
+        .only("post_id", "permalink", "posted_at", "likes", "comments", "shares", "engagement")
+        .order_by("-posted_at")  # ties go to the newer post
+    )
+    top = rank(
+        posts.iterator(chunk_size=2000),
+        k=limit,
+        score=lambda post: weighted_score(
+            {"likes": post.likes, "comments": post.comments, "shares": post.shares}, weights
+        ),
+    )
+    if not top.best():
+        return None
+    return {"best": top.best(), "worst": top.worst()}
+
+
+def engagement_summary(platform, account_id, start_date=None, end_date=None):
+    totals = period_posts(platform, account_id, start_date, end_date).aggregate(
+        posts=Count("id"),
+        likes=Sum("likes"),
+        comments=Sum("comments"),
+        shares=Sum("shares"),
+        avg_engagement=Avg("engagement"),
+    )
+    return {
+        "posts": totals["posts"],
+        "likes": totals["likes"] or 0,
+        "comments": totals["comments"] or 0,
+        "shares": totals["shares"] or 0,
+        "avg_engagement": round(totals["avg_engagement"] or 0, 2),
+    }
@@ -0,0 +1,49 @@
+from collections import namedtuple
+from ..models import InstagramMessage, InstagramComment, FacebookMessage, FacebookComment
+
+
+SocialSource = namedtuple(
+    "SocialSource",
+    ["name", "model", "platform", "kind", "account_field", "text_field", "sender_name_field"],
+)
+
+SOCIAL_SOURCES = {
+    "instagram_message": SocialSource(
+        "instagram_message", InstagramMessage, "instagram", "message",
+        "recipient_id", "message", "sender_username",
+    ),
+    "instagram_comment": SocialSource(
+        "instagram_comment", InstagramComment, "instagram", "comment",
+        "recipient_id", "comment", "sender_username",
+    ),
+    "facebook_message": SocialSource(
+        "facebook_message", FacebookMessage, "facebook", "message",
+        "recipient_page_id", "message", "sender_name",
+    ),
+    "facebook_comment": SocialSource(
+        "facebook_comment", FacebookComment, "facebook", "comment",
+        "recipient_id", "comment", "sender_name",
+    ),
+}
+
+_SOURCES_BY_MODEL = {source.model: source for source in SOCIAL_SOURCES.values()}
+
+# platform -> attribute on CustomUser holding the connected account id
+PLATFORM_ACCOUNT_ATTRS = {
+    "instagram": "instagram_account_id",
+    "facebook": "facebook_page_id",
+}
+
+
+def source_for(obj):
+    """Returns the SocialSource describing a social message/comment instance."""
+    return _SOURCES_BY_MODEL[type(obj)]
+
+
+def user_account_ids(user):
+    """Account ids (Instagram account / Facebook page) owned by a user."""
+    return [
+        account_id
+        for account_id in (user.instagram_account_id, user.facebook_page_id)
+        if account_id
+    ]
@@ -0,0 +1,27 @@
+from ..utils import send_real_time_notification
+from .email_service import send_mail_resend
+from .jobs import enqueue, task
+
+
+@task("send_email", queue="email")
+def send_email(subject, message, email, html_message=None):
+    send_mail_resend(subject, message, [email], fail_silently=False, html_message=html_message)
+
+
+def queue_email(subject, message, recipient_list, html_message=None):
+    """
+    Defers send_mail: one job per recipient, so a failed address is retried
+    alone instead of re-sending to everyone before it.
+    """
+    for email in recipient_list:
+        enqueue("send_email", args=[subject, message, email, html_message])
+
+
+@task("send_notification", queue="notifications", priority=10, max_attempts=3)
+def send_notification(user_id, message):
+    send_real_time_notification(user_id, message)
+
+
+def queue_notification(user_id, message):
+    """Defers a live (channel-layer) notification to the user's sockets."""
+    enqueue("send_notification", args=[user_id, message])
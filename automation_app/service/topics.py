@@ -0,0 +1,126 @@
+import math
+from collections import Counter
+from .local_classifier import NEGATIONS, tokenize, normalize_token
+
+
+STOPWORDS = frozenset(normalize_token(word) for word in """
+    a an the and or but so to of in on at for with from by is are was were be been
+    am i me my we our you your he she it its they them this that these those there
+    have has had do does did will would can could just very too also any some all
+    please pls hi hello now yet still again where when why what how
+
+    في من على الى عن مع هذا هذه ذلك انا انت انتم هو هي نحن كان كانت يا و او ثم اذا
+    لو الي اللي عند بس كل شي شيء هل جدا وين متى ليش كيف
+""".split()) | NEGATIONS
+
+
+def topic_terms(text):
+    """Content words of a text for clustering; negation markers are dropped."""
+    terms = []
+    for token in tokenize(text):
+        if token.startswith("not_"):
+            token = token[4:]
+        if len(token) > 1 and token not in STOPWORDS:
+            terms.append(token)
+    return terms
+
+
+class Topic:
+    __slots__ = ("weights", "count")
+
+    def __init__(self):
+        self.weights = {}    # summed tf-idf vector, truncated to the strongest terms
+        self.count = 0
+
+    def similarity(self, vector):
+        norm = math.sqrt(sum(w * w for w in self.weights.values()))
+        if not norm:
+            return 0.0
+        return sum(w * self.weights.get(term, 0.0) for term, w in vector.items()) / norm
+
+    def label(self, terms=3):
+        top = sorted(self.weights.items(), key=lambda item: -item[1])[:terms]
+        return ", ".join(term for term, _ in top)
+
+
+class TopicClusterer:
+    """
+    Single-pass leader clustering over tf-idf vectors: each text joins the
+    most similar topic when the cosine similarity clears `threshold`, or
+    starts a new topic. Once `max_topics` exist, texts join the nearest one
+    (like an online k-means step). Centroids keep only their strongest
+    `centroid_terms` terms, so memory is bounded by the topic count rather
+    than the number of texts.
+    """
+
+    def __init__(self, document_frequency, documents, threshold=0.25, max_topics=30, centroid_terms=30):
+        self.document_frequency = document_frequency
+        self.documents = max(documents, 1)
+        self.threshold = threshold
+        self.max_topics = max_topics
+        self.centroid_terms = centroid_terms
+        self.topics = []
+
+    def vector(self, terms):
+        counts = Counter(terms)
+        vector = {
+            term: (1 + math.log(tf)) * math.log((1 + self.documents) / (1 + self.document_frequency.get(term, 0)))
+            for term, tf in counts.items()
+        }
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        return {term: w / norm for term, w in vector.items()} if norm else {}
+
+    def _nearest(self, vector):
+        best, best_score = None, 0.0
+        for topic in self.topics:
+            score = topic.similarity(vector)
+            if score > best_score:
+                best, best_score = topic, score
+        return best, best_score
+
+    def nearest(self, terms):
+        """The existing topic closest to a text (None if it shares no term with any), without changing it."""
+        return self._nearest(self.vector(terms))[0]
+
+    def add(self, terms, weight=1):
+        """Assigns a text, given as its terms and occurring `weight` times, to a topic and returns it."""
+        vector = self.vector(terms)
+        best, best_score = self._nearest(vector)
+
+        if best is None or (best_score < self.threshold and len(self.topics) < self.max_topics):
+            best = Topic()
+            self.topics.append(best)
+
+        for term, w in vector.items():
+            best.weights[term] = best.weights.get(term, 0.0) + w * weight
+        if len(best.weights) > self.centroid_terms:
+            strongest = sorted(best.weights.items(), key=lambda item: -item[1])[:self.centroid_terms]
+            best.weights = dict(strongest)
+
+        best.count += weight
+        return best
+
+
+def cluster_texts(groups, max_terms=50000, **options):
+    """
+    Clusters `groups`, a callable returning a fresh iterator of
+    (key, text, count) tuples. It is iterated twice: once for document
+    frequencies and once to assign topics, so the texts are never all held
+    in memory at once. Document frequencies are kept for at most about
+    `max_terms` terms: past twice that, the rarest are dropped (and then
+    weigh like unseen terms). Returns the TopicClusterer.
+    """
+    document_frequency = Counter()
+    documents = 0
+    for _, text, count in groups():
+        document_frequency.update({term: count for term in set(topic_terms(text))})
+        documents += count
+        if len(document_frequency) > 2 * max_terms:
+            document_frequency = Counter(dict(document_frequency.most_common(max_terms)))
+
+    clusterer = TopicClusterer(document_frequency, documents, **options)
+    for _, text, count in groups():
+        terms = topic_terms(text)
+        if terms:
+            clusterer.add(terms, weight=count)
+    return clusterer
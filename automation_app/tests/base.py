@@ -0,0 +1,32 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from automation_app.models import CustomUser
+
+
+@override_settings(CLASSIFY_ON_INGEST=False, ANOMALY_DETECTION=False, JOBS_EAGER=False)
+class SocialViewTestCase(TestCase):
+    """A logged-in user with a connected Instagram account (ig1) and Facebook page (fb1)."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username="shop",
+            email="shop@example.com",
+            password="secret",
+            instagram_account_id="ig1",
+            instagram_access_token="ig-token",
+            facebook_page_id="fb1",
+            facebook_access_token="fb-token",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def ingest(self, path, **data):
+        response = APIClient().post(path, {"recipient_id": "ig1", **data}, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.data["data"]
+
+    def ingest_inbox(self):
+        self.ingest("/messages/", sender_id="s1", sender_username="ann", message="where is my order")
+        self.ingest("/messages/", sender_id="s1", sender_username="ann", message="any update on my order?")
+        self.ingest("/messages/", sender_id="s2", sender_username="bob", message="do you ship abroad")
+        self.ingest("/comments/", sender_id="s3", sender_username="cy", comment="lovely colours")
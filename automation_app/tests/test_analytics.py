@@ -0,0 +1,58 @@
+from datetime import timedelta
+from django.utils import timezone
+from rest_framework.test import APIClient
+from automation_app.models import InstagramMessage
+from .base import SocialViewTestCase
+
+
+class AnalyticsViewTests(SocialViewTestCase):
+    def test_activity_heatmap(self):
+        self.ingest_inbox()
+        response = self.client.get("/analytics/activity-heatmap/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total"], 3)
+        self.assertEqual(self.client.get("/analytics/activity-heatmap/?kind=comment").data["total"], 1)
+        self.assertEqual(self.client.get("/analytics/activity-heatmap/?tz=Mars/Base").status_code, 400)
+
+    def test_bad_timestamp_is_rejected(self):
+        response = APIClient().post(
+            "/messages/", {"recipient_id": "ig1", "sender_id": "s1", "message": "hi", "received_at": "soon"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(InstagramMessage.objects.exists())
+
+    def test_reply_and_response_times(self):
+        received = (timezone.now() - timedelta(minutes=5)).isoformat()
+        message = self.ingest("/messages/", sender_id="s1", message="hello", received_at=received)
+
+        response = self.client.post(f"/social/instagram_message/{message['id']}/reply/", {"reply": "hi!"})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            self.client.post("/social/instagram_message/999/reply/", {"reply": "hi"}).status_code, 404
+        )
+        self.assertEqual(
+            self.client.post(f"/social/nowhere/{message['id']}/reply/", {"reply": "hi"}).status_code, 400
+        )
+
+        summary = self.client.get("/analytics/response-times/").data
+        self.assertEqual(summary["replies"], 1)
+        self.assertTrue(200 <= summary["p50"] <= 400, summary)
+        self.assertEqual(self.client.get("/analytics/response-times/?platform=x").status_code, 400)
+
+    def test_query(self):
+        self.ingest_inbox()
+        response = self.client.get("/analytics/query/?metrics=messages,comments&dimensions=platform")
+        self.assertEqual(response.status_code, 200, response.data)
+        rows = {row["platform"]: row for row in response.data["rows"]}
+        self.assertEqual((rows["instagram"]["messages"], rows["instagram"]["comments"]), (3, 1))
+        self.assertEqual(self.client.get("/analytics/query/?metrics=nope").status_code, 400)
+        self.assertEqual(self.client.get("/analytics/query/?metrics=messages&platforms=x").status_code, 400)
+
+    def test_senders(self):
+        self.ingest_inbox()
+        response = self.client.get("/analytics/senders/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["senders"][0]["sender_id"], "s1")
+        self.assertEqual(response.data["senders"][0]["interactions"], 2)
+        self.assertEqual(self.client.get("/analytics/senders/?view=nope").status_code, 400)
@@ -0,0 +1,29 @@
+from unittest import mock
+from automation_app.service import dashboard
+from automation_app.service.graph_budget import token_key
+from .base import SocialViewTestCase
+
+
+class DashboardViewTests(SocialViewTestCase):
+    def test_failed_parts_are_reported(self):
+        def graph_parts(calls):
+            return {"instagram.profile": {"username": "shop"}}, {"instagram.media": "Graph is down"}
+
+        with mock.patch.object(dashboard, "instagram_parts", return_value={"instagram.stats": lambda: {"messages": 3}}), \
+                mock.patch.object(dashboard, "graph_parts", side_effect=graph_parts):
+            response = self.client.get("/dashboard/social/?platforms=instagram")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["instagram"], {"profile": {"username": "shop"}, "stats": {"messages": 3}})
+        self.assertEqual(response.data["errors"], {"instagram.media": "Graph is down"})
+        self.assertTrue(response.data["partial"])
+
+    def test_unknown_platform(self):
+        self.assertEqual(self.client.get("/dashboard/social/?platforms=myspace").status_code, 400)
+
+
+class GraphBudgetViewTests(SocialViewTestCase):
+    def test_graph_budget(self):
+        response = self.client.get("/metrics/graph-budget/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("app", response.data)
+        self.assertEqual(set(response.data["tokens"]), {token_key("ig-token"), token_key("fb-token")})
@@ -0,0 +1,54 @@
+import gzip
+import json
+import zlib
+from unittest import mock
+from django.test import SimpleTestCase
+from rest_framework.test import APIClient
+from ..service.exports import gzip_stream
+from .base import SocialViewTestCase
+
+
+class ExportViewTests(SocialViewTestCase):
+    def test_ndjson_export(self):
+        self.ingest_inbox()
+        response = self.client.get("/export/instagram_messages/")
+        self.assertEqual(response.status_code, 200)
+        rows = gzip.decompress(b"".join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(json.loads(rows[0])["recipient_id"], "ig1")
+
+    def test_csv_export(self):
+        self.ingest_inbox()
+        response = self.client.get("/export/instagram_comments/?export_format=csv&gzip=0")
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)  # header and one comment
+
+    def test_invalid_parameters(self):
+        for query in ("export_format=xml", "since=2024-13-01", "since=garbage", "until=2024-02-30"):
+            self.assertEqual(self.client.get(f"/export/instagram_messages/?{query}").status_code, 400, query)
+        self.assertEqual(self.client.get("/export/nowhere/").status_code, 400)
+
+    def test_requires_login(self):
+        self.assertIn(APIClient().get("/export/instagram_messages/").status_code, (401, 403))
+
+
+
+class GzipStreamTests(SimpleTestCase):
+    def test_flushes_by_encoded_bytes(self):
+        # ten characters, but twenty bytes once encoded
+        lines = ["é" * 9 + "\n"] * 4
+        flushes = []
+        real_compressobj = zlib.compressobj
+
+        def compressobj(*args):
+            compressor = real_compressobj(*args)
+            recorder = mock.Mock(wraps=compressor)
+            recorder.flush.side_effect = lambda *mode: flushes.append(mode) or compressor.flush(*mode)
+            return recorder
+
+        with mock.patch("automation_app.service.exports.zlib.compressobj", compressobj):
+            data = b"".join(gzip_stream(lines, flush_every=19))
+
+        self.assertEqual(gzip.decompress(data).decode(), "".join(lines))
+        self.assertEqual(flushes.count((zlib.Z_SYNC_FLUSH,)), 4)
@@ -0,0 +1,48 @@
+import hashlib
+from django.test import SimpleTestCase
+from automation_app.service.hyperloglog import HyperLogLog
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "little")
+
+
+class HyperLogLogTests(SimpleTestCase):
+    def test_count_within_error_bound(self):
+        # precision 14 has ~0.8% standard error; allow four of them
+        for n in (0, 1, 100, 10_000, 200_000):
+            sketch = HyperLogLog()
+            sketch.update(_hash(i) for i in range(n))
+            self.assertLessEqual(abs(sketch.count() - n), max(2, 0.033 * n), n)
+
+    def test_duplicates_do_not_count(self):
+        sketch = HyperLogLog()
+        sketch.update(_hash(i % 500) for i in range(20_000))
+        self.assertLessEqual(abs(sketch.count() - 500), 0.033 * 500)
+
+    def test_update_matches_add_hash(self):
+        values = [_hash(i) for i in range(5_000)]
+        one_by_one = HyperLogLog(precision=10)
+        for value in values:
+            one_by_one.add_hash(value)
+        batched = HyperLogLog(precision=10)
+        batched.update(values)
+        self.assertEqual(batched.to_bytes(), one_by_one.to_bytes())
+
+    def test_merge_is_union(self):
+        a, b = HyperLogLog(), HyperLogLog()
+        a.update(_hash(i) for i in range(0, 30_000))
+        b.update(_hash(i) for i in range(20_000, 50_000))
+        self.assertLessEqual(abs(HyperLogLog.union([a, b]).count() - 50_000), 0.033 * 50_000)
+
+    def test_round_trip(self):
+        sketch = HyperLogLog(precision=12)
+        sketch.update(_hash(i) for i in range(1_000))
+        restored = HyperLogLog.from_bytes(sketch.to_bytes())
+        self.assertEqual(restored.precision, 12)
+        self.assertEqual(restored.count(), sketch.count())
+        self.assertTrue(HyperLogLog.from_bytes(b"").is_empty())
+
+    def test_precision_mismatch(self):
+        with self.assertRaises(ValueError):
+            HyperLogLog(10).merge(HyperLogLog(12))
@@ -0,0 +1,37 @@
+from datetime import date
+from unittest import mock
+from automation_app.service import insights_store
+from automation_app.service.insights_store import store_daily
+from .base import SocialViewTestCase
+
+
+DAY = date(2026, 1, 5)
+
+
+@mock.patch.object(insights_store, "fetch_daily", side_effect=AssertionError("no Graph call expected"))
+class InsightsViewTests(SocialViewTestCase):
+    def setUp(self):
+        super().setUp()
+        store_daily("instagram", "ig1", "reach", {DAY: 10})
+        store_daily("instagram", "ig2", "reach", {DAY: 99})
+        store_daily("facebook", "fb1", "page_impressions_unique", {DAY: 20})
+        store_daily("facebook", "fb2", "page_impressions_unique", {DAY: 88})
+
+    def test_own_series_from_store(self, fetch_daily):
+        response = self.client.get(f"/api/facebook-insights/ig1/?since={DAY}&until={DAY}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Insights-Source"], "local")
+        self.assertEqual(response.data["data"][0]["values"][0]["value"], 10)
+
+        response = self.client.get(f"/facebook/insights/fb1/?since={DAY}&until={DAY}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"][0]["values"][0]["value"], 20)
+
+    def test_other_accounts_are_forbidden(self, fetch_daily):
+        response = self.client.get(f"/api/facebook-insights/ig2/?since={DAY}&until={DAY}")
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn("99", response.content.decode())
+
+        response = self.client.get(f"/facebook/insights/fb2/?since={DAY}&until={DAY}")
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn("88", response.content.decode())
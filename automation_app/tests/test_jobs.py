@@ -0,0 +1,125 @@
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from automation_app.models import Job
+from automation_app.service import jobs
+
+
+calls = []
+
+
+@jobs.task("tests.record", queue="tests")
+def record(value):
+    calls.append(value)
+
+
+@jobs.task("tests.explode", queue="tests", max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+@override_settings(JOBS_EAGER=False, JOB_QUEUE_CONCURRENCY={})
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_claim_order(self):
+        late = jobs.enqueue("tests.record", ["late"])
+        urgent = jobs.enqueue("tests.record", ["urgent"], priority=5)
+        jobs.enqueue("tests.record", ["delayed"], priority=10, delay=60)
+        late.run_at = timezone.now() - timedelta(seconds=1)
+        late.save()
+
+        first = jobs.claim("w1")
+        self.assertEqual(first.id, urgent.id)
+        self.assertEqual((first.status, first.locked_by, first.attempts), ("running", "w1", 1))
+        self.assertEqual(jobs.claim("w2").id, late.id)
+        self.assertIsNone(jobs.claim("w3"))  # the delayed job is not due yet
+        self.assertIsNone(jobs.claim("w3", queues=["email"]))
+
+    def test_success_deletes_the_job(self):
+        job = jobs.enqueue("tests.record", ["a"])
+        self.assertTrue(jobs.run_job(jobs.claim("w1")))
+        self.assertEqual(calls, ["a"])
+        self.assertFalse(Job.objects.filter(id=job.id).exists())
+
+    def test_retry_then_dead_letter(self):
+        job = jobs.enqueue("tests.explode")
+        with self.assertLogs("automation_app.service.jobs", "ERROR"):
+            self.assertFalse(jobs.run_job(jobs.claim("w1")))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), ("queued", 1, ""))
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn("boom", job.last_error)
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        with self.assertLogs("automation_app.service.jobs", "ERROR") as logs:
+            self.assertFalse(jobs.run_job(jobs.claim("w1")))
+        self.assertIn("dead after 2 attempts", logs.output[-1])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("dead", 2))
+        self.assertIsNone(jobs.claim("w1"))
+
+        self.assertEqual(jobs.requeue_dead(task_name="tests.explode"), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("queued", 0))
+
+    def test_unknown_task_fails(self):
+        job = Job.objects.create(queue="tests", task="tests.missing", max_attempts=1)
+        with self.assertLogs("automation_app.service.jobs", "ERROR"):
+            self.assertFalse(jobs.run_job(jobs.claim("w1")))
+        job.refresh_from_db()
+        self.assertEqual(job.status, "dead")
+        self.assertIn("Unknown task", job.last_error)
+
+    @override_settings(JOB_RETRY_BASE_SECONDS=10, JOB_RETRY_MAX_SECONDS=60)
+    def test_backoff(self):
+        self.assertTrue(8 <= jobs.backoff(1) <= 12)
+        self.assertTrue(32 <= jobs.backoff(3) <= 48)
+        self.assertTrue(48 <= jobs.backoff(10) <= 72)
+
+    def test_dedupe_key(self):
+        self.assertIsNotNone(jobs.enqueue("tests.record", ["a"], dedupe_key="k"))
+        self.assertIsNone(jobs.enqueue("tests.record", ["b"], dedupe_key="k"))
+        jobs.claim("w1")
+        # once the job runs, a new one may queue behind it
+        self.assertIsNotNone(jobs.enqueue("tests.record", ["c"], dedupe_key="k"))
+
+    @override_settings(JOB_QUEUE_CONCURRENCY={"tests": 1})
+    def test_queue_concurrency(self):
+        jobs.enqueue("tests.record", ["a"])
+        jobs.enqueue("tests.record", ["b"])
+        first = jobs.claim("w1")
+        self.assertIsNotNone(first)
+        self.assertIsNone(jobs.claim("w2"))
+        jobs.run_job(first)
+        self.assertIsNotNone(jobs.claim("w2"))
+
+    @override_settings(JOB_STALE_SECONDS=60)
+    def test_reclaim_stale(self):
+        job = jobs.enqueue("tests.record", ["a"])
+        jobs.claim("w1")
+        later = timezone.now() + timedelta(seconds=120)
+        Job.objects.filter(id=job.id).update(locked_at=timezone.now() - timedelta(seconds=30))
+        jobs.heartbeat(["w1"])
+        self.assertEqual(jobs.reclaim_stale(timezone.now()), 0)
+
+        self.assertEqual(jobs.reclaim_stale(later), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), ("queued", ""))
+        self.assertIn("w1", job.last_error)
+
+    def test_failure_of_a_reclaimed_job_is_ignored(self):
+        job = jobs.enqueue("tests.explode")
+        stale = jobs.claim("w1")
+        Job.objects.filter(id=job.id).update(locked_by="w2")  # taken over by another worker
+        jobs.fail(stale, "late failure")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.last_error), ("running", "w2", ""))
+
+    def test_work_burst(self):
+        for value in range(3):
+            jobs.enqueue("tests.record", [value])
+        self.assertEqual(jobs.work("w1", queues=["tests"], burst=True), 3)
+        self.assertEqual(sorted(calls), [0, 1, 2])
+        self.assertEqual(jobs.queue_stats(), {})
@@ -0,0 +1,44 @@
+import random
+from django.test import SimpleTestCase
+from automation_app.service.latency_histogram import BUCKET_COUNT, LatencyHistogram, bucket_bounds, bucket_index
+
+
+class LatencyHistogramTests(SimpleTestCase):
+    def test_quantiles_within_bucket_error(self):
+        rng = random.Random(7)
+        values = sorted(rng.lognormvariate(5, 1.5) for _ in range(20_000))
+        histogram = LatencyHistogram()
+        histogram.update(values)
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * len(values)) - 1]
+            # buckets are 2^(1/4) wide, so an estimate is off by less than ~19%
+            self.assertAlmostEqual(histogram.quantile(q) / exact, 1, delta=0.19)
+
+    def test_single_value(self):
+        histogram = LatencyHistogram()
+        histogram.add(100)
+        lower, upper = bucket_bounds(bucket_index(100))
+        self.assertAlmostEqual(histogram.quantile(0), lower)
+        self.assertTrue(lower < histogram.quantile(0.5) < upper)
+        self.assertAlmostEqual(histogram.quantile(1), upper)
+
+    def test_edges(self):
+        self.assertIsNone(LatencyHistogram().quantile(0.5))
+        self.assertEqual(bucket_index(0), 0)
+        self.assertEqual(bucket_index(0.5), 0)
+        self.assertEqual(bucket_index(10 ** 9), BUCKET_COUNT - 1)
+        histogram = LatencyHistogram()
+        histogram.add(-5)
+        histogram.add(10 ** 9)
+        self.assertEqual(histogram.total(), 2)
+        self.assertEqual(histogram.quantile(1), bucket_bounds(BUCKET_COUNT - 1)[0])
+
+    def test_merge_and_round_trip(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        a.update([1, 2, 3])
+        b.update([3, 600])
+        a.merge(b)
+        self.assertEqual(a.total(), 5)
+        self.assertEqual(LatencyHistogram.from_bytes(a.to_bytes()).counts, a.counts)
+        self.assertEqual(sum(count for _, _, count in a.buckets()), 5)
+        self.assertEqual(LatencyHistogram.from_bytes(b"").total(), 0)
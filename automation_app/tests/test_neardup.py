@@ -0,0 +1,62 @@
+from unittest import mock
+from django.test import SimpleTestCase, TestCase, override_settings
+from automation_app.models import CommentCluster, InstagramComment
+from automation_app.service import neardup
+from automation_app.service.ingest import ingest_social
+from automation_app.service.neardup import bands, hamming, simhash, shingles
+
+
+class SimHashTests(SimpleTestCase):
+    def test_near_duplicates_are_close(self):
+        a = simhash("Where is my order?? I paid a week ago and nothing has arrived yet @shop")
+        b = simhash("Where is my order?? I paid a week ago and nothing has arrived yet @support")
+        c = simhash("Love the new summer collection, the colours are amazing")
+        self.assertLessEqual(hamming(a, b), 3)
+        self.assertGreater(hamming(a, c), 3)
+
+    def test_empty_text(self):
+        self.assertEqual(simhash(""), 0)
+        self.assertEqual(simhash("123 !!!"), 0)
+
+    def test_mentions_and_links_collapse(self):
+        self.assertEqual(shingles("hi @alice"), shingles("hi @bob"))
+        self.assertEqual(simhash("see https://a.example/x"), simhash("see https://b.example/y"))
+
+    def test_bands_reassemble(self):
+        value = simhash("some comment text to hash")
+        parts = bands(value)
+        self.assertEqual(len(parts), 4)
+        self.assertEqual(sum(part << (16 * i) for i, part in enumerate(parts)), value)
+
+    def test_close_hashes_share_a_band(self):
+        # 3 differing bits touch at most 3 of the 4 bands, so one band always matches
+        value = simhash("free followers click the link in bio")
+        for flips in ((0, 1, 2), (5, 21, 40), (15, 31, 63)):
+            other = value
+            for bit in flips:
+                other ^= 1 << bit
+            self.assertEqual(hamming(value, other), 3)
+            self.assertTrue(any(x == y for x, y in zip(bands(value), bands(other))), flips)
+
+
+@override_settings(CLASSIFY_ON_INGEST=False, ANOMALY_DETECTION=False, JOBS_EAGER=False)
+class ClusterCacheTests(TestCase):
+    def setUp(self):
+        neardup._recent.clear()
+
+    def ingest(self, text):
+        return ingest_social(InstagramComment, recipient_id="ig1", sender_id="s1", comment=text)
+
+    def test_rolled_back_cluster_is_not_cached(self):
+        text = "free followers, click the link in my bio"
+        with self.captureOnCommitCallbacks(execute=True):
+            with mock.patch("automation_app.service.ingest.record_sender", side_effect=RuntimeError("down")):
+                with self.assertRaises(RuntimeError):
+                    self.ingest(text)
+        self.assertFalse(CommentCluster.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.ingest(text)
+            second = self.ingest(text + "!")
+        cluster = CommentCluster.objects.get()
+        self.assertEqual((first.dup_cluster_id, second.dup_cluster_id), (cluster.id, cluster.id))
@@ -0,0 +1,50 @@
+from django.test import SimpleTestCase, override_settings
+from automation_app.service.ranking import TopK, parse_weights, rank, score_weights, weighted_score
+
+
+class TopKTests(SimpleTestCase):
+    def test_best_and_worst(self):
+        top = rank(range(100), k=3, score=lambda x: (x * 37) % 101)
+        scores = [(x * 37) % 101 for x in range(100)]
+        self.assertEqual([score for score, _ in top.best()], sorted(scores, reverse=True)[:3])
+        self.assertEqual([score for score, _ in top.worst()], sorted(scores)[:3])
+
+    def test_ties_keep_the_item_seen_first(self):
+        top = TopK(2)
+        for item in ("a", "b", "c", "d"):
+            top.add(item, 5)
+        self.assertEqual(top.best(), [(5, "a"), (5, "b")])
+        self.assertEqual(top.worst(), [(5, "a"), (5, "b")])
+
+    def test_ties_with_other_scores(self):
+        top = TopK(2)
+        for item, score in (("a", 1), ("b", 3), ("c", 3), ("d", 1), ("e", 2)):
+            top.add(item, score)
+        self.assertEqual(top.best(), [(3, "b"), (3, "c")])
+        self.assertEqual(top.worst(), [(1, "a"), (1, "d")])
+
+    def test_fewer_items_than_k(self):
+        top = rank(["x"], k=5, score=lambda item: 1)
+        self.assertEqual(top.best(), [(1, "x")])
+        self.assertEqual(top.worst(), [(1, "x")])
+        self.assertEqual(TopK(3).best(), [])
+
+    def test_items_need_not_be_comparable(self):
+        top = TopK(1)
+        top.add({"id": 1}, 2)
+        top.add({"id": 2}, 2)
+        self.assertEqual(top.best(), [(2, {"id": 1})])
+
+
+class WeightTests(SimpleTestCase):
+    @override_settings(POST_SCORE_WEIGHTS={"shares": 2})
+    def test_weights(self):
+        weights = score_weights(parse_weights("comments:3"))
+        self.assertEqual(weights, {"likes": 1.0, "comments": 3.0, "shares": 2.0, "saves": 0.0})
+        self.assertEqual(weighted_score({"likes": 4, "comments": 1, "shares": None}, weights), 7)
+
+    def test_invalid_weights(self):
+        with self.assertRaises(ValueError):
+            parse_weights("likes:lots")
+        with self.assertRaises(ValueError):
+            score_weights({"views": 1})
@@ -0,0 +1,63 @@
+from datetime import timedelta
+from django.utils import timezone
+from automation_app.models import SocialPost, SocialSyncCursor
+from .base import SocialViewTestCase
+
+
+class ReportViewTests(SocialViewTestCase):
+    def mirror_posts(self, likes):
+        SocialSyncCursor.objects.create(
+            platform="instagram", account_id="ig1", last_synced_at=timezone.now(), backfilled=True
+        )
+        now = timezone.now()
+        for i, count in enumerate(likes):
+            SocialPost.objects.create(
+                platform="instagram", account_id="ig1", post_id=f"p{i}", posted_at=now - timedelta(minutes=i),
+                likes=count, comments=0, engagement=count,
+            )
+
+    def test_monthly_report(self):
+        self.ingest_inbox()
+        response = self.client.get("/instagram/monthly-report/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["messages"]["total"], 3)
+        self.assertEqual(response.data["comments"]["total"], 1)
+
+    def test_complaints_are_pending_until_classified(self):
+        self.ingest_inbox()
+        response = self.client.get("/instagram/complaints-reviews/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["pending"], 4)
+        self.assertEqual(response.data["top_complaints"], [])
+
+    def test_posts_still_syncing(self):
+        SocialSyncCursor.objects.create(
+            platform="instagram", account_id="ig1", last_synced_at=timezone.now(), backfilled=False
+        )
+        SocialPost.objects.create(
+            platform="instagram", account_id="ig1", post_id="p1", posted_at=timezone.now(), likes=1, engagement=1
+        )
+        response = self.client.get("/instagram/best-worst-posts/?year=2020&month=1")
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.data["syncing"])
+        self.assertEqual(self.client.get("/analytics/posts/?year=2020&month=1").status_code, 202)
+
+        SocialSyncCursor.objects.update(backfilled=True)
+        response = self.client.get("/instagram/best-worst-posts/?year=2020&month=1")
+        self.assertEqual((response.status_code, response.data), (200, {"message": "No posts in this month"}))
+
+    def test_post_statistics(self):
+        self.mirror_posts([5, 50, 1])
+        response = self.client.get("/analytics/posts/")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["posts"], 3)
+        self.assertEqual(response.data["totals"]["likes"], 56)
+        self.assertEqual(self.client.get("/analytics/posts/?platform=myspace").status_code, 400)
+
+    def test_best_worst_posts(self):
+        self.mirror_posts([5, 50, 1])
+        response = self.client.get("/instagram/best-worst-posts/?limit=2")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual([post["likes"] for post in response.data["best_posts"]], [50, 5])
+        self.assertEqual(response.data["worst_post"]["likes"], 1)
+        self.assertEqual(self.client.get("/instagram/best-worst-posts/?weights=views:1").status_code, 400)
@@ -0,0 +1,36 @@
+from datetime import date
+from django.test import TestCase
+from automation_app.models import SocialDailyRollup, SocialDailySender
+from automation_app.service import rollups
+
+
+DAY = date(2026, 1, 5)
+
+
+class SenderRollupTests(TestCase):
+    def merge(self, *senders, day=DAY):
+        rollups.merge_rollup("instagram", "ig1", day, messages=len(senders),
+                             sender_hashes=[rollups.sender_hash(s) for s in senders])
+
+    def test_senders_are_counted_once(self):
+        self.merge("a", "b")
+        self.merge("a")
+        self.merge("c", day=date(2026, 1, 6))
+        self.assertEqual(SocialDailySender.objects.count(), 3)
+        self.assertEqual(rollups.exact_sender_count("instagram", "ig1"), 3)
+        self.assertEqual(rollups.exact_sender_count("instagram", "ig1", DAY, DAY), 2)
+        self.assertEqual(rollups.sender_sketch("instagram", "ig1").count(), 3)
+
+    def test_ingest_leaves_the_sketch_to_the_sealing_job(self):
+        self.merge("a", "b")
+        self.assertEqual(SocialDailyRollup.objects.get().sender_sketch, b"")
+        self.assertEqual(rollups.seal_sender_sketches(today=DAY), 0)  # not over yet
+
+        self.assertEqual(rollups.seal_sender_sketches(today=date(2026, 1, 6)), 1)
+        self.assertNotEqual(SocialDailyRollup.objects.get().sender_sketch, b"")
+        self.assertEqual(rollups.seal_sender_sketches(today=date(2026, 1, 6)), 0)
+
+        # a backfill into a sealed day still reaches its sketch
+        self.merge("c")
+        self.assertEqual(rollups.sender_sketch("instagram", "ig1").count(), 3)
+        self.assertEqual(rollups.exact_sender_count("instagram", "ig1"), 3)
@@ -0,0 +1,46 @@
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+from automation_app.models import SchedulerLease
+from automation_app.service import scheduler
+
+
+JOB = scheduler.ScheduledJob("tests.job", every=3600, lease=600, run=None)
+
+
+class SchedulerLeaseTests(TestCase):
+    def test_one_holder_at_a_time(self):
+        self.assertTrue(scheduler.acquire_lease(JOB, "a"))
+        self.assertFalse(scheduler.acquire_lease(JOB, "b"))
+        lease = SchedulerLease.objects.get(name=JOB.name)
+        self.assertEqual(lease.owner, "a")
+
+    def test_expired_lease_is_taken_over(self):
+        now = timezone.now()
+        self.assertTrue(scheduler.acquire_lease(JOB, "a", now))
+        self.assertFalse(scheduler.acquire_lease(JOB, "b", now + timedelta(seconds=599)))
+        self.assertTrue(scheduler.acquire_lease(JOB, "b", now + timedelta(seconds=601)))
+        # the old holder can no longer release it
+        scheduler.release_lease(JOB, "a")
+        self.assertEqual(SchedulerLease.objects.get(name=JOB.name).owner, "b")
+
+    def test_not_due_until_every_has_passed(self):
+        self.assertTrue(scheduler.acquire_lease(JOB, "a"))
+        scheduler.release_lease(JOB, "a")
+        lease = SchedulerLease.objects.get(name=JOB.name)
+        self.assertEqual(lease.owner, "")
+        self.assertIsNotNone(lease.last_finished_at)
+        self.assertFalse(scheduler.acquire_lease(JOB, "b"))
+        self.assertTrue(scheduler.acquire_lease(JOB, "b", timezone.now() + timedelta(seconds=3601)))
+
+    def test_run_due_jobs(self):
+        ok = JOB._replace(name="tests.ok", run=lambda: 3)
+        broken = JOB._replace(name="tests.broken", run=mock.Mock(side_effect=RuntimeError("down")))
+        with mock.patch.object(scheduler, "scheduled_jobs", return_value=[ok, broken]):
+            with self.assertLogs("automation_app.service.scheduler", "ERROR"):
+                results = scheduler.run_due_jobs("a")
+            self.assertEqual(results, {"tests.ok": 3, "tests.broken": {"error": "down"}})
+            # both ran just now, so neither is due again
+            self.assertEqual(scheduler.run_due_jobs("b"), {})
+        self.assertEqual(SchedulerLease.objects.get(name="tests.broken").last_error, "down")
@@ -0,0 +1,11 @@
+from .base import SocialViewTestCase
+
+
+class SearchViewTests(SocialViewTestCase):
+    def test_search(self):
+        self.ingest_inbox()
+        response = self.client.get("/search/?q=order")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(self.client.get("/search/").status_code, 400)
+        self.assertEqual(self.client.get("/search/?q=order&sources=nowhere").status_code, 400)
@@ -61,6 +61,7 @@ urlpatterns = [
     path('facebook/messages/<str:recipient_page_id>/', FacebookMessageView.as_view(), name='facebook-messages-get'),  # GET
     path('facebook/comments/', FacebookCommentView.as_view(), name='facebook-comments-post'),  # POST
     path('facebook/comments/<str:post_id>/', FacebookCommentView.as_view(), name='facebook-comments-get'),
+    path('social/<str:source>/<int:pk>/reply/', SocialReplyView.as_view(), name='social-reply'),
     path("facebook/insights/<str:page_id>/",FacebookPageInsightsMetricView.as_view(),name="facebook-insights"),  # GET
     path("facebook/insights/multi/<str:page_id>/",FacebookPageInsightsMultiMetricView.as_view(),name="facebook-insights-multi"),
     path("create-session/", CreateBusinessSessionView.as_view(), name="create_session"),
@@ -95,4 +96,13 @@ urlpatterns = [
     path('plans/', PlansListView.as_view(), name='plans-list'),
     path('checkout/', CreateStripeCheckoutView.as_view(), name='create-checkout'),
     path("stripe/webhook/", stripe_webhook, name="stripe-webhook"),
+    path("export/<str:source>/", export_social_data, name="export-social-data"),
+    path("search/", search_inbox, name="search-inbox"),
+    path("dashboard/social/", social_dashboard_view, name="social-dashboard"),
+    path("metrics/graph-budget/", graph_budget_view, name="graph-budget"),
+    path("analytics/posts/", post_statistics_view, name="post-statistics"),
+    path("analytics/activity-heatmap/", activity_heatmap_view, name="activity-heatmap"),
+    path("analytics/response-times/", response_times_view, name="response-times"),
+    path("analytics/query/", analytics_query_view, name="analytics-query"),
+    path("analytics/senders/", senders_view, name="analytics-senders"),
 ]
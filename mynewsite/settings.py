@@ -93,6 +93,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # ingest holds the write lock for one short transaction; wait for it rather than fail
+        'OPTIONS': {'timeout': 20},
     }
 }
 
@@ -191,4 +193,100 @@ CHANNEL_LAYERS = {
 
 
 RESEND_API_KEY = os.getenv("RESEND_API_KEY")
-DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL")
\ No newline at end of file
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL")
+
+
+# Batched sentiment/complaint classifier (automation_app/service/classifier.py)
+CLASSIFIER_MODEL = os.getenv("CLASSIFIER_MODEL", "gpt-4o-mini")
+CLASSIFIER_BATCH_SIZE = int(os.getenv("CLASSIFIER_BATCH_SIZE", 25))
+CLASSIFIER_MAX_WORKERS = int(os.getenv("CLASSIFIER_MAX_WORKERS", 4))
+CLASSIFIER_TIMEOUT = int(os.getenv("CLASSIFIER_TIMEOUT", 60))
+# label new messages/comments on the job queue (runworker) right after ingest
+CLASSIFY_ON_INGEST = os.getenv("CLASSIFY_ON_INGEST", "1") == "1"
+CLASSIFY_DEBOUNCE_SECONDS = float(os.getenv("CLASSIFY_DEBOUNCE_SECONDS", 2))
+# complaint topics are re-clustered this long after new complaint labels arrive (per account and month)
+CLASSIFY_TOPIC_DELAY_SECONDS = int(os.getenv("CLASSIFY_TOPIC_DELAY_SECONDS", 60))
+# offline fast path in front of the LLM classifier; below this confidence texts are escalated
+LOCAL_CLASSIFIER_ENABLED = os.getenv("LOCAL_CLASSIFIER_ENABLED", "1") == "1"
+LOCAL_CLASSIFIER_MIN_CONFIDENCE = float(os.getenv("LOCAL_CLASSIFIER_MIN_CONFIDENCE", 0.9))
+# near-duplicate comment clustering (SimHash): max differing bits and how far back to match
+NEAR_DUP_MAX_DISTANCE = int(os.getenv("NEAR_DUP_MAX_DISTANCE", 3))
+NEAR_DUP_WINDOW_HOURS = int(os.getenv("NEAR_DUP_WINDOW_HOURS", 48))
+NEAR_DUP_TOUCH_MINUTES = int(os.getenv("NEAR_DUP_TOUCH_MINUTES", 10))
+# Meta Graph API client (service/graph_client.py)
+GRAPH_API_VERSION = os.getenv("GRAPH_API_VERSION", "v24.0")
+GRAPH_API_TIMEOUT = int(os.getenv("GRAPH_API_TIMEOUT", 15))
+GRAPH_API_RETRIES = int(os.getenv("GRAPH_API_RETRIES", 3))
+GRAPH_API_POOL_SIZE = int(os.getenv("GRAPH_API_POOL_SIZE", 20))
+# Graph response cache: per-kind/per-metric TTL overrides, e.g. {"insights:reach": 7200}
+GRAPH_CACHE_TTLS = {}
+GRAPH_CACHE_STALE_SECONDS = int(os.getenv("GRAPH_CACHE_STALE_SECONDS", 6 * 3600))
+
+# Shared cache for Graph responses and refresh locks; per-process memory without Redis
+if os.getenv("REDIS_CACHE_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_CACHE_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+# /dashboard/social/ fan-out: worker threads and per-part timeouts in seconds (overrides)
+DASHBOARD_MAX_WORKERS = int(os.getenv("DASHBOARD_MAX_WORKERS", 16))
+DASHBOARD_PART_TIMEOUTS = {}
+# Graph API rate-limit governor (percent of Meta's usage limits); background work yields first
+GRAPH_BUDGET_INTERACTIVE_LIMIT = int(os.getenv("GRAPH_BUDGET_INTERACTIVE_LIMIT", 95))
+GRAPH_BUDGET_BACKGROUND_LIMIT = int(os.getenv("GRAPH_BUDGET_BACKGROUND_LIMIT", 75))
+GRAPH_BUDGET_SLOWDOWN_FROM = int(os.getenv("GRAPH_BUDGET_SLOWDOWN_FROM", 50))
+GRAPH_BUDGET_MAX_DELAY = float(os.getenv("GRAPH_BUDGET_MAX_DELAY", 2.0))
+GRAPH_BUDGET_BACKGROUND_CONCURRENCY = int(os.getenv("GRAPH_BUDGET_BACKGROUND_CONCURRENCY", 2))
+GRAPH_BUDGET_BACKGROUND_MAX_WAIT = int(os.getenv("GRAPH_BUDGET_BACKGROUND_MAX_WAIT", 300))
+# Post mirror (sync_social_posts): page size, recent-post refresh window and backfill pages per run
+SOCIAL_POST_PAGE_SIZE = int(os.getenv("SOCIAL_POST_PAGE_SIZE", 50))
+SOCIAL_POST_REFRESH_DAYS = int(os.getenv("SOCIAL_POST_REFRESH_DAYS", 7))
+SOCIAL_POST_BACKFILL_PAGES = int(os.getenv("SOCIAL_POST_BACKFILL_PAGES", 5))
+# Insights time-series (collect_insights): days re-collected per run, retention before downsampling
+INSIGHTS_COLLECT_DAYS = int(os.getenv("INSIGHTS_COLLECT_DAYS", 3))
+INSIGHTS_HOURLY_RETENTION_DAYS = int(os.getenv("INSIGHTS_HOURLY_RETENTION_DAYS", 14))
+INSIGHTS_DAILY_RETENTION_DAYS = int(os.getenv("INSIGHTS_DAILY_RETENTION_DAYS", 400))
+# how far back Graph still has insights; older gaps are not fetched
+INSIGHTS_GRAPH_HISTORY_DAYS = int(os.getenv("INSIGHTS_GRAPH_HISTORY_DAYS", 730))
+# best/worst post ranking weights (overrides), e.g. {"comments": 2, "shares": 3}
+POST_SCORE_WEIGHTS = {}
+# Streaming anomaly alerts on message/comment volume and negative-sentiment rate
+ANOMALY_DETECTION = os.getenv("ANOMALY_DETECTION", "1") == "1"
+ANOMALY_ALPHA = float(os.getenv("ANOMALY_ALPHA", 0.05))
+ANOMALY_SEASONAL_ALPHA = float(os.getenv("ANOMALY_SEASONAL_ALPHA", 0.3))
+ANOMALY_THRESHOLD = float(os.getenv("ANOMALY_THRESHOLD", 4))
+ANOMALY_WARMUP_HOURS = int(os.getenv("ANOMALY_WARMUP_HOURS", 72))
+ANOMALY_MIN_COUNT = int(os.getenv("ANOMALY_MIN_COUNT", 10))
+ANOMALY_MIN_NEGATIVE = int(os.getenv("ANOMALY_MIN_NEGATIVE", 5))
+ANOMALY_COOLDOWN_MINUTES = int(os.getenv("ANOMALY_COOLDOWN_MINUTES", 60))
+ANOMALY_LABEL_WINDOW_MINUTES = int(os.getenv("ANOMALY_LABEL_WINDOW_MINUTES", 120))
+# run_scheduler: poll interval, and how often/with what lease last month's report snapshots are filled in
+SCHEDULER_POLL_SECONDS = int(os.getenv("SCHEDULER_POLL_SECONDS", 60))
+REPORT_SNAPSHOT_EVERY = int(os.getenv("REPORT_SNAPSHOT_EVERY", 3600))
+REPORT_SNAPSHOT_LEASE = int(os.getenv("REPORT_SNAPSHOT_LEASE", 3600))
+# how often finished days get their sender HyperLogLog sketch built from the day's sender rows
+SENDER_SKETCH_EVERY = int(os.getenv("SENDER_SKETCH_EVERY", 3600))
+SENDER_SKETCH_LEASE = int(os.getenv("SENDER_SKETCH_LEASE", 1800))
+# best/worst posts kept per snapshot; requests up to this limit are served from it
+REPORT_SNAPSHOT_POST_LIMIT = int(os.getenv("REPORT_SNAPSHOT_POST_LIMIT", 10))
+# Background jobs (runworker): pool size, polling, retries with backoff, stale-claim timeout
+JOB_WORKER_PROCESSES = int(os.getenv("JOB_WORKER_PROCESSES", 1))
+JOB_WORKER_THREADS = int(os.getenv("JOB_WORKER_THREADS", 4))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 1))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 5))
+JOB_RETRY_BASE_SECONDS = int(os.getenv("JOB_RETRY_BASE_SECONDS", 30))
+JOB_RETRY_MAX_SECONDS = int(os.getenv("JOB_RETRY_MAX_SECONDS", 3600))
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", 900))
+JOB_RECLAIM_SECONDS = int(os.getenv("JOB_RECLAIM_SECONDS", 60))
+# max jobs running at once per queue across all workers; one classification drain is enough
+JOB_QUEUE_CONCURRENCY = {"classification": 1, "email": 4}
+# run jobs in-process right after commit instead of queueing them (development without a worker)
+JOBS_EAGER = os.getenv("JOBS_EAGER", "0") == "1"